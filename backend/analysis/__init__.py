@@ -1,7 +1,15 @@
 """Analysis utilities for risk scenarios."""
 
-from .scenario_engine import ScenarioDefinition, run_scenarios
-
-__all__ = ["ScenarioDefinition", "run_scenarios"]
+from .exposure_sweep import run_exposure_sweep
+from .result_cache import ScenarioResultCache
+from .scenario_engine import ScenarioDefinition, iter_scenarios, run_scenarios
+
+__all__ = [
+    "ScenarioDefinition",
+    "ScenarioResultCache",
+    "iter_scenarios",
+    "run_exposure_sweep",
+    "run_scenarios",
+]
 
 
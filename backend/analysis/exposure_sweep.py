@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from itertools import combinations
+from math import factorial
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from backend.domain.document import DocType, Document
+from backend.inference import InferenceEngine, TermCountIndex
+from backend.schemas import DocTypeMarginalRisk, SweepAttributeScore, SweepSubsetResult
+
+SWEEP_DOC_TYPES: List[DocType] = list(DocType)
+
+
+def exposure_subsets(doc_types: Sequence[DocType] = SWEEP_DOC_TYPES) -> List[Tuple[DocType, ...]]:
+    """Every non-empty combination of ``doc_types``, smallest subsets first."""
+
+    return [
+        subset
+        for size in range(1, len(doc_types) + 1)
+        for subset in combinations(doc_types, size)
+    ]
+
+
+def run_exposure_sweep(
+    documents: Iterable[Document],
+    inference_engine: InferenceEngine,
+    term_counts: TermCountIndex,
+) -> Tuple[List[SweepSubsetResult], List[DocTypeMarginalRisk]]:
+    """Score every doc-type combination and the marginal risk of each doc type.
+
+    The term counts of each doc type are summed once; a subset's counts are
+    then the sum of its types' partial sums, so all 31 subsets are weighted
+    and scored as a single batch instead of 31 scenario passes.
+    """
+
+    documents_list = list(documents)
+    subsets = exposure_subsets()
+    type_index = {doc_type: idx for idx, doc_type in enumerate(SWEEP_DOC_TYPES)}
+
+    # membership[t, d] = 1 when document d has doc type t.
+    membership = np.zeros((len(SWEEP_DOC_TYPES), len(documents_list)))
+    has_text = np.zeros(len(SWEEP_DOC_TYPES), dtype=bool)
+    for column, doc in enumerate(documents_list):
+        membership[type_index[doc.doc_type], column] = 1.0
+        has_text[type_index[doc.doc_type]] |= doc.has_text
+    type_doc_counts = membership.sum(axis=1).astype(int)
+
+    # selection[s, t] = 1 when subset s includes doc type t.
+    selection = np.zeros((len(subsets), len(SWEEP_DOC_TYPES)))
+    for row, subset in enumerate(subsets):
+        for doc_type in subset:
+            selection[row, type_index[doc_type]] = 1.0
+    available = (selection[:, has_text] > 0).any(axis=1)
+
+    scores: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    if documents_list:
+        type_sums = [
+            sp.csr_matrix(membership) @ matrix
+            for matrix in term_counts.stacked_counts(documents_list)
+        ]
+        scores = inference_engine.score_counts(
+            [sp.csr_matrix(selection) @ type_sum for type_sum in type_sums]
+        )
+
+    attribute_names = inference_engine.attribute_names
+    confidences = {name: np.zeros(len(subsets)) for name in attribute_names}
+    results: List[SweepSubsetResult] = []
+    for row, subset in enumerate(subsets):
+        attributes: List[SweepAttributeScore] = []
+        for name in attribute_names:
+            if not available[row] or name not in scores:
+                attributes.append(
+                    SweepAttributeScore(
+                        name=name,
+                        predicted_value=None,
+                        confidence=0.0,
+                        available=False,
+                    )
+                )
+                continue
+            classes, probabilities = scores[name]
+            best_idx = int(np.argmax(probabilities[row]))
+            confidence = float(probabilities[row, best_idx])
+            confidences[name][row] = confidence
+            attributes.append(
+                SweepAttributeScore(
+                    name=name,
+                    predicted_value=str(classes[best_idx]),
+                    confidence=confidence,
+                )
+            )
+        results.append(
+            SweepSubsetResult(
+                doc_types=list(subset),
+                document_count=int(selection[row] @ type_doc_counts),
+                attributes=attributes,
+            )
+        )
+
+    marginal_risk = [
+        DocTypeMarginalRisk(
+            doc_type=doc_type,
+            document_count=int(type_doc_counts[type_index[doc_type]]),
+            marginal_risk={
+                name: _shapley_value(subsets, confidences[name], doc_type)
+                for name in attribute_names
+            },
+        )
+        for doc_type in SWEEP_DOC_TYPES
+    ]
+    return results, marginal_risk
+
+
+def _shapley_value(
+    subsets: List[Tuple[DocType, ...]],
+    values: np.ndarray,
+    doc_type: DocType,
+) -> float:
+    """Average confidence gained by adding ``doc_type`` to the other types' subsets.
+
+    Each coalition is weighted as in the Shapley value, so the marginal risks of
+    all doc types sum to the confidence reached with every doc type exposed.
+    The empty exposure has confidence 0.
+    """
+
+    n_types = len(SWEEP_DOC_TYPES)
+    value_of = {frozenset(subset): float(value) for subset, value in zip(subsets, values)}
+    value_of[frozenset()] = 0.0
+    total = 0.0
+    for coalition, value in value_of.items():
+        if doc_type in coalition:
+            continue
+        size = len(coalition)
+        weight = factorial(size) * factorial(n_types - size - 1) / factorial(n_types)
+        total += weight * (value_of[coalition | {doc_type}] - value)
+    return total
+
+
+__all__ = ["SWEEP_DOC_TYPES", "exposure_subsets", "run_exposure_sweep"]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from backend.domain.document import DocType
+from backend.schemas import ScenarioResult
+
+CacheKey = Tuple[Hashable, ...]
+
+
+class ScenarioResultCache:
+    """LRU cache of scenario results keyed by corpus, model and request options.
+
+    Keys ignore the scenario name, so a ``custom_selection`` request reuses the
+    result of a default scenario with the same doc types and vice versa.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self._entries: OrderedDict[CacheKey, ScenarioResult] = OrderedDict()
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(
+        store_version: Hashable,
+        model_version: Hashable,
+        doc_types: Iterable[DocType],
+        **options: Any,
+    ) -> CacheKey:
+        return (
+            store_version,
+            model_version,
+            tuple(sorted({DocType(doc_type).value for doc_type in doc_types})),
+            tuple(sorted(options.items())),
+        )
+
+    def get(
+        self,
+        key: CacheKey,
+        name: str,
+        doc_types: List[DocType],
+    ) -> Optional[ScenarioResult]:
+        """Return a copy of the cached result relabelled for the requesting scenario."""
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return result.model_copy(update={"name": name, "doc_types": doc_types})
+
+    def put(self, key: CacheKey, result: ScenarioResult) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+__all__ = ["ScenarioResultCache"]
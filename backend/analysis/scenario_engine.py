@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
 
 from backend.domain.document import DocType, Document
 from backend.explanation import ExplanationEngine
-from backend.inference import InferenceEngine
-from backend.schemas import AttributeExplanation, ScenarioResult
+from backend.inference import AttributeInference, InferenceEngine, TermCountIndex
+from backend.observability import REGISTRY, stage
+from backend.schemas import AttributeExplanation, DocumentImpact, ScenarioResult
+
+from .result_cache import ScenarioResultCache
+
+SCENARIO_CACHE_HITS = REGISTRY.counter(
+    "consentlens_scenario_cache_hits", "Scenario results served from a session's result cache."
+)
+SCENARIO_CACHE_MISSES = REGISTRY.counter(
+    "consentlens_scenario_cache_misses", "Scenario results computed because no cached copy matched."
+)
 
 
 @dataclass(frozen=True)
@@ -24,23 +36,104 @@ def run_scenarios(
     explanation_engine: ExplanationEngine,
     top_k_features: int = 5,
     max_supporting_sentences: int = 3,
+    term_counts: Optional[TermCountIndex] = None,
+    document_impacts: bool = False,
+    sentence_ranking: str = "first_match",
+    result_cache: Optional[ScenarioResultCache] = None,
+    store_version: Optional[int] = None,
+    document_search: Optional[Callable[[Sequence[str]], Optional[Set[str]]]] = None,
 ) -> List[ScenarioResult]:
-    """Execute all requested scenarios and collect explainable predictions."""
+    """Execute all requested scenarios and collect explainable predictions.
+
+    When ``term_counts`` is given, each scenario is scored from the sum of its
+    documents' cached term counts instead of re-tokenizing the joined text.
+    With ``document_impacts`` every attribute also reports, per document, how
+    the prediction changes when that document is left out of the scenario.
+    ``sentence_ranking="contribution"`` picks supporting sentences by their
+    score for the predicted value instead of the first feature matches.
+
+    With a ``result_cache`` and the ``store_version`` the documents were read
+    at, scenarios already computed for the same corpus, model and options are
+    served from the cache. ``document_search`` lets the first-match
+    explanation skip documents a full-text index rules out.
+    """
+
+    return list(
+        iter_scenarios(
+            documents,
+            scenarios,
+            inference_engine,
+            explanation_engine,
+            top_k_features=top_k_features,
+            max_supporting_sentences=max_supporting_sentences,
+            term_counts=term_counts,
+            document_impacts=document_impacts,
+            sentence_ranking=sentence_ranking,
+            result_cache=result_cache,
+            store_version=store_version,
+            document_search=document_search,
+        )
+    )
+
+
+def iter_scenarios(
+    documents: Iterable[Document],
+    scenarios: List[ScenarioDefinition],
+    inference_engine: InferenceEngine,
+    explanation_engine: ExplanationEngine,
+    top_k_features: int = 5,
+    max_supporting_sentences: int = 3,
+    term_counts: Optional[TermCountIndex] = None,
+    document_impacts: bool = False,
+    sentence_ranking: str = "first_match",
+    result_cache: Optional[ScenarioResultCache] = None,
+    store_version: Optional[int] = None,
+    document_search: Optional[Callable[[Sequence[str]], Optional[Set[str]]]] = None,
+) -> Iterator[ScenarioResult]:
+    """Yield each scenario's result as soon as it is computed.
+
+    Takes the same options as :func:`run_scenarios`; callers that report
+    progress or may stop early consume results one scenario at a time.
+    """
 
     documents_list = list(documents)
-    return [
-        _run_single_scenario(
+    use_cache = result_cache is not None and store_version is not None
+    for scenario in scenarios:
+        cache_key = None
+        if use_cache:
+            cache_key = ScenarioResultCache.key(
+                store_version,
+                inference_engine.version,
+                scenario.doc_types,
+                top_k_features=top_k_features,
+                max_supporting_sentences=max_supporting_sentences,
+                document_impacts=document_impacts,
+                sentence_ranking=sentence_ranking,
+            )
+            cached = result_cache.get(cache_key, scenario.name, scenario.doc_types)
+            if cached is not None:
+                SCENARIO_CACHE_HITS.inc()
+                yield cached
+                continue
+            SCENARIO_CACHE_MISSES.inc()
+        result = _run_single_scenario(
             documents_list,
             scenario,
             inference_engine,
             explanation_engine,
             top_k_features,
             max_supporting_sentences,
+            term_counts,
+            document_impacts,
+            sentence_ranking,
+            document_search,
         )
-        for scenario in scenarios
-    ]
+        if cache_key is not None:
+            result_cache.put(cache_key, result)
+        yield result
 
 
+@stage("scenario.compute")
 def _run_single_scenario(
     documents: List[Document],
     scenario: ScenarioDefinition,
@@ -48,16 +141,38 @@ def _run_single_scenario(
     explanation_engine: ExplanationEngine,
     top_k_features: int,
     max_supporting_sentences: int,
+    term_counts: Optional[TermCountIndex],
+    document_impacts: bool,
+    sentence_ranking: str,
+    document_search: Optional[Callable[[Sequence[str]], Optional[Set[str]]]] = None,
 ) -> ScenarioResult:
     doc_type_filter = set(scenario.doc_types)
     scenario_docs = [doc for doc in documents if doc.doc_type in doc_type_filter]
-    combined_text = "\n\n".join(doc.clean_text for doc in scenario_docs).strip()
 
-    predictions = (
-        inference_engine.predict(combined_text, top_k_features=top_k_features)
-        if combined_text
-        else {}
-    )
+    if term_counts is not None:
+        predictions = (
+            inference_engine.predict_counts(
+                term_counts.sum_counts(scenario_docs), top_k_features=top_k_features
+            )
+            if any(doc.has_text for doc in scenario_docs)
+            else {}
+        )
+    else:
+        combined_text = "\n\n".join(doc.clean_text for doc in scenario_docs).strip()
+        predictions = (
+            inference_engine.predict(combined_text, top_k_features=top_k_features)
+            if combined_text
+            else {}
+        )
+
+    impacts: Dict[str, List[DocumentImpact]] = {}
+    if document_impacts and predictions:
+        impacts = _leave_one_out_impacts(
+            scenario_docs,
+            predictions,
+            inference_engine,
+            term_counts if term_counts is not None else TermCountIndex(inference_engine),
+        )
 
     attributes: List[AttributeExplanation] = []
 
@@ -88,11 +203,21 @@ def _run_single_scenario(
                     )
                 )
                 continue
-            supporting_sentences = explanation_engine.collect_supporting_sentences(
-                scenario_docs,
-                inference.top_features,
-                limit=max_supporting_sentences,
-            )
+            if sentence_ranking == "contribution":
+                supporting_sentences = explanation_engine.rank_supporting_sentences(
+                    scenario_docs,
+                    inference_engine,
+                    name,
+                    inference.predicted_value,
+                    limit=max_supporting_sentences,
+                )
+            else:
+                supporting_sentences = explanation_engine.collect_supporting_sentences(
+                    scenario_docs,
+                    inference.top_features,
+                    limit=max_supporting_sentences,
+                    search=document_search,
+                )
             attributes.append(
                 AttributeExplanation(
                     name=name,
@@ -101,6 +226,7 @@ def _run_single_scenario(
                     top_features=inference.top_features,
                     supporting_sentences=supporting_sentences,
                     available=True,
+                    document_impacts=impacts.get(name),
                 )
             )
 
@@ -112,4 +238,46 @@ def _run_single_scenario(
     )
 
 
+@stage("scenario.document_impacts")
+def _leave_one_out_impacts(
+    scenario_docs: List[Document],
+    predictions: Dict[str, AttributeInference],
+    inference_engine: InferenceEngine,
+    term_counts: TermCountIndex,
+) -> Dict[str, List[DocumentImpact]]:
+    """Rank the scenario's documents by how much each one drives every prediction."""
+
+    scores = inference_engine.leave_one_out(term_counts.stacked_counts(scenario_docs))
+    has_text = np.array([doc.has_text for doc in scenario_docs])
+    # Removing the only document with text leaves nothing to infer from.
+    remaining_available = has_text.sum() - has_text > 0
 
+    impacts: Dict[str, List[DocumentImpact]] = {}
+    for name, inference in predictions.items():
+        if name not in scores:
+            continue
+        classes, probabilities = scores[name]
+        class_idx = int(np.flatnonzero(classes.astype(str) == inference.predicted_value)[0])
+        ranked: List[DocumentImpact] = []
+        for row, doc in enumerate(scenario_docs):
+            if remaining_available[row]:
+                best_idx = int(np.argmax(probabilities[row]))
+                predicted_without: Optional[str] = str(classes[best_idx])
+                confidence_without = float(probabilities[row, best_idx])
+                probability_without = float(probabilities[row, class_idx])
+            else:
+                predicted_without, confidence_without, probability_without = None, 0.0, 0.0
+            ranked.append(
+                DocumentImpact(
+                    doc_id=doc.doc_id,
+                    doc_type=doc.doc_type,
+                    source_file=doc.source_file,
+                    predicted_value_without=predicted_without,
+                    confidence_without=confidence_without,
+                    impact=inference.confidence - probability_without,
+                    changes_prediction=predicted_without != inference.predicted_value,
+                )
+            )
+        ranked.sort(key=lambda item: item.impact, reverse=True)
+        impacts[name] = ranked
+    return impacts
@@ -1,30 +1,64 @@
 from __future__ import annotations
 
+import json
+import os
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-
-from backend.analysis import ScenarioDefinition, run_scenarios
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from backend.analysis import (
+    ScenarioDefinition,
+    iter_scenarios,
+    run_exposure_sweep,
+    run_scenarios,
+)
 from backend.domain.document import DocType, Document
-from backend.domain.store import DocumentStore
+from backend.domain.sqlite_store import SQLiteDocumentStore
 from backend.explanation import ExplanationEngine
-from backend.ingestion.file_ingestion import ingest_folder
-from backend.inference import InferenceEngine
+from backend.execution import Job, JobManager, JobPool, PoolClosed, PoolSaturated
+from backend.explanation.explainer import DEFAULT_CACHE_BYTES
+from backend.ingestion.cache import IngestionCache
+from backend.ingestion.file_ingestion import iter_document_batches, iter_ingest
+from backend.inference import ModelRegistry, TermCountIndex
+from backend.observability import CONTENT_TYPE, REGISTRY, collect_timings, stage
 from backend.schemas import (
+    AnalysisJobResponse,
     AnalysisRequest,
     AnalysisResponse,
     DocumentDetail,
     DocumentSummary,
     FolderIngestRequest,
     IngestResponse,
+    ScenarioResult,
+    SweepResponse,
+)
+from backend.sessions import (
+    DEFAULT_SESSION,
+    Session,
+    SessionLimitReached,
+    SessionManager,
+    SessionNotFound,
 )
+from backend.sessions.manager import SESSION_NAME_PATTERN
 
 
 BASE_DIR = Path(__file__).resolve().parent
-ARTIFACT_DIR = BASE_DIR / "models" / "artifacts"
+ARTIFACT_DIR = Path(
+    os.environ.get("CONSENTLENS_ARTIFACT_DIR", BASE_DIR / "models" / "artifacts")
+).expanduser()
+CACHE_DIR = Path(os.environ.get("CONSENTLENS_CACHE_DIR", "~/.cache/consentlens")).expanduser()
+SESSION_HEADER = "X-ConsentLens-Session"
+# "memory" keeps each session's documents in RAM; "sqlite" keeps them on disk
+# under STORE_DIR and loads texts on demand.
+STORE_BACKEND = os.environ.get("CONSENTLENS_STORE", "memory")
+STORE_DIR = Path(os.environ.get("CONSENTLENS_STORE_DIR", CACHE_DIR / "stores")).expanduser()
 
 DEFAULT_SCENARIOS = [
     ScenarioDefinition(name="emails_only", doc_types=[DocType.EMAIL]),
@@ -36,7 +70,43 @@ DEFAULT_SCENARIOS = [
     ),
 ]
 
-app = FastAPI(title="ConsentLens API", version="0.1.0")
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+# Ingest jobs rebuild a session's store, so by default they run one at a time,
+# and each session's ingest lock keeps streamed ingests (which hold a slot but run
+# on the request's thread) from interleaving with others on the same session.
+# PDF extraction inside a job still fans out over ``FolderIngestRequest.workers``
+# processes. Analyses only read shared state and run side by side.
+ingest_pool = JobPool(
+    "ingest",
+    max_workers=_env_int("CONSENTLENS_INGEST_JOBS", 1),
+    max_queue=_env_int("CONSENTLENS_INGEST_QUEUE", 2),
+)
+analysis_pool = JobPool(
+    "analysis",
+    max_workers=_env_int("CONSENTLENS_ANALYSIS_JOBS", os.cpu_count() or 1),
+    max_queue=_env_int("CONSENTLENS_ANALYSIS_QUEUE", 16),
+)
+# Documents ``/ingest`` reads before writing them to the session; each batch is
+# also one spaCy run, so small batches pay its process start-up more often.
+INGEST_BATCH_SIZE = _env_int("CONSENTLENS_INGEST_BATCH", 512)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    watch_seconds = _env_int("CONSENTLENS_MODEL_WATCH_SECONDS", 0)
+    if watch_seconds > 0:
+        model_registry.watch(watch_seconds)
+    yield
+    model_registry.stop()
+    ingest_pool.shutdown(wait=False)
+    analysis_pool.shutdown(wait=False)
+
+
+app = FastAPI(title="ConsentLens API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,85 +116,370 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-document_store = DocumentStore()
-inference_engine = InferenceEngine(ARTIFACT_DIR)
-explanation_engine = ExplanationEngine()
-
-
-def _summarize_documents(documents: List[Document], preview_length: int = 320) -> List[DocumentSummary]:
-    summaries: List[DocumentSummary] = []
-    for doc in documents:
-        preview = doc.clean_text[:preview_length] + ("…" if len(doc.clean_text) > preview_length else "")
-        summaries.append(
-            DocumentSummary(
-                doc_id=doc.doc_id,
-                doc_type=doc.doc_type,
-                source_file=doc.source_file,
-                preview=preview,
-            )
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "consentlens_http_request_duration_seconds",
+    "Time until each request's response headers were ready, by route template.",
+    ["method", "route", "status"],
+)
+
+
+@app.middleware("http")
+async def record_request_duration(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    started = time.perf_counter()
+    response = await call_next(request)
+    # The route template keeps ids such as /jobs/{job_id} from becoming label values.
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=route,
+        status=str(response.status_code),
+    )
+    return response
+
+
+model_registry = ModelRegistry(ARTIFACT_DIR)
+# Template for the per-session sentence caches; each session gets a fork of its own.
+explanation_engine = ExplanationEngine(
+    cache_bytes=int(os.environ.get("CONSENTLENS_SENTENCE_CACHE_BYTES", DEFAULT_CACHE_BYTES))
+)
+ingestion_cache = IngestionCache(CACHE_DIR / "ingest")
+sessions = SessionManager(
+    model_registry.active,
+    max_bytes=_env_int("CONSENTLENS_SESSION_BYTES", 2 * 1024 * 1024 * 1024),
+    max_sessions=_env_int("CONSENTLENS_MAX_SESSIONS", 64),
+    store_factory=(
+        (lambda name: SQLiteDocumentStore(STORE_DIR / f"{name}.sqlite3"))
+        if STORE_BACKEND == "sqlite"
+        else None
+    ),
+    explanation_engine=explanation_engine,
+)
+# Each session's term counts are tied to one model set; a reload gives every
+# session a fresh index while running requests keep the one they started with.
+model_registry.subscribe(sessions.use_engine)
+# The default session serves clients that do not name one; it is never evicted.
+default_session = sessions.get(DEFAULT_SESSION)
+document_store = default_session.store
+result_cache = default_session.result_cache
+analysis_jobs = JobManager(
+    analysis_pool,
+    ttl_seconds=_env_int("CONSENTLENS_JOB_TTL_SECONDS", 900),
+    max_bytes=_env_int("CONSENTLENS_JOB_RESULT_BYTES", 64 * 1024 * 1024),
+    sizeof=lambda result: len(result.model_dump_json()),
+)
+
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(_: Request, exc: PoolSaturated) -> JSONResponse:
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(PoolClosed)
+async def pool_closed_handler(_: Request, exc: PoolClosed) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.exception_handler(SessionNotFound)
+async def session_not_found_handler(_: Request, exc: SessionNotFound) -> JSONResponse:
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(SessionLimitReached)
+async def session_limit_handler(_: Request, exc: SessionLimitReached) -> JSONResponse:
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+def session_name(
+    session: Optional[str] = Query(None, description="Workspace to operate on."),
+    header_session: Optional[str] = Header(None, alias=SESSION_HEADER),
+) -> str:
+    """Resolve the request's session from the query string or header."""
+
+    name = session or header_session or DEFAULT_SESSION
+    if not SESSION_NAME_PATTERN.match(name):
+        raise HTTPException(status_code=400, detail="Invalid session name.")
+    return name
+
+
+def _summarize_documents(documents: List[Document]) -> List[DocumentSummary]:
+    return [
+        DocumentSummary(
+            doc_id=doc.doc_id,
+            doc_type=doc.doc_type,
+            source_file=doc.source_file,
+            preview=doc.preview,
         )
-    return summaries
+        for doc in documents
+    ]
 
 
 @app.get("/health")
-def healthcheck() -> dict:
+def healthcheck(name: str = Depends(session_name)) -> dict:
     """Simple readiness probe."""
 
+    with sessions.lease(name) as session:
+        documents_indexed = len(session.store)
+        analysis_cache = session.result_cache.stats()
+    session_stats = sessions.stats()
     return {
         "status": "ok",
-        "documents_indexed": len(document_store.all()),
-        "models_loaded": inference_engine.is_ready,
+        "documents_indexed": documents_indexed,
+        "models_loaded": model_registry.active.is_ready,
+        "model_version": model_registry.version,
+        "analysis_cache": analysis_cache,
+        "pools": {"ingest": ingest_pool.stats(), "analysis": analysis_pool.stats()},
+        "analysis_jobs": analysis_jobs.stats(),
+        "sessions": {
+            "count": len(session_stats["sessions"]),
+            "bytes": session_stats["bytes"],
+            "max_bytes": session_stats["max_bytes"],
+        },
     }
 
 
+@app.get("/metrics")
+def metrics() -> Response:
+    """Stage timings, ingestion and cache counters, and endpoint latencies for Prometheus."""
+
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/sessions")
+def list_sessions() -> dict:
+    """Report every live session with its document count and memory footprint."""
+
+    return sessions.stats()
+
+
+@app.delete("/sessions/{name}")
+def delete_session(name: str) -> dict:
+    """Drop a session and its caches; the default session is emptied instead."""
+
+    if not sessions.drop(name):
+        raise HTTPException(status_code=404, detail="Session not found.")
+    return {"deleted": name}
+
+
+@app.get("/models")
+def list_models() -> dict:
+    """Report the active model version and the versions served since startup."""
+
+    return {
+        "active": model_registry.version,
+        "versions": [
+            {
+                "version": entry.version,
+                "attributes": entry.attributes,
+                "loaded_at": entry.loaded_at.isoformat(),
+            }
+            for entry in model_registry.versions()
+        ],
+    }
+
+
+@app.post("/models/reload")
+async def reload_models(force: bool = Query(False)) -> dict:
+    """Load retrained artifacts and swap them in; running analyses finish on the old models."""
+
+    try:
+        changed = await analysis_pool.run(model_registry.reload, force)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"active": model_registry.version, "changed": changed}
+
+
 @app.post("/ingest", response_model=IngestResponse)
-def ingest(request: FolderIngestRequest) -> IngestResponse:
-    """Recursively ingest the requested folder."""
+async def ingest(request: FolderIngestRequest, name: str = Depends(session_name)) -> IngestResponse:
+    """Recursively ingest the requested folder on the ingest pool."""
 
-    documents = ingest_folder(Path(request.folder_path))
-    if not documents:
-        raise HTTPException(status_code=400, detail="No supported documents were found in that folder.")
-    document_store.replace_all(documents)
-    return IngestResponse(
-        document_count=len(documents),
-        doc_type_counts=document_store.counts_by_type(),
-        documents=_summarize_documents(documents),
+    return await ingest_pool.run(_ingest, request, name)
+
+
+def _ingest(request: FolderIngestRequest, name: str) -> IngestResponse:
+    batches = iter_document_batches(
+        Path(request.folder_path),
+        batch_size=INGEST_BATCH_SIZE,
+        workers=request.workers,
+        cache=ingestion_cache if request.use_cache else None,
+    )
+    with sessions.lease(name, create=True) as session, session.ingest_lock:
+        # Each batch is written to the store and indexed before the next is read,
+        # so an on-disk store never needs the whole corpus in memory.
+        summaries: List[DocumentSummary] = []
+        for batch in batches:
+            if not summaries:
+                session.store.replace_all(batch)
+                session.term_counts.replace_all(batch)
+            else:
+                session.store.add_many(batch)
+                session.term_counts.add(batch)
+            session.explanation.segment_documents(batch, n_process=request.workers)
+            summaries.extend(_summarize_documents(batch))
+        if not summaries:
+            raise HTTPException(status_code=400, detail="No supported documents were found in that folder.")
+        return IngestResponse(
+            document_count=len(summaries),
+            doc_type_counts=session.store.counts_by_type(),
+            documents=summaries,
+        )
+
+
+@app.post("/ingest/stream")
+def ingest_stream(
+    request: FolderIngestRequest,
+    name: str = Depends(session_name),
+) -> StreamingResponse:
+    """Ingest a folder while streaming newline-delimited JSON progress events.
+
+    The first readable document replaces the store's contents and every later
+    one is added as soon as it is read, so analysis can already run on the
+    partial corpus. A folder with no readable documents leaves the store as it
+    was. Events are ``document`` (summary plus running counts), ``error`` (a
+    skipped file) and a final ``done``.
+    """
+
+    folder_path = Path(request.folder_path).expanduser()
+    if not folder_path.exists():
+        raise HTTPException(status_code=400, detail="Folder not found.")
+    # Create the session before the response starts, so the session limit is
+    # reported as a 429 rather than as a stream that breaks off.
+    with sessions.lease(name, create=True):
+        pass
+    release = ingest_pool.acquire()
+
+    def events() -> Iterator[str]:
+        try:
+            with sessions.lease(name, create=True) as session, session.ingest_lock:
+                yield from _ingest_events(folder_path, request, session)
+        finally:
+            release()
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release),
     )
 
 
+def _ingest_events(
+    folder_path: Path,
+    request: FolderIngestRequest,
+    session: Session,
+) -> Iterator[str]:
+    counts: Dict[str, int] = {}
+    processed = failed = 0
+    outcomes = iter_ingest(
+        folder_path,
+        workers=request.workers,
+        cache=ingestion_cache if request.use_cache else None,
+    )
+    for outcome in outcomes:
+        if outcome.error is not None:
+            failed += 1
+            event = {
+                "event": "error",
+                "source_file": str(outcome.file_path),
+                "detail": outcome.error,
+                "processed": processed,
+                "failed": failed,
+            }
+        else:
+            document = outcome.document
+            if processed == 0:
+                session.store.replace_all([document])
+                session.term_counts.replace_all([document])
+            else:
+                session.store.add(document)
+                session.term_counts.add([document])
+            session.explanation.segment_documents([document])
+            processed += 1
+            counts[document.doc_type.value] = counts.get(document.doc_type.value, 0) + 1
+            event = {
+                "event": "document",
+                "document": _summarize_documents([document])[0].model_dump(mode="json"),
+                "processed": processed,
+                "failed": failed,
+                "doc_type_counts": counts,
+            }
+        yield json.dumps(event) + "\n"
+    yield json.dumps(
+        {
+            "event": "done",
+            "document_count": processed,
+            "failed": failed,
+            "doc_type_counts": counts,
+        }
+    ) + "\n"
+
+
 @app.get("/documents", response_model=List[DocumentSummary])
-def list_documents() -> List[DocumentSummary]:
+def list_documents(name: str = Depends(session_name)) -> List[DocumentSummary]:
     """Return a lightweight catalog of all ingested documents."""
 
-    return _summarize_documents(document_store.all())
+    with sessions.lease(name) as session:
+        return _summarize_documents(session.store.all())
 
 
 @app.get("/documents/{doc_id}", response_model=DocumentDetail)
-def get_document(doc_id: str) -> DocumentDetail:
+def get_document(doc_id: str, name: str = Depends(session_name)) -> DocumentDetail:
     """Return the raw + clean text for a single document."""
 
-    document = document_store.get(doc_id)
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found.")
-    preview = document.clean_text[:320] + ("…" if len(document.clean_text) > 320 else "")
-    return DocumentDetail(
-        doc_id=document.doc_id,
-        doc_type=document.doc_type,
-        source_file=document.source_file,
-        preview=preview,
-        raw_text=document.raw_text,
-        clean_text=document.clean_text,
-    )
+    with sessions.lease(name) as session:
+        document = session.store.get(doc_id)
+        if not document:
+            raise HTTPException(status_code=404, detail="Document not found.")
+        return DocumentDetail(
+            doc_id=document.doc_id,
+            doc_type=document.doc_type,
+            source_file=document.source_file,
+            preview=document.preview,
+            raw_text=document.raw_text,
+            clean_text=document.clean_text,
+        )
 
 
 @app.post("/analyze", response_model=AnalysisResponse)
-def analyze(request: AnalysisRequest) -> AnalysisResponse:
-    """Run attribute inference for the requested document sets."""
+async def analyze(request: AnalysisRequest, name: str = Depends(session_name)) -> AnalysisResponse:
+    """Run attribute inference for the requested document sets on the analysis pool."""
+
+    return await analysis_pool.run(_analyze, request, name)
+
+
+def _analyze(request: AnalysisRequest, name: str) -> AnalysisResponse:
+    with collect_timings() as timings:
+        with stage("analyze"), sessions.lease(name) as session:
+            term_counts = session.term_counts
+            store_version, documents, scenarios = _prepare_analysis(request, session, term_counts)
+            scenario_results = run_scenarios(
+                documents=documents,
+                scenarios=scenarios,
+                inference_engine=term_counts.engine,
+                explanation_engine=session.explanation,
+                **_scenario_options(request, session, store_version, term_counts),
+            )
 
-    documents = document_store.all()
+    return AnalysisResponse(
+        generated_at=datetime.utcnow(),
+        model_version=term_counts.engine.version,
+        scenarios=scenario_results,
+        timings=timings if request.include_timings else None,
+    )
+
+
+def _prepare_analysis(
+    request: AnalysisRequest,
+    session: Session,
+    term_counts: TermCountIndex,
+) -> Tuple[int, List[Document], List[ScenarioDefinition]]:
+    store_version = session.store.version
+    documents = session.store.all()
     if not documents:
         raise HTTPException(status_code=400, detail="Ingest documents before running analysis.")
-    if not inference_engine.is_ready:
+    if not term_counts.engine.is_ready:
         raise HTTPException(
             status_code=503,
             detail="Models are not available yet. Run backend/models/train_models.py first.",
@@ -138,17 +493,109 @@ def analyze(request: AnalysisRequest) -> AnalysisResponse:
         scenarios = [ScenarioDefinition(name="custom_selection", doc_types=doc_types)]
     else:
         scenarios = DEFAULT_SCENARIOS
+    return store_version, documents, scenarios
 
-    scenario_results = run_scenarios(
-        documents=documents,
-        scenarios=scenarios,
-        inference_engine=inference_engine,
-        explanation_engine=explanation_engine,
-        top_k_features=request.top_k_features,
-        max_supporting_sentences=request.max_supporting_sentences,
+
+def _scenario_options(
+    request: AnalysisRequest,
+    session: Session,
+    store_version: int,
+    term_counts: TermCountIndex,
+) -> Dict[str, Any]:
+    return {
+        "top_k_features": request.top_k_features,
+        "max_supporting_sentences": request.max_supporting_sentences,
+        "term_counts": term_counts,
+        "document_impacts": request.include_document_impacts,
+        "sentence_ranking": request.sentence_ranking,
+        "result_cache": session.result_cache,
+        "store_version": store_version,
+        "document_search": (
+            session.store.search if isinstance(session.store, SQLiteDocumentStore) else None
+        ),
+    }
+
+
+def _job_response(job: Job) -> AnalysisJobResponse:
+    return AnalysisJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        scenarios_total=job.total,
+        scenarios_completed=len(job.results),
+        scenarios=job.results,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
     )
 
-    return AnalysisResponse(generated_at=datetime.utcnow(), scenarios=scenario_results)
+
+@app.post("/jobs/analyze", response_model=AnalysisJobResponse, status_code=202)
+def submit_analysis_job(
+    request: AnalysisRequest,
+    name: str = Depends(session_name),
+) -> AnalysisJobResponse:
+    """Start an analysis in the background and return its job id for polling."""
+
+    with sessions.lease(name) as session:
+        _, _, scenarios = _prepare_analysis(request, session, session.term_counts)
+
+    def work() -> Iterator[ScenarioResult]:
+        # Resolve the documents under the job's own lease: the session may be
+        # evicted, closing the store they read from, while the job is queued.
+        with sessions.lease(name) as session:
+            term_counts = session.term_counts
+            store_version, documents, scenarios = _prepare_analysis(request, session, term_counts)
+            options = _scenario_options(request, session, store_version, term_counts)
+            yield from iter_scenarios(
+                documents, scenarios, term_counts.engine, session.explanation, **options
+            )
+
+    job = analysis_jobs.submit(work, total=len(scenarios))
+    return _job_response(job)
 
 
+@app.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+def get_analysis_job(job_id: str) -> AnalysisJobResponse:
+    """Report a job's progress and the scenario results finished so far."""
 
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return _job_response(job)
+
+
+@app.delete("/jobs/{job_id}", response_model=AnalysisJobResponse)
+def cancel_analysis_job(job_id: str) -> AnalysisJobResponse:
+    """Cancel a job after its current scenario; finished scenarios are kept."""
+
+    job = analysis_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return _job_response(job)
+
+
+@app.post("/analyze/sweep", response_model=SweepResponse)
+async def analyze_sweep(name: str = Depends(session_name)) -> SweepResponse:
+    """Score every non-empty combination of document types and each type's marginal risk."""
+
+    return await analysis_pool.run(_analyze_sweep, name)
+
+
+def _analyze_sweep(name: str) -> SweepResponse:
+    with sessions.lease(name) as session:
+        term_counts = session.term_counts
+        documents = session.store.all()
+        if not documents:
+            raise HTTPException(status_code=400, detail="Ingest documents before running analysis.")
+        if not term_counts.engine.is_ready:
+            raise HTTPException(
+                status_code=503,
+                detail="Models are not available yet. Run backend/models/train_models.py first.",
+            )
+
+        subsets, marginal_risk = run_exposure_sweep(documents, term_counts.engine, term_counts)
+    return SweepResponse(
+        generated_at=datetime.utcnow(),
+        subsets=subsets,
+        marginal_risk=marginal_risk,
+    )
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
 from enum import Enum
-from typing import Optional
+from typing import Optional, Union
+
+from .text import TextSpans
+
+PREVIEW_LENGTH = 320
 
 
 class DocType(str, Enum):
@@ -15,15 +19,79 @@ class DocType(str, Enum):
     OTHER = "other"
 
 
-@dataclass
 class Document:
-    """Normalized representation of a single ingested file."""
+    """Normalized representation of a single ingested file.
+
+    Only ``raw_text`` is held as a string. The clean view is kept as a
+    :class:`TextSpans` map into it whenever possible and rendered on access;
+    the preview shown in document listings is computed once up front.
+    """
+
+    def __init__(
+        self,
+        doc_id: str,
+        source_file: str,
+        doc_type: DocType,
+        raw_text: str,
+        clean_text: Union[str, TextSpans],
+        description: Optional[str] = None,
+    ) -> None:
+        self.doc_id = doc_id
+        self.source_file = source_file
+        self.doc_type = doc_type
+        self.raw_text = raw_text
+        self.description = description
+        if isinstance(clean_text, str):
+            self.has_text = bool(clean_text.strip())
+            clean_text = TextSpans.locate(raw_text, clean_text) or clean_text
+        else:
+            self.has_text = len(clean_text) > 0
+        self._clean: Union[str, TextSpans] = clean_text
+        self.preview = _preview(self._clean_prefix(PREVIEW_LENGTH + 1))
+
+    @property
+    def clean_text(self) -> str:
+        if isinstance(self._clean, TextSpans):
+            return self._clean.render(self.raw_text)
+        return self._clean
+
+    @property
+    def clean_spans(self) -> Optional[TextSpans]:
+        """The clean view as spans of ``raw_text``, if it is stored that way."""
+        return self._clean if isinstance(self._clean, TextSpans) else None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the texts and the preview."""
+        if isinstance(self._clean, TextSpans):
+            clean = self._clean.nbytes
+        else:
+            clean = sys.getsizeof(self._clean)
+        return sys.getsizeof(self.raw_text) + clean + sys.getsizeof(self.preview)
+
+    def _clean_prefix(self, length: int) -> str:
+        if isinstance(self._clean, TextSpans):
+            return self._clean.render(self.raw_text, limit=length)
+        return self._clean[:length]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Document):
+            return NotImplemented
+        return (
+            self.doc_id == other.doc_id
+            and self.source_file == other.source_file
+            and self.doc_type == other.doc_type
+            and self.raw_text == other.raw_text
+            and self.clean_text == other.clean_text
+            and self.description == other.description
+        )
 
-    doc_id: str
-    source_file: str
-    doc_type: DocType
-    raw_text: str
-    clean_text: str
-    description: Optional[str] = None
+    def __repr__(self) -> str:
+        return (
+            f"Document(doc_id={self.doc_id!r}, source_file={self.source_file!r},"
+            f" doc_type={self.doc_type!r})"
+        )
 
 
+def _preview(prefix: str) -> str:
+    return prefix[:PREVIEW_LENGTH] + ("…" if len(prefix) > PREVIEW_LENGTH else "")
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .document import DocType, Document
+
+WORD_PATTERN = re.compile(r"(?u)\w\w+")
+METADATA_QUERY = (
+    "SELECT doc_id, source_file, doc_type, description, preview, has_text FROM documents"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    doc_type TEXT NOT NULL,
+    description TEXT,
+    raw_text TEXT NOT NULL,
+    clean_text TEXT NOT NULL,
+    preview TEXT NOT NULL,
+    has_text INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_doc_type ON documents (doc_type);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    raw_text, content='documents', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, raw_text) VALUES (new.rowid, new.raw_text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, raw_text)
+    VALUES ('delete', old.rowid, old.raw_text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, raw_text)
+    VALUES ('delete', old.rowid, old.raw_text);
+    INSERT INTO documents_fts (rowid, raw_text) VALUES (new.rowid, new.raw_text);
+END;
+CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO store_meta VALUES ('version', 0);
+"""
+INSERT_QUERY = "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+class LazyDocument(Document):
+    """Document whose texts are read from its store on first access.
+
+    The preview and whether the document has any text come from their own
+    columns, so listings and analysis setup never touch the texts.
+    """
+
+    def __init__(
+        self,
+        store: "SQLiteDocumentStore",
+        doc_id: str,
+        source_file: str,
+        doc_type: DocType,
+        description: Optional[str],
+        preview: str,
+        has_text: bool,
+    ) -> None:
+        self.doc_id = doc_id
+        self.source_file = source_file
+        self.doc_type = doc_type
+        self.description = description
+        self.preview = preview
+        self.has_text = has_text
+        self._store = store
+        self._texts: Optional[Tuple[str, str]] = None
+
+    def _load(self) -> Tuple[str, str]:
+        if self._texts is None:
+            self._texts = self._store._load_texts(self.doc_id)
+        return self._texts
+
+    @property
+    def raw_text(self) -> str:
+        return self._load()[0]
+
+    @property
+    def clean_text(self) -> str:
+        return self._load()[1]
+
+    @property
+    def clean_spans(self) -> None:
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        if self._texts is None:
+            return sys.getsizeof(self.preview)
+        return sum(sys.getsizeof(text) for text in self._texts) + sys.getsizeof(self.preview)
+
+
+class SQLiteDocumentStore:
+    """Document registry on SQLite for corpora that do not fit in memory.
+
+    Only metadata is read when listing documents; texts are loaded per
+    document on first access. Type filters and counts use an index, and
+    :meth:`search` answers full-text queries through FTS5.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._version = self._query("SELECT value FROM store_meta WHERE key = 'version'")[0][0]
+
+    @property
+    def version(self) -> int:
+        """Monotonically increasing counter, bumped on every mutation.
+
+        Kept in the database, so it keeps increasing when a process reopens
+        the same file and never repeats a version another run already used.
+        """
+        return self._version
+
+    @property
+    def nbytes(self) -> int:
+        """Always 0: texts live on disk and only loaded documents hold them.
+
+        Loaded texts belong to the :class:`LazyDocument` that read them and are
+        freed with it, so session budgets only count the derived indexes.
+        """
+        return 0
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM documents")[0][0]
+
+    def replace_all(self, documents: Iterable[Document]) -> None:
+        """Replace the entire store with a new set of documents."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM documents")
+            self._connection.executemany(INSERT_QUERY, (_row(doc) for doc in documents))
+            self._bump_version()
+
+    def add(self, document: Document) -> None:
+        self.add_many([document])
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        """Add or replace several documents in one transaction."""
+        with self._lock, self._connection:
+            self._connection.executemany(INSERT_QUERY, (_row(doc) for doc in documents))
+            self._bump_version()
+
+    def all(self) -> List[Document]:
+        return self._documents(f"{METADATA_QUERY} ORDER BY rowid")
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        documents = self._documents(f"{METADATA_QUERY} WHERE doc_id = ?", (doc_id,))
+        return documents[0] if documents else None
+
+    def filter_by_types(self, doc_types: Iterable[DocType]) -> List[Document]:
+        values = sorted({DocType(dt).value for dt in doc_types})
+        placeholders = ", ".join("?" for _ in values)
+        return self._documents(
+            f"{METADATA_QUERY} WHERE doc_type IN ({placeholders}) ORDER BY rowid",
+            values,
+        )
+
+    def counts_by_type(self) -> Dict[str, int]:
+        rows = self._query("SELECT doc_type, COUNT(*) FROM documents GROUP BY doc_type")
+        return {doc_type: count for doc_type, count in rows}
+
+    def search(self, terms: Sequence[str]) -> Optional[Set[str]]:
+        """Ids of documents containing every token of at least one term.
+
+        Results are a superset of the documents whose sentences match a term,
+        so callers can use them to skip documents. Returns ``None`` when some
+        term has no word token and FTS cannot answer for it.
+        """
+
+        clauses = []
+        for term in terms:
+            tokens = WORD_PATTERN.findall(term)
+            if not tokens:
+                return None
+            clauses.append(
+                "(" + " AND ".join('"' + token.replace('"', '""') + '"' for token in tokens) + ")"
+            )
+        if not clauses:
+            return set()
+        rows = self._query(
+            "SELECT documents.doc_id FROM documents_fts"
+            " JOIN documents ON documents.rowid = documents_fts.rowid"
+            " WHERE documents_fts MATCH ?",
+            (" OR ".join(clauses),),
+        )
+        return {doc_id for (doc_id,) in rows}
+
+    def close(self) -> None:
+        """Close the database connection; the store cannot be used afterwards."""
+        with self._lock:
+            self._connection.close()
+
+    def _bump_version(self) -> None:
+        # Runs inside the mutation's transaction, so the stored version moves with the rows.
+        self._connection.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'version'")
+        self._version += 1
+
+    def _load_texts(self, doc_id: str) -> Tuple[str, str]:
+        rows = self._query("SELECT raw_text, clean_text FROM documents WHERE doc_id = ?", (doc_id,))
+        if not rows:
+            raise KeyError(doc_id)
+        return rows[0]
+
+    def _documents(self, sql: str, params: Sequence[object] = ()) -> List[Document]:
+        return [
+            LazyDocument(self, doc_id, source, DocType(doc_type), description, preview, bool(text))
+            for doc_id, source, doc_type, description, preview, text in self._query(sql, params)
+        ]
+
+    def _query(self, sql: str, params: Sequence[object] = ()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+
+def _row(document: Document) -> tuple:
+    return (
+        document.doc_id,
+        document.source_file,
+        document.doc_type.value,
+        document.description,
+        document.raw_text,
+        document.clean_text,
+        document.preview,
+        int(document.has_text),
+    )
+
+
+__all__ = ["LazyDocument", "SQLiteDocumentStore"]
@@ -10,13 +10,40 @@ class DocumentStore:
 
     def __init__(self) -> None:
         self._documents: Dict[str, Document] = {}
+        self._version = 0
+        self._nbytes = 0
+
+    @property
+    def version(self) -> int:
+        """Monotonically increasing counter, bumped on every mutation."""
+        return self._version
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the stored documents' texts."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._documents)
 
     def replace_all(self, documents: Iterable[Document]) -> None:
         """Replace the entire store with a new set of documents."""
         self._documents = {doc.doc_id: doc for doc in documents}
+        self._nbytes = sum(doc.nbytes for doc in self._documents.values())
+        self._version += 1
 
     def add(self, document: Document) -> None:
+        previous = self._documents.get(document.doc_id)
+        if previous is not None:
+            self._nbytes -= previous.nbytes
         self._documents[document.doc_id] = document
+        self._nbytes += document.nbytes
+        self._version += 1
+
+    def add_many(self, documents: Iterable[Document]) -> None:
+        """Add or replace several documents."""
+        for document in documents:
+            self.add(document)
 
     def all(self) -> List[Document]:
         return list(self._documents.values())
@@ -34,4 +61,3 @@ class DocumentStore:
             counts[doc.doc_type.value] = counts.get(doc.doc_type.value, 0) + 1
         return counts
 
-
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+Segment = Tuple[int, int]
+
+
+class TextSpans:
+    """Run-length map describing a derived view of a source string.
+
+    Each row ``(start, end)`` stands for ``source[start:end]``; a row with
+    ``start == -1`` stands for ``end`` spaces that do not occur in the source.
+    Views that mostly keep the source, such as cleaned text, need only a few
+    rows instead of a second copy of the text.
+    """
+
+    __slots__ = ("spans", "length")
+
+    def __init__(self, spans: np.ndarray) -> None:
+        self.spans = spans
+        starts, ends = spans[:, 0], spans[:, 1]
+        self.length = int(np.where(starts < 0, ends, ends - starts).sum()) if len(spans) else 0
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[Segment]) -> "TextSpans":
+        return cls(np.asarray(segments, dtype=np.int64).reshape(-1, 2))
+
+    @classmethod
+    def locate(cls, source: str, text: str) -> Optional["TextSpans"]:
+        """Map ``text`` onto ``source`` if it occurs there as one contiguous slice."""
+
+        start = source.find(text)
+        if start < 0:
+            return None
+        return cls.from_segments([(start, start + len(text))] if text else [])
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TextSpans) and np.array_equal(self.spans, other.spans)
+
+    @property
+    def nbytes(self) -> int:
+        return self.spans.nbytes
+
+    def render(self, source: str, limit: Optional[int] = None) -> str:
+        """Materialize the view, or only its first ``limit`` characters."""
+
+        pieces: List[str] = []
+        remaining = self.length if limit is None else min(limit, self.length)
+        for start, end in self.spans.tolist():
+            if remaining <= 0:
+                break
+            piece = " " * end if start < 0 else source[start:end]
+            pieces.append(piece[:remaining])
+            remaining -= len(piece)
+        return "".join(pieces)
+
+    def to_list(self) -> List[List[int]]:
+        return self.spans.tolist()
+
+
+class TrackedText:
+    """Text transformed step by step while remembering where each character came from.
+
+    Every step runs on the materialized intermediate text, so the result is
+    exactly what the equivalent ``re.sub`` / ``strip`` chain produces, and
+    :meth:`spans` maps it back onto the original source.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.text = source
+        self._segments: List[Segment] = [(0, len(source))] if source else []
+        self._offsets: List[int] = [0] if source else []
+
+    def sub(
+        self,
+        pattern: re.Pattern[str],
+        keep: Callable[[re.Match[str]], Union[Segment, str, None]],
+    ) -> None:
+        """Replace every match of ``pattern`` by what ``keep`` returns for it.
+
+        ``keep`` returns a ``(start, end)`` slice of the match to keep, a string
+        of spaces to insert, or ``None`` to delete the match.
+        """
+
+        segments: List[Segment] = []
+        position = 0
+        for match in pattern.finditer(self.text):
+            segments.extend(self._slice(position, match.start()))
+            kept = keep(match)
+            if isinstance(kept, str):
+                if kept:
+                    segments.append((-1, len(kept)))
+            elif kept is not None:
+                segments.extend(self._slice(match.start() + kept[0], match.start() + kept[1]))
+            position = match.end()
+        segments.extend(self._slice(position, len(self.text)))
+        self._update(segments)
+
+    def strip(self) -> None:
+        start = len(self.text) - len(self.text.lstrip())
+        end = len(self.text.rstrip())
+        self._update(self._slice(start, max(start, end)))
+
+    def spans(self) -> TextSpans:
+        return TextSpans.from_segments(self._segments)
+
+    def _slice(self, start: int, end: int) -> List[Segment]:
+        """Source segments covering ``self.text[start:end]``."""
+
+        if start >= end:
+            return []
+        pieces: List[Segment] = []
+        index = bisect_right(self._offsets, start) - 1
+        while index < len(self._segments) and self._offsets[index] < end:
+            seg_start, seg_end = self._segments[index]
+            seg_length = seg_end if seg_start < 0 else seg_end - seg_start
+            offset = self._offsets[index]
+            lo = max(start, offset) - offset
+            hi = min(end, offset + seg_length) - offset
+            pieces.append((-1, hi - lo) if seg_start < 0 else (seg_start + lo, seg_start + hi))
+            index += 1
+        return pieces
+
+    def _update(self, segments: List[Segment]) -> None:
+        merged: List[Segment] = []
+        for start, end in segments:
+            if merged:
+                last_start, last_end = merged[-1]
+                if start >= 0 and last_start >= 0 and last_end == start:
+                    merged[-1] = (last_start, end)
+                    continue
+                if start < 0 and last_start < 0:
+                    merged[-1] = (-1, last_end + end)
+                    continue
+            merged.append((start, end))
+        self._segments = merged
+        lengths = [end if start < 0 else end - start for start, end in merged]
+        self._offsets = [0, *accumulate(lengths)][:-1] if merged else []
+        self.text = TextSpans.from_segments(merged).render(self.source)
+
+
+__all__ = ["TextSpans", "TrackedText"]
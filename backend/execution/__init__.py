@@ -0,0 +1,6 @@
+"""Execution layer for CPU-bound request work."""
+
+from .jobs import Job, JobManager
+from .pool import JobPool, PoolClosed, PoolSaturated
+
+__all__ = ["Job", "JobManager", "JobPool", "PoolClosed", "PoolSaturated"]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import uuid4
+
+from .pool import JobPool
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = frozenset({COMPLETED, FAILED, CANCELLED})
+
+
+@dataclass
+class Job:
+    """State of one background job; results grow as the work yields them."""
+
+    job_id: str
+    total: int
+    status: str = QUEUED
+    results: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    nbytes: int = 0
+
+
+class JobManager:
+    """Runs iterable jobs on a :class:`JobPool` and keeps their results for polling.
+
+    Work is any callable returning an iterable; each yielded item is appended
+    to the job's results as it arrives. Cancellation is cooperative and takes
+    effect before the next item. Finished jobs are kept for ``ttl_seconds``.
+    Results count against ``max_bytes`` (as measured by ``sizeof``) as soon as
+    they are yielded, running jobs included; once over, finished jobs are
+    evicted oldest first. Running jobs are never evicted, so they can keep the
+    total above the cap until they finish.
+    """
+
+    def __init__(
+        self,
+        pool: JobPool,
+        ttl_seconds: float = 900.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        sizeof: Callable[[Any], int] = lambda _: 0,
+    ) -> None:
+        self._pool = pool
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._cancelled: Dict[str, threading.Event] = {}
+        self._finished: OrderedDict[str, float] = OrderedDict()
+        self._retained_bytes = 0
+
+    def submit(self, work: Callable[[], Iterable[Any]], total: int) -> Job:
+        """Queue ``work``; raises :class:`PoolSaturated` when the pool is full."""
+
+        job = Job(job_id=uuid4().hex, total=total)
+        with self._lock:
+            self._purge()
+            self._jobs[job.job_id] = job
+            self._cancelled[job.job_id] = threading.Event()
+        try:
+            self._pool.submit(self._run, job, work)
+        except BaseException:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+                self._cancelled.pop(job.job_id, None)
+            raise
+        return self.get(job.job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a snapshot of the job, or ``None`` if it is unknown or expired."""
+
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            return replace(job, results=list(job.results)) if job else None
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Stop the job before its next result; results so far are kept."""
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status not in FINISHED_STATES:
+                self._cancelled[job_id].set()
+                self._finish(job, CANCELLED)
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._purge()
+            active = sum(job.status not in FINISHED_STATES for job in self._jobs.values())
+            return {
+                "active": active,
+                "retained": len(self._finished),
+                "retained_bytes": self._retained_bytes,
+            }
+
+    def _run(self, job: Job, work: Callable[[], Iterable[Any]]) -> None:
+        with self._lock:
+            cancelled = self._cancelled.get(job.job_id)
+            if cancelled is None or cancelled.is_set():
+                return
+            job.status = RUNNING
+        try:
+            for item in work():
+                size = self._sizeof(item)
+                with self._lock:
+                    if cancelled.is_set():
+                        return
+                    job.results.append(item)
+                    job.nbytes += size
+                    self._retained_bytes += size
+                    self._evict_over_budget()
+        except Exception as exc:  # noqa: BLE001 - reported through the job status
+            with self._lock:
+                if not cancelled.is_set():
+                    job.error = str(exc) or type(exc).__name__
+                    self._finish(job, FAILED)
+            return
+        with self._lock:
+            if not cancelled.is_set():
+                self._finish(job, COMPLETED)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        self._finished[job.job_id] = time.monotonic()
+        self._evict_over_budget()
+
+    def _purge(self) -> None:
+        deadline = time.monotonic() - self._ttl_seconds
+        while self._finished:
+            job_id, finished = next(iter(self._finished.items()))
+            if finished > deadline:
+                break
+            self._drop(job_id)
+
+    def _evict_over_budget(self) -> None:
+        while self._retained_bytes > self._max_bytes and len(self._finished) > 1:
+            self._drop(next(iter(self._finished)))
+
+    def _drop(self, job_id: str) -> None:
+        self._finished.pop(job_id, None)
+        self._cancelled.pop(job_id, None)
+        job = self._jobs.pop(job_id, None)
+        if job is not None:
+            self._retained_bytes -= job.nbytes
+
+
+__all__ = ["Job", "JobManager"]
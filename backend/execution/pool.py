@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolSaturated(RuntimeError):
+    """Raised when a pool already holds as many jobs as it admits."""
+
+
+class PoolClosed(RuntimeError):
+    """Raised when work is submitted to a pool that is shutting down."""
+
+
+class JobPool:
+    """Bounded executor with admission control for heavy request work.
+
+    At most ``max_workers`` jobs run at once and up to ``max_queue`` more may
+    wait; beyond that new jobs are rejected with :class:`PoolSaturated`
+    instead of piling up. Jobs run on threads because they read and update
+    in-process state (stores, caches); CPU-heavy steps inside them fan out
+    to processes themselves.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max(max_workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._rejected = 0
+        self._closed = False
+
+    def acquire(self) -> Callable[[], None]:
+        """Take one admission slot and return an idempotent release callback."""
+
+        with self._lock:
+            if self._closed:
+                raise PoolClosed(f"{self.name} pool is shutting down.")
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated(f"{self.name} pool is at capacity.")
+            self._admitted += 1
+        released = threading.Event()
+
+        def release() -> None:
+            with self._lock:
+                if not released.is_set():
+                    released.set()
+                    self._admitted -= 1
+
+        return release
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """Admit ``fn`` and schedule it; the slot is released when it finishes."""
+
+        release = self.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            release()
+            raise
+        future.add_done_callback(lambda _: release())
+        return future
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn`` on the pool without blocking the event loop.
+
+        The slot is released when ``fn`` finishes rather than when the caller
+        stops waiting, so a cancelled request still counts until its work ends.
+        """
+
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            admitted = self._admitted
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(admitted, self.max_workers),
+            "queued": max(admitted - self.max_workers, 0),
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+__all__ = ["JobPool", "PoolClosed", "PoolSaturated"]
@@ -1,70 +1,376 @@
 from __future__ import annotations
 
+import re
+import threading
 from collections import OrderedDict
-from typing import Iterable, List
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+import numpy as np
+import scipy.sparse as sp
 import spacy
 
 from backend.domain.document import Document
+from backend.inference import InferenceEngine
+from backend.observability import REGISTRY, stage
 from backend.schemas import SupportingSentence
 
 
+# Same token definition as scikit-learn's default vectorizer token_pattern.
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+SENTENCE_CACHE_HITS = REGISTRY.counter(
+    "consentlens_sentence_cache_hits", "Sentence index lookups served from the cache."
+)
+SENTENCE_CACHE_MISSES = REGISTRY.counter(
+    "consentlens_sentence_cache_misses", "Sentence index lookups that segmented the document."
+)
+
+
+@dataclass
+class SentenceIndex:
+    """Sentence boundaries of one document plus a token -> sentence-id postings index.
+
+    Sentences are an (n, 2) array of character offsets into the document's
+    raw text; the text itself is not kept, so callers pass it back in. The
+    postings are in CSR form: ``token_ids`` holds the sorted ``hash()`` of
+    every distinct lowercased token, and the sentences containing token ``i``
+    are ``sentence_ids[indptr[i]:indptr[i + 1]]``. Indexes never leave the
+    process, so the per-process string hash is a stable token id.
+    """
+
+    spans: np.ndarray
+    token_ids: np.ndarray
+    indptr: np.ndarray
+    sentence_ids: np.ndarray
+    vectors: Dict[str, sp.csr_matrix] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, text: str, spans: np.ndarray) -> "SentenceIndex":
+        hashes: List[int] = []
+        owners: List[int] = []
+        for sentence_id, (start, end) in enumerate(spans):
+            tokens = set(TOKEN_PATTERN.findall(text[start:end].lower()))
+            hashes.extend(hash(token) for token in tokens)
+            owners.extend([sentence_id] * len(tokens))
+        token_hashes = np.array(hashes, dtype=np.int64)
+        sentence_ids = np.array(owners, dtype=np.int32)
+        order = np.lexsort((sentence_ids, token_hashes))
+        token_hashes, sentence_ids = token_hashes[order], sentence_ids[order]
+        token_ids, starts = np.unique(token_hashes, return_index=True)
+        indptr = np.append(starts, len(token_hashes)).astype(np.int32)
+        return cls(spans=spans, token_ids=token_ids, indptr=indptr, sentence_ids=sentence_ids)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def sentence(self, text: str, sentence_id: int) -> str:
+        start, end = self.spans[sentence_id]
+        return text[start:end]
+
+    def sentences(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.spans]
+
+    def postings(self, token: str) -> Optional[np.ndarray]:
+        """Ids of the sentences containing ``token``, in document order."""
+
+        token_id = hash(token)
+        position = int(np.searchsorted(self.token_ids, token_id))
+        if position == len(self.token_ids) or self.token_ids[position] != token_id:
+            return None
+        return self.sentence_ids[self.indptr[position] : self.indptr[position + 1]]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index's arrays and cached sentence vectors."""
+
+        vector_bytes = sum(
+            matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            for matrix in self.vectors.values()
+        )
+        arrays = (self.spans, self.token_ids, self.indptr, self.sentence_ids)
+        return sum(array.nbytes for array in arrays) + vector_bytes
+
+    def matching(self, text: str, terms: Sequence[str]) -> List[int]:
+        """Ids of sentences containing any of the lowercased ``terms``, in document order.
+
+        Each term is looked up through the postings of its rarest token and the
+        few candidates are then checked for the exact n-gram, so terms match
+        whole tokens only. Terms without any token fall back to a scan.
+        """
+
+        matches = set()
+        for term in terms:
+            tokens = set(TOKEN_PATTERN.findall(term))
+            if not tokens:
+                matches.update(
+                    idx for idx in range(len(self)) if term in self.sentence(text, idx).lower()
+                )
+                continue
+            token_postings = [self.postings(token) for token in tokens]
+            if any(postings is None for postings in token_postings):
+                continue
+            candidates = min(token_postings, key=len).tolist()
+            if len(tokens) == 1 and term in tokens:
+                matches.update(candidates)
+            else:
+                matches.update(
+                    idx for idx in candidates if term in self.sentence(text, idx).lower()
+                )
+        return sorted(matches)
+
+
+def _sentence_spans(doc: Any) -> np.ndarray:
+    """Whitespace-trimmed (start, end) character offsets of a spaCy doc's sentences."""
+
+    spans: List[Tuple[int, int]] = []
+    for sent in doc.sents:
+        text = sent.text
+        stripped = text.strip()
+        if not stripped:
+            continue
+        start = sent.start_char + (len(text) - len(text.lstrip()))
+        spans.append((start, start + len(stripped)))
+    dtype = np.int32 if len(doc.text) < np.iinfo(np.int32).max else np.int64
+    return np.array(spans, dtype=dtype).reshape(-1, 2)
+
+
 class ExplanationEngine:
-    """Maps model features back to human-friendly supporting sentences."""
+    """Maps model features back to human-friendly supporting sentences.
+
+    Sentence indexes are kept in an LRU bounded by ``cache_bytes`` of derived
+    data. :meth:`segment_documents` fills it at ingest time so segmentation
+    stays off the ``/analyze`` path. :meth:`fork` gives each corpus its own
+    cache while the spaCy pipeline is shared.
+    """
+
+    def __init__(
+        self,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        batch_size: int = 64,
+        nlp: Optional[Any] = None,
+    ) -> None:
+        if nlp is None:
+            nlp = spacy.blank("en")
+            nlp.add_pipe("sentencizer")
+        self._nlp = nlp
+        self._sentence_cache: OrderedDict[str, SentenceIndex] = OrderedDict()
+        self._entry_bytes: Dict[str, int] = {}
+        self._cache_bytes = cache_bytes
+        self._cached_bytes = 0
+        self._batch_size = batch_size
+        self._lock = threading.RLock()
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._cached_bytes
+
+    def fork(self) -> "ExplanationEngine":
+        """An engine with the same settings and pipeline but an empty cache of its own."""
 
-    def __init__(self, cache_size: int = 256) -> None:
-        self._nlp = spacy.blank("en")
-        if "sentencizer" not in self._nlp.pipe_names:
-            self._nlp.add_pipe("sentencizer")
-        self._sentence_cache: OrderedDict[str, List[str]] = OrderedDict()
-        self._cache_size = cache_size
+        return ExplanationEngine(self._cache_bytes, self._batch_size, nlp=self._nlp)
 
-    def _cache_sentences(self, key: str, sentences: List[str]) -> None:
-        self._sentence_cache[key] = sentences
-        self._sentence_cache.move_to_end(key)
-        if len(self._sentence_cache) > self._cache_size:
-            self._sentence_cache.popitem(last=False)
+    def clear(self) -> None:
+        """Drop every cached sentence index."""
+
+        with self._lock:
+            self._sentence_cache.clear()
+            self._entry_bytes.clear()
+            self._cached_bytes = 0
+
+    def drop_vectors(self) -> None:
+        """Forget the cached sentence vectors but keep the segmentation.
+
+        Vectors are keyed by model group, and a reloaded model set never
+        reuses those keys, so they would only hold memory after a swap.
+        Requests still running keep the vectors they already looked up.
+        """
+
+        with self._lock:
+            for key, index in self._sentence_cache.items():
+                index.vectors = {}
+                size = index.nbytes
+                self._cached_bytes += size - self._entry_bytes[key]
+                self._entry_bytes[key] = size
+
+    def _cache_sentences(self, key: str, index: SentenceIndex) -> None:
+        """Insert or re-measure ``key`` and evict least recently used entries over budget."""
+
+        with self._lock:
+            self._sentence_cache[key] = index
+            self._sentence_cache.move_to_end(key)
+            size = index.nbytes
+            self._cached_bytes += size - self._entry_bytes.get(key, 0)
+            self._entry_bytes[key] = size
+            while self._cached_bytes > self._cache_bytes and len(self._sentence_cache) > 1:
+                evicted, _ = self._sentence_cache.popitem(last=False)
+                self._cached_bytes -= self._entry_bytes.pop(evicted)
+
+    @stage("explanation.segment")
+    def segment_documents(
+        self,
+        documents: Iterable[Document],
+        n_process: int = 1,
+    ) -> None:
+        """Segment every uncached document with ``nlp.pipe`` and cache its index.
+
+        Intended for ingest time; ``n_process > 1`` spreads segmentation over
+        worker processes. Documents beyond the byte budget are evicted again
+        and re-segmented lazily if an analysis needs them.
+        """
+
+        pending = [doc for doc in documents if doc.doc_id not in self._sentence_cache]
+        if not pending:
+            return
+        docs = self._nlp.pipe(
+            (doc.raw_text for doc in pending),
+            batch_size=self._batch_size,
+            n_process=n_process,
+        )
+        for document, spacy_doc in zip(pending, docs):
+            index = SentenceIndex.build(document.raw_text, _sentence_spans(spacy_doc))
+            self._cache_sentences(document.doc_id, index)
+
+    def sentence_index(self, doc_id: str, text: str) -> SentenceIndex:
+        """Return the cached sentence index for a document, building it on demand."""
+
+        with self._lock:
+            cached = self._sentence_cache.get(doc_id)
+            if cached is not None:
+                self._sentence_cache.move_to_end(doc_id)
+                SENTENCE_CACHE_HITS.inc()
+                return cached
+        SENTENCE_CACHE_MISSES.inc()
+        index = SentenceIndex.build(text, _sentence_spans(self._nlp(text)))
+        self._cache_sentences(doc_id, index)
+        return index
 
     def sentences_for_document(self, doc_id: str, text: str) -> List[str]:
         """Return cached sentences for a document, computing them on demand."""
 
-        if doc_id in self._sentence_cache:
-            self._sentence_cache.move_to_end(doc_id)
-            return self._sentence_cache[doc_id]
-        doc = self._nlp(text)
-        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-        self._cache_sentences(doc_id, sentences)
-        return sentences
+        return self.sentence_index(doc_id, text).sentences(text)
 
+    @stage("explanation.supporting_sentences")
     def collect_supporting_sentences(
         self,
         documents: Iterable[Document],
         feature_terms: Iterable[str],
         limit: int = 3,
+        search: Optional[Callable[[Sequence[str]], Optional[Set[str]]]] = None,
     ) -> List[SupportingSentence]:
-        """Return the first `limit` sentences that contain any of the feature terms."""
+        """Return the first `limit` sentences that contain any of the feature terms.
+
+        Matching goes through each document's postings index, so only sentences
+        that share a token with some term are ever inspected. ``search`` maps
+        the terms to a superset of the ids of documents that can match (e.g. a
+        full-text index); other documents are skipped without being segmented.
+        """
 
         normalized_terms = [term.lower() for term in feature_terms if term]
         if not normalized_terms:
             return []
+        if search is not None:
+            candidates = search(normalized_terms)
+            if candidates is not None:
+                documents = [doc for doc in documents if doc.doc_id in candidates]
 
         hits: List[SupportingSentence] = []
         seen_keys = set()
 
         for doc in documents:
-            sentences = self.sentences_for_document(doc.doc_id, doc.raw_text)
-            for sentence in sentences:
+            text = doc.raw_text
+            index = self.sentence_index(doc.doc_id, text)
+            for sentence_id in index.matching(text, normalized_terms):
+                sentence = index.sentence(text, sentence_id)
                 sentence_key = (doc.doc_id, sentence)
                 if sentence_key in seen_keys:
                     continue
-                lower_sentence = sentence.lower()
-                if any(term in lower_sentence for term in normalized_terms):
-                    hits.append(
-                        SupportingSentence(doc_id=doc.doc_id, doc_type=doc.doc_type, text=sentence)
-                    )
-                    seen_keys.add(sentence_key)
-                    if len(hits) >= limit:
-                        return hits
+                hits.append(
+                    SupportingSentence(doc_id=doc.doc_id, doc_type=doc.doc_type, text=sentence)
+                )
+                seen_keys.add(sentence_key)
+                if len(hits) >= limit:
+                    return hits
+        return hits
+
+    @stage("explanation.supporting_sentences")
+    def rank_supporting_sentences(
+        self,
+        documents: Iterable[Document],
+        inference_engine: InferenceEngine,
+        attribute: str,
+        predicted_value: str,
+        limit: int = 3,
+    ) -> List[SupportingSentence]:
+        """Return the `limit` sentences contributing most to ``predicted_value``.
+
+        Every sentence in the documents is TF-IDF vectorized with the
+        attribute's vectorizer and scored by its dot product with the class's
+        coefficient row. Sentence vectors are cached per document and
+        vectorizer, and the uncached documents are vectorized in one batch.
+        """
+
+        documents = list(documents)
+        key = inference_engine.featurizer_key(attribute)
+        indexes = [self.sentence_index(doc.doc_id, doc.raw_text) for doc in documents]
+        # Looked up once, as :meth:`drop_vectors` may empty the indexes meanwhile.
+        vectors = [index.vectors.get(key) for index in indexes]
+
+        missing = [
+            position
+            for position, index in enumerate(indexes)
+            if vectors[position] is None and len(index)
+        ]
+        if missing:
+            matrix = inference_engine.vectorize(
+                attribute,
+                [
+                    sentence
+                    for position in missing
+                    for sentence in indexes[position].sentences(documents[position].raw_text)
+                ],
+            )
+            offset = 0
+            for position in missing:
+                doc, index = documents[position], indexes[position]
+                vectors[position] = index.vectors[key] = matrix[offset : offset + len(index)]
+                offset += len(index)
+                if doc.doc_id in self._sentence_cache:
+                    self._cache_sentences(doc.doc_id, index)
+
+        owners: List[Tuple[Document, SentenceIndex, sp.csr_matrix]] = [
+            (doc, index, matrix)
+            for doc, index, matrix in zip(documents, indexes, vectors)
+            if len(index)
+        ]
+        if not owners:
+            return []
+        stacked = sp.vstack([matrix for _, _, matrix in owners], format="csr")
+        scores = stacked @ inference_engine.class_weights(attribute, predicted_value)
+        sentence_refs = [
+            (doc, index, sentence_id)
+            for doc, index, _ in owners
+            for sentence_id in range(len(index))
+        ]
+
+        hits: List[SupportingSentence] = []
+        seen_keys = set()
+        # Stable sort keeps document order among equally scored sentences.
+        for position in np.argsort(-scores, kind="stable"):
+            if scores[position] <= 0:
+                break
+            doc, index, sentence_id = sentence_refs[position]
+            sentence = index.sentence(doc.raw_text, sentence_id)
+            sentence_key = (doc.doc_id, sentence)
+            if sentence_key in seen_keys:
+                continue
+            hits.append(SupportingSentence(doc_id=doc.doc_id, doc_type=doc.doc_type, text=sentence))
+            seen_keys.add(sentence_key)
+            if len(hits) >= limit:
+                break
         return hits
 
 
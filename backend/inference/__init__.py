@@ -1,6 +1,17 @@
 """Prediction utilities."""
 
+from .registry import ModelRegistry, ModelVersion
 from .service import AttributeInference, InferenceEngine
+from .term_counts import TermCountIndex
+from .verification import compare_engines
+from .weights import LinearWeights
 
-__all__ = ["AttributeInference", "InferenceEngine"]
-
+__all__ = [
+    "AttributeInference",
+    "InferenceEngine",
+    "LinearWeights",
+    "ModelRegistry",
+    "ModelVersion",
+    "TermCountIndex",
+    "compare_engines",
+]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+def tfidf_weight(
+    counts: sp.spmatrix,
+    idf: Optional[np.ndarray],
+    norm: Optional[str],
+    sublinear_tf: bool = False,
+) -> sp.csr_matrix:
+    """Apply TF-IDF weighting and normalization to raw term counts."""
+
+    vectors = sp.csr_matrix(counts, dtype=np.float64, copy=True)
+    if sublinear_tf:
+        np.log(vectors.data, vectors.data)
+        vectors.data += 1
+    if idf is not None:
+        vectors = vectors @ sp.diags(idf)
+    if norm:
+        vectors = normalize(vectors, norm=norm, copy=False)
+    return vectors.tocsr()
+
+
+class HashingTfidf:
+    """TF-IDF on top of a stateless :class:`HashingVectorizer`.
+
+    Exposes the parts of :class:`TfidfVectorizer` the inference engine uses,
+    so hashed models stack into a model group like vocabulary-based ones.
+    ``hashing`` must produce raw counts (``norm=None``, ``alternate_sign=False``).
+    """
+
+    def __init__(
+        self,
+        hashing: HashingVectorizer,
+        idf: Optional[np.ndarray],
+        norm: Optional[str] = "l2",
+        sublinear_tf: bool = False,
+    ) -> None:
+        if hashing.norm is not None or hashing.alternate_sign:
+            raise ValueError("The hashing vectorizer must produce raw, unsigned counts.")
+        self.hashing = hashing
+        self.idf_ = idf
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+
+    @property
+    def use_idf(self) -> bool:
+        return self.idf_ is not None
+
+    @property
+    def n_features(self) -> int:
+        return self.hashing.n_features
+
+    def count(self, texts: Sequence[str]) -> sp.csr_matrix:
+        return self.hashing.transform(texts).tocsr()
+
+    def transform(self, texts: Sequence[str]) -> sp.csr_matrix:
+        return tfidf_weight(self.count(texts), self.idf_, self.norm, self.sublinear_tf)
+
+
+class HashedFeatureNames:
+    """Names of hashed features, known only for the buckets kept in the reverse map.
+
+    Indexes like the ``feature_names`` array of a vocabulary; buckets without
+    a recorded term are named ``#<index>``.
+    """
+
+    def __init__(self, n_features: int, indices: np.ndarray, names: np.ndarray) -> None:
+        order = np.argsort(indices, kind="stable")
+        self.n_features = n_features
+        self.indices = np.asarray(indices, dtype=np.int64)[order]
+        self.names = np.asarray(names)[order]
+
+    @classmethod
+    def from_map(cls, n_features: int, feature_map: Dict[int, str]) -> "HashedFeatureNames":
+        indices = np.fromiter(feature_map.keys(), dtype=np.int64, count=len(feature_map))
+        return cls(n_features, indices, np.asarray(list(feature_map.values()), dtype=str))
+
+    def __len__(self) -> int:
+        return self.n_features
+
+    def __getitem__(self, index: int) -> str:
+        pos = int(np.searchsorted(self.indices, index))
+        if pos < len(self.indices) and self.indices[pos] == index:
+            return str(self.names[pos])
+        return f"#{int(index)}"
+
+
+__all__ = ["HashedFeatureNames", "HashingTfidf", "tfidf_weight"]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Deque, List, Optional
+
+from .service import InferenceEngine, artifacts_version
+
+Listener = Callable[[InferenceEngine], None]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelVersion:
+    """A model set the registry has served, identified by its artifact fingerprint."""
+
+    version: str
+    attributes: List[str]
+    loaded_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class ModelRegistry:
+    """Serves the active :class:`InferenceEngine` and swaps in retrained models.
+
+    :meth:`reload` builds the new engine off the request path and replaces
+    the active one in a single assignment. Callers take :attr:`active` once
+    per request, so in-flight requests finish on the engine they started
+    with. Listeners are told about every swap, for state derived from the
+    engine's vocabularies. :meth:`watch` reloads whenever the artifacts change.
+    """
+
+    def __init__(self, artifacts_dir: Path, history: int = 10) -> None:
+        self._artifacts_dir = artifacts_dir
+        self._active = InferenceEngine(artifacts_dir)
+        self._history: Deque[ModelVersion] = deque(maxlen=history)
+        self._history.append(_describe(self._active))
+        self._listeners: List[Listener] = []
+        self._reload_lock = threading.Lock()
+        self._stop_watching: Optional[threading.Event] = None
+
+    @property
+    def active(self) -> InferenceEngine:
+        return self._active
+
+    @property
+    def version(self) -> str:
+        return self._active.version
+
+    def versions(self) -> List[ModelVersion]:
+        """Model sets served so far, most recent last."""
+        return list(self._history)
+
+    def subscribe(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def reload(self, force: bool = False) -> bool:
+        """Load the artifacts again and swap them in; returns whether the version changed.
+
+        Nothing is loaded while the artifact fingerprint matches the active
+        version, unless ``force`` is set. If the new artifacts hold no models,
+        or fail to load, the active engine stays in place and the error is
+        raised.
+        """
+
+        with self._reload_lock:
+            if not force and artifacts_version(self._artifacts_dir) == self._active.version:
+                return False
+            engine = InferenceEngine(self._artifacts_dir)
+            if not engine.is_ready:
+                raise RuntimeError(f"No trained models found in {self._artifacts_dir}.")
+            changed = engine.version != self._active.version
+            self._active = engine
+            if changed:
+                self._history.append(_describe(engine))
+            for listener in self._listeners:
+                listener(engine)
+            return changed
+
+    def watch(self, interval: float) -> None:
+        """Poll the artifacts every ``interval`` seconds and reload when they change."""
+
+        if self._stop_watching is not None:
+            return
+        stop = self._stop_watching = threading.Event()
+
+        def poll() -> None:
+            while not stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception:  # noqa: BLE001 - keep serving the active models
+                    logger.exception(
+                        "Reloading models from %s failed; still serving %s.",
+                        self._artifacts_dir,
+                        self._active.version,
+                    )
+                    continue
+
+        threading.Thread(target=poll, name="model-registry-watch", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._stop_watching is not None:
+            self._stop_watching.set()
+            self._stop_watching = None
+
+
+def _describe(engine: InferenceEngine) -> ModelVersion:
+    return ModelVersion(version=engine.version, attributes=engine.attribute_names)
+
+
+__all__ = ["ModelRegistry", "ModelVersion"]
@@ -1,13 +1,65 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import joblib
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import scipy.sparse as sp
+from scipy.special import expit, softmax
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+
+from backend.observability import stage
+
+from .hashing import HashedFeatureNames, HashingTfidf, tfidf_weight
+from .weights import LinearWeights
+
+logger = logging.getLogger(__name__)
+
+FUSED_FORMAT = "fused"
+HASHED_FORMAT = "hashed"
+COMPILED_DIR = "compiled"
+COMPILED_MANIFEST = "manifest.json"
+COMPILED_FORMAT_VERSION = 1
+# Vectorizer settings that matter at transform time and survive a JSON round trip.
+COMPILED_VECTORIZER_PARAMS = (
+    "input",
+    "encoding",
+    "decode_error",
+    "strip_accents",
+    "lowercase",
+    "token_pattern",
+    "stop_words",
+    "ngram_range",
+    "analyzer",
+    "binary",
+    "norm",
+    "use_idf",
+    "smooth_idf",
+    "sublinear_tf",
+)
+COMPILED_HASHING_PARAMS = (
+    "input",
+    "encoding",
+    "decode_error",
+    "strip_accents",
+    "lowercase",
+    "token_pattern",
+    "stop_words",
+    "ngram_range",
+    "analyzer",
+    "n_features",
+    "binary",
+    "norm",
+    "alternate_sign",
+)
 
 
 @dataclass
@@ -22,97 +74,506 @@ class AttributeInference:
 
 
 @dataclass
-class AttributeModel:
-    """Container for a trained vectorizer + classifier pair."""
+class AttributeHead:
+    """Rows of a stacked linear layer that score a single attribute."""
 
     name: str
-    vectorizer: TfidfVectorizer
-    classifier: LogisticRegression
+    classes: np.ndarray
+    rows: slice
+    one_vs_rest: bool = False
+
+    def probabilities(self, logits: np.ndarray) -> np.ndarray:
+        """Turn the head's slice of ``logits`` (n_samples x n_rows) into class probabilities."""
+
+        scores = logits[:, self.rows]
+        if not self.one_vs_rest:
+            return softmax(scores, axis=1)
+        probabilities = expit(scores)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+@dataclass
+class ModelGroup:
+    """One vectorizer shared by every attribute head stacked on top of it."""
+
+    vectorizer: Union[TfidfVectorizer, HashingTfidf]
+    feature_names: Union[np.ndarray, HashedFeatureNames]
+    weights: LinearWeights
+    intercept: np.ndarray
+    heads: List[AttributeHead]
+    key: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def logits(self, vectors: Any) -> np.ndarray:
+        """Score TF-IDF rows against every head in a single sparse mat-mul."""
+
+        return self.weights.project(vectors) + self.intercept
+
+    def count(self, texts: Sequence[str]) -> sp.csr_matrix:
+        """Raw term counts in this group's vocabulary, before TF-IDF weighting."""
+
+        if isinstance(self.vectorizer, HashingTfidf):
+            return self.vectorizer.count(texts)
+        return CountVectorizer.transform(self.vectorizer, texts).tocsr()
+
+    def weight(self, counts: sp.spmatrix) -> sp.csr_matrix:
+        """Apply the vectorizer's TF-IDF weighting and normalization to raw counts."""
+
+        return tfidf_weight(
+            counts,
+            self.vectorizer.idf_ if self.vectorizer.use_idf else None,
+            self.vectorizer.norm,
+            self.vectorizer.sublinear_tf,
+        )
+
+    def leave_one_out_logits(self, counts: sp.csr_matrix) -> np.ndarray:
+        """Logits of the whole set with each row of ``counts`` removed in turn.
+
+        ``counts`` stacks the raw term counts of the set's members. With plain
+        TF and l2 (or no) normalization the logits of ``total - row_i`` follow
+        from per-row dot products, so the cost is linear in the non-zeros of
+        ``counts`` rather than n times the size of the total vector.
+        """
+
+        counts = sp.csr_matrix(counts, dtype=np.float64)
+        total = sp.csr_matrix(counts.sum(axis=0))
+        norm = self.vectorizer.norm
+        if self.vectorizer.sublinear_tf or norm not in {"l2", None}:
+            remaining = sp.csr_matrix(np.ones((counts.shape[0], 1))) @ total - counts
+            return self.logits(self.weight(remaining))
+
+        if self.vectorizer.use_idf:
+            idf = sp.diags(self.vectorizer.idf_)
+            counts, total = counts @ idf, total @ idf
+        numerators = self.weights.project(total) - self.weights.project(counts)
+        if norm == "l2":
+            squared_norms = (
+                total.multiply(total).sum()
+                - 2.0 * np.asarray(counts @ total.T.toarray()).ravel()
+                + np.asarray(counts.multiply(counts).sum(axis=1)).ravel()
+            )
+            norms = np.sqrt(np.clip(squared_norms, 0.0, None))
+            norms[norms < 1e-12] = 1.0
+            numerators = numerators / norms[:, None]
+        return numerators + self.intercept
+
+
+def _stack_classifiers(
+    classifiers: Dict[str, Any],
+) -> Tuple[np.ndarray, np.ndarray, List[AttributeHead]]:
+    """Stack fitted linear classifiers into one coefficient/intercept matrix.
+
+    Binary classifiers expose a single row ``w``; it is expanded to
+    ``(-w/2, w/2)`` so a softmax over the pair reproduces the sigmoid.
+    """
+
+    coef_blocks: List[np.ndarray] = []
+    intercept_blocks: List[np.ndarray] = []
+    heads: List[AttributeHead] = []
+    start = 0
+    for name, classifier in classifiers.items():
+        coef = np.asarray(classifier.coef_, dtype=np.float64)
+        intercept = np.asarray(classifier.intercept_, dtype=np.float64)
+        if len(classifier.classes_) == 2 and coef.shape[0] == 1:
+            coef = np.vstack([-coef / 2.0, coef / 2.0])
+            intercept = np.concatenate([-intercept / 2.0, intercept / 2.0])
+            one_vs_rest = False
+        else:
+            one_vs_rest = _uses_one_vs_rest(classifier)
+        stop = start + coef.shape[0]
+        heads.append(
+            AttributeHead(
+                name=name,
+                classes=np.asarray(classifier.classes_),
+                rows=slice(start, stop),
+                one_vs_rest=one_vs_rest,
+            )
+        )
+        coef_blocks.append(coef)
+        intercept_blocks.append(intercept)
+        start = stop
+    return np.vstack(coef_blocks), np.concatenate(intercept_blocks), heads
+
+
+def _uses_one_vs_rest(classifier: Any) -> bool:
+    multi_class = getattr(classifier, "multi_class", "ovr")
+    if multi_class in {"auto", "deprecated"}:
+        return getattr(classifier, "solver", None) == "liblinear"
+    return multi_class == "ovr"
 
 
 class InferenceEngine:
-    """Loads trained models and performs predictions."""
+    """Loads trained models and performs predictions.
+
+    Two artifact layouts are understood: the original one-joblib-per-attribute
+    files (each with its own vectorizer) and a fused artifact holding a single
+    shared vectorizer plus stacked coefficients for several attributes. A fused
+    artifact takes precedence for the attributes it covers, so the text is
+    tokenized once per vectorizer rather than once per attribute; every model
+    shadowed that way is logged as a warning. A hashed
+    artifact from streaming training is fused the same way, over a stateless
+    hashing featurizer whose reverse map names its top-weighted features.
 
-    def __init__(self, artifacts_dir: Path) -> None:
+    A ``compiled/`` directory written by :meth:`export_compiled` is preferred
+    over both when it was compiled from the joblib files present (or when no
+    joblib files are left). Its arrays are memory-mapped and no sklearn object
+    is unpickled, so startup is fast and worker processes share the pages.
+    ``use_compiled=False`` loads the joblib files regardless, e.g. to export
+    or check a compiled copy against the full models.
+    """
+
+    def __init__(self, artifacts_dir: Path, use_compiled: bool = True) -> None:
         self._artifacts_dir = artifacts_dir
-        self._models: Dict[str, AttributeModel] = {}
+        self._use_compiled = use_compiled
+        self._groups: List[ModelGroup] = []
+        self._version = "none"
+        # Fingerprint of the joblib files the models came from; an export records it.
+        self._source_version = "none"
         self._load_models()
 
     @property
     def is_ready(self) -> bool:
-        return bool(self._models)
+        return bool(self._groups)
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of the loaded artifact files (names, sizes, mtimes).
+
+        Models served from ``compiled/`` add a fingerprint of that export's
+        manifest and compression settings, so re-exporting changes the version.
+        """
+        return self._version
 
     def _load_models(self) -> None:
         if not self._artifacts_dir.exists():
             self._artifacts_dir.mkdir(parents=True, exist_ok=True)
             return
-        for joblib_file in self._artifacts_dir.glob("*.joblib"):
+
+        artifact_files = sorted(self._artifacts_dir.glob("*.joblib"))
+        source_version = _fingerprint(artifact_files) if artifact_files else None
+        compiled_dir = self._artifacts_dir / COMPILED_DIR
+        manifest = _read_compiled_manifest(compiled_dir) if self._use_compiled else None
+        if manifest is not None and source_version in {None, manifest["source_version"]}:
+            try:
+                self._groups = _load_compiled(compiled_dir, manifest)
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                logger.warning(
+                    "Ignoring unreadable compiled models in %s (%s); loading the joblib artifacts.",
+                    compiled_dir,
+                    error,
+                )
+            else:
+                self._source_version = manifest["source_version"]
+                self._version = _compiled_version(compiled_dir, manifest)
+                return
+
+        fused_payloads: List[Tuple[Path, Dict[str, Any]]] = []
+        legacy_payloads: List[Tuple[Path, Dict[str, Any]]] = []
+        if source_version is not None:
+            self._version = self._source_version = source_version
+        for joblib_file in artifact_files:
             payload = joblib.load(joblib_file)
+            if payload.get("format") in {FUSED_FORMAT, HASHED_FORMAT}:
+                fused_payloads.append((joblib_file, payload))
+            else:
+                legacy_payloads.append((joblib_file, payload))
+
+        covered: Dict[str, Path] = {}
+        for joblib_file, payload in fused_payloads:
+            classifiers = {}
+            for name, classifier in payload["classifiers"].items():
+                if name in covered:
+                    _warn_shadowed(name, joblib_file, covered[name])
+                else:
+                    classifiers[name] = classifier
+            if not classifiers:
+                continue
+            covered.update(dict.fromkeys(classifiers, joblib_file))
+            coef, intercept, heads = _stack_classifiers(classifiers)
+            if payload["format"] == HASHED_FORMAT:
+                self._groups.append(_build_hashed_group(payload, coef, intercept, heads))
+            else:
+                self._groups.append(_build_group(payload["vectorizer"], coef, intercept, heads))
+        for joblib_file, payload in legacy_payloads:
             attribute_name = payload["attribute_name"]
-            vectorizer = payload["vectorizer"]
-            classifier = payload["classifier"]
-            self._models[attribute_name] = AttributeModel(
-                name=attribute_name,
-                vectorizer=vectorizer,
-                classifier=classifier,
+            if attribute_name in covered:
+                _warn_shadowed(attribute_name, joblib_file, covered[attribute_name])
+                continue
+            covered[attribute_name] = joblib_file
+            coef, intercept, heads = _stack_classifiers({attribute_name: payload["classifier"]})
+            self._groups.append(_build_group(payload["vectorizer"], coef, intercept, heads))
+
+    def export_compiled(
+        self,
+        directory: Optional[Path] = None,
+        coef_dtype: str = "float64",
+        prune: float = 0.0,
+    ) -> Path:
+        """Write the loaded models as plain ``.npy`` arrays plus a JSON manifest.
+
+        Each vectorizer group gets its feature names, idf, stacked coefficients,
+        intercepts and per-attribute classes; the manifest records the
+        vectorizer settings and the fingerprint of the source artifacts. The
+        export is built next to ``directory`` and renamed into place, so readers
+        never see a partial one; a reader that finds none loads the joblib files.
+
+        ``coef_dtype`` and ``prune`` compress the coefficients as described in
+        :meth:`LinearWeights.compress`; the engine scores from them as stored.
+        """
+
+        if not self._groups:
+            raise RuntimeError("No models are loaded, so there is nothing to compile.")
+        directory = directory or self._artifacts_dir / COMPILED_DIR
+        staging = directory.with_name(f".{directory.name}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        groups: List[Dict[str, Any]] = []
+        for group_idx, group in enumerate(self._groups):
+            group_dir = staging / f"group_{group_idx}"
+            group_dir.mkdir()
+            if isinstance(group.feature_names, HashedFeatureNames):
+                np.save(group_dir / "feature_indices.npy", group.feature_names.indices)
+                np.save(group_dir / "feature_names.npy", group.feature_names.names.astype(str))
+            else:
+                np.save(group_dir / "feature_names.npy", np.asarray(group.feature_names).astype(str))
+            weights = group.weights
+            if coef_dtype != weights.dtype or prune > 0.0:
+                weights = weights.compress(coef_dtype, prune)
+            weights_spec = _save_weights(group_dir, weights)
+            np.save(group_dir / "intercept.npy", np.asarray(group.intercept))
+            if group.vectorizer.use_idf:
+                np.save(group_dir / "idf.npy", np.asarray(group.vectorizer.idf_))
+            heads: List[Dict[str, Any]] = []
+            for head_idx, head in enumerate(group.heads):
+                classes_file = f"classes_{head_idx}.npy"
+                classes = head.classes.astype(str) if head.classes.dtype == object else head.classes
+                np.save(group_dir / classes_file, classes)
+                heads.append(
+                    {
+                        "name": head.name,
+                        "rows": [head.rows.start, head.rows.stop],
+                        "one_vs_rest": head.one_vs_rest,
+                        "classes": classes_file,
+                    }
+                )
+            groups.append(
+                {
+                    "path": group_dir.name,
+                    "vectorizer": _compiled_vectorizer_params(group.vectorizer),
+                    "weights": weights_spec,
+                    "heads": heads,
+                }
             )
 
+        manifest = {
+            "format_version": COMPILED_FORMAT_VERSION,
+            "source_version": self._source_version,
+            "compression": {"coef_dtype": coef_dtype, "prune": prune},
+            "groups": groups,
+        }
+        (staging / COMPILED_MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        # Move the old export aside rather than deleting it first, so the gap
+        # without a compiled directory is a rename rather than a recursive delete.
+        retired = directory.with_name(f".{directory.name}.old")
+        shutil.rmtree(retired, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, retired)
+        os.replace(staging, directory)
+        shutil.rmtree(retired, ignore_errors=True)
+        return directory
+
+    @property
+    def weights_nbytes(self) -> int:
+        """Memory held by the coefficient matrices of every group."""
+        return sum(group.weights.nbytes for group in self._groups)
+
     @property
     def attribute_names(self) -> List[str]:
-        return sorted(self._models.keys())
+        return sorted(head.name for group in self._groups for head in group.heads)
+
+    def _find_head(self, name: str) -> Tuple[ModelGroup, AttributeHead]:
+        for group in self._groups:
+            for head in group.heads:
+                if head.name == name:
+                    return group, head
+        raise KeyError(name)
+
+    def featurizer_key(self, name: str) -> str:
+        """Identifier of the vectorizer scoring ``name``; equal keys share vectors."""
+
+        return self._find_head(name)[0].key
+
+    def vectorize(self, name: str, texts: Sequence[str]) -> sp.csr_matrix:
+        """TF-IDF rows for ``texts`` in the vocabulary of the attribute ``name``."""
+
+        return self._find_head(name)[0].vectorizer.transform(texts).tocsr()
+
+    def class_weights(self, name: str, value: str) -> np.ndarray:
+        """Coefficient row that pushes the attribute ``name`` towards class ``value``."""
+
+        group, head = self._find_head(name)
+        class_idx = int(np.flatnonzero(head.classes.astype(str) == value)[0])
+        return group.weights.row(head.rows.start + class_idx)
 
     def predict(self, text: str, top_k_features: int = 5) -> Dict[str, AttributeInference]:
         """Generate predictions for every available attribute."""
 
-        if not text.strip() or not self._models:
+        if not text.strip() or not self._groups:
             return {}
-        return {
-            name: self._predict_with_model(model, text, top_k_features)
-            for name, model in self._models.items()
-        }
+        with stage("inference.transform"):
+            vectors = [group.vectorizer.transform([text]) for group in self._groups]
+        predictions: Dict[str, AttributeInference] = {}
+        with stage("inference.score"):
+            for group, vector in zip(self._groups, vectors):
+                self._predict_group(group, vector, top_k_features, predictions)
+        return predictions
 
-    def _predict_with_model(
+    @stage("inference.count")
+    def count_terms(self, texts: Sequence[str]) -> List[sp.csr_matrix]:
+        """Return raw term-count matrices for ``texts``, one per vectorizer group.
+
+        Counts are additive: the counts of a document set are the sum of its
+        documents' counts, which :meth:`predict_counts` then TF-IDF weights.
+        """
+
+        return [group.count(texts) for group in self._groups]
+
+    def predict_counts(
         self,
-        model: AttributeModel,
-        text: str,
-        top_k: int,
-    ) -> AttributeInference:
-        vector = model.vectorizer.transform([text])
-        classifier = model.classifier
+        counts: Sequence[sp.spmatrix],
+        top_k_features: int = 5,
+    ) -> Dict[str, AttributeInference]:
+        """Generate predictions from summed term counts (one 1-row matrix per group).
 
-        probabilities = classifier.predict_proba(vector)[0]
-        best_idx = int(np.argmax(probabilities))
-        predicted_value = str(classifier.classes_[best_idx])
-        confidence = float(probabilities[best_idx])
+        This matches :meth:`predict` on the concatenated texts, except that no
+        bigram spans the boundary between two documents.
+        """
+
+        with stage("inference.transform"):
+            vectors = [group.weight(group_counts) for group, group_counts in zip(self._groups, counts)]
+        predictions: Dict[str, AttributeInference] = {}
+        with stage("inference.score"):
+            for group, vector in zip(self._groups, vectors):
+                self._predict_group(group, vector, top_k_features, predictions)
+        return predictions
 
-        feature_names = model.vectorizer.get_feature_names_out()
-        dense_vector = vector.toarray()[0]
-        coefs = classifier.coef_[best_idx]
-        contributions = dense_vector * coefs
+    def predict_batch(
+        self,
+        texts: Sequence[str],
+        top_k: int = 5,
+    ) -> List[Dict[str, AttributeInference]]:
+        """Generate predictions for many texts at once.
+
+        Each vectorizer group transforms all texts in one call, scores them with
+        a single mat-mul and extracts per-row top features without a Python loop
+        over the vocabulary. Results match calling :meth:`predict` per text.
+        """
 
-        ranked_indices = np.argsort(contributions)[::-1]
-        positive_indices = [idx for idx in ranked_indices if contributions[idx] > 0]
+        results: List[Dict[str, AttributeInference]] = [{} for _ in texts]
+        live_rows = [idx for idx, text in enumerate(texts) if text.strip()]
+        if not live_rows or not self._groups:
+            return results
+        live_texts = [texts[idx] for idx in live_rows]
+        with stage("inference.transform"):
+            matrices = [group.vectorizer.transform(live_texts).tocsr() for group in self._groups]
 
-        if not positive_indices:
-            tfidf_ranked = np.argsort(dense_vector)[::-1]
-            positive_indices = [idx for idx in tfidf_ranked if dense_vector[idx] > 0]
-        if not positive_indices:
-            positive_indices = ranked_indices[:top_k]
+        with stage("inference.score"):
+            for group, matrix in zip(self._groups, matrices):
+                logits = group.logits(matrix)
+                for head in group.heads:
+                    probabilities = head.probabilities(logits)
+                    best = np.argmax(probabilities, axis=1)
+                    confidences = probabilities[np.arange(len(live_rows)), best]
+                    ranked = _rank_features_batch(
+                        matrix,
+                        head.rows.start + best,
+                        group.weights,
+                        group.feature_names,
+                        top_k,
+                    )
+                    for position, row in enumerate(live_rows):
+                        top_features, feature_contributions = ranked[position]
+                        results[row][head.name] = AttributeInference(
+                            name=head.name,
+                            predicted_value=str(head.classes[best[position]]),
+                            confidence=float(confidences[position]),
+                            top_features=top_features,
+                            feature_contributions=feature_contributions,
+                        )
+        return results
+
+    def score_counts(
+        self,
+        counts: Sequence[sp.spmatrix],
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Class probabilities for many count rows at once, skipping attribution.
 
-        feature_contributions: Dict[str, float] = {}
-        top_features: List[str] = []
+        ``counts`` holds one (n_rows x n_features) matrix per group; the result
+        maps each attribute to its classes and an (n_rows x n_classes) matrix.
+        """
 
-        for idx in positive_indices:
-            feature = feature_names[idx]
-            contribution = float(contributions[idx])
-            if feature not in feature_contributions:
-                feature_contributions[feature] = contribution
-                top_features.append(feature)
-            if len(top_features) >= top_k:
-                break
+        with stage("inference.transform"):
+            vectors = [group.weight(group_counts) for group, group_counts in zip(self._groups, counts)]
+        scores: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        with stage("inference.score"):
+            for group, vector in zip(self._groups, vectors):
+                logits = group.logits(vector)
+                for head in group.heads:
+                    scores[head.name] = (head.classes, head.probabilities(logits))
+        return scores
+
+    @stage("inference.leave_one_out")
+    def leave_one_out(
+        self,
+        counts: Sequence[sp.spmatrix],
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Class probabilities of a document set with each member left out.
+
+        ``counts`` holds one stacked (n_docs x n_features) count matrix per
+        group; row ``i`` of each result scores the set without document ``i``.
+        """
+
+        scores: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for group, group_counts in zip(self._groups, counts):
+            logits = group.leave_one_out_logits(group_counts)
+            for head in group.heads:
+                scores[head.name] = (head.classes, head.probabilities(logits))
+        return scores
+
+    def _predict_group(
+        self,
+        group: ModelGroup,
+        vector: Any,
+        top_k: int,
+        predictions: Dict[str, AttributeInference],
+    ) -> None:
+        logits = group.logits(vector)
+        for head in group.heads:
+            predictions[head.name] = self._predict_with_head(group, head, vector, logits, top_k)
+
+    def _predict_with_head(
+        self,
+        group: ModelGroup,
+        head: AttributeHead,
+        vector: Any,
+        logits: np.ndarray,
+        top_k: int,
+    ) -> AttributeInference:
+        probabilities = head.probabilities(logits)[0]
+        best_idx = int(np.argmax(probabilities))
+        predicted_value = str(head.classes[best_idx])
+        confidence = float(probabilities[best_idx])
+
+        top_features, feature_contributions = _rank_features(
+            vector.indices,
+            vector.data,
+            group.weights.row(head.rows.start + best_idx),
+            group.feature_names,
+            top_k,
+        )
 
         return AttributeInference(
-            name=model.name,
+            name=head.name,
             predicted_value=predicted_value,
             confidence=confidence,
             top_features=top_features,
@@ -120,6 +581,293 @@ class InferenceEngine:
         )
 
 
-__all__ = ["AttributeInference", "InferenceEngine"]
+def _warn_shadowed(attribute: str, ignored: Path, served: Path) -> None:
+    logger.warning(
+        "%s also holds a model for %s, which is served from %s instead. "
+        "Remove the artifact format you no longer train.",
+        ignored.name,
+        attribute,
+        served.name,
+    )
+
+
+def artifacts_version(artifacts_dir: Path) -> str:
+    """Version an :class:`InferenceEngine` would report for ``artifacts_dir``, without loading it."""
+
+    artifact_files = sorted(artifacts_dir.glob("*.joblib"))
+    source_version = _fingerprint(artifact_files) if artifact_files else None
+    compiled_dir = artifacts_dir / COMPILED_DIR
+    manifest = _read_compiled_manifest(compiled_dir)
+    if manifest is not None and source_version in {None, manifest["source_version"]}:
+        return _compiled_version(compiled_dir, manifest)
+    return source_version or "none"
+
+
+def _fingerprint(paths: Iterable[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _compiled_version(directory: Path, manifest: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(json.dumps(manifest.get("compression"), sort_keys=True).encode("utf-8"))
+    digest.update(_fingerprint([directory / COMPILED_MANIFEST]).encode("utf-8"))
+    return f"{manifest['source_version']}-{digest.hexdigest()[:8]}"
+
+
+def _read_compiled_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        manifest = json.loads((directory / COMPILED_MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != COMPILED_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _load_compiled(directory: Path, manifest: Dict[str, Any]) -> List[ModelGroup]:
+    """Rebuild model groups from memory-mapped arrays without unpickling."""
+
+    groups: List[ModelGroup] = []
+    for entry in manifest["groups"]:
+        group_dir = directory / entry["path"]
+        feature_names = np.load(group_dir / "feature_names.npy", mmap_mode="r")
+        params = dict(entry["vectorizer"])
+        params["dtype"] = np.dtype(params["dtype"]).type
+        if params.pop("kind", "tfidf") == "hashing":
+            hashing = dict(params["hashing"], dtype=params["dtype"])
+            hashing["ngram_range"] = tuple(hashing["ngram_range"])
+            idf_path = group_dir / "idf.npy"
+            vectorizer = HashingTfidf(
+                HashingVectorizer(**hashing),
+                np.load(idf_path, mmap_mode="r") if idf_path.exists() else None,
+                norm=params["norm"],
+                sublinear_tf=params["sublinear_tf"],
+            )
+            feature_names = HashedFeatureNames(
+                vectorizer.n_features,
+                np.load(group_dir / "feature_indices.npy", mmap_mode="r"),
+                feature_names,
+            )
+        else:
+            params["ngram_range"] = tuple(params["ngram_range"])
+            vectorizer = TfidfVectorizer(
+                vocabulary={name: idx for idx, name in enumerate(feature_names.tolist())},
+                **params,
+            )
+            if vectorizer.use_idf:
+                vectorizer.idf_ = np.load(group_dir / "idf.npy", mmap_mode="r")
+        heads = [
+            AttributeHead(
+                name=head["name"],
+                classes=np.load(group_dir / head["classes"], mmap_mode="r"),
+                rows=slice(*head["rows"]),
+                one_vs_rest=head["one_vs_rest"],
+            )
+            for head in entry["heads"]
+        ]
+        groups.append(
+            ModelGroup(
+                vectorizer=vectorizer,
+                feature_names=feature_names,
+                weights=_load_weights(group_dir, entry.get("weights")),
+                intercept=np.load(group_dir / "intercept.npy", mmap_mode="r"),
+                heads=heads,
+            )
+        )
+    return groups
 
 
+def _save_weights(group_dir: Path, weights: LinearWeights) -> Dict[str, Any]:
+    if weights.is_sparse:
+        np.save(group_dir / "coef_data.npy", weights.matrix.data)
+        np.save(group_dir / "coef_indices.npy", weights.matrix.indices)
+        np.save(group_dir / "coef_indptr.npy", weights.matrix.indptr)
+    else:
+        np.save(group_dir / "coef.npy", np.ascontiguousarray(weights.matrix))
+    if weights.scale is not None:
+        np.save(group_dir / "coef_scale.npy", weights.scale)
+    return weights.describe()
+
+
+def _load_weights(group_dir: Path, spec: Optional[Dict[str, Any]]) -> LinearWeights:
+    spec = spec or {"format": "dense", "quantized": False}
+    if spec["format"] == "csr":
+        matrix = sp.csr_matrix(
+            (
+                np.load(group_dir / "coef_data.npy", mmap_mode="r"),
+                np.load(group_dir / "coef_indices.npy", mmap_mode="r"),
+                np.load(group_dir / "coef_indptr.npy", mmap_mode="r"),
+            ),
+            shape=tuple(spec["shape"]),
+        )
+    else:
+        matrix = np.load(group_dir / "coef.npy", mmap_mode="r")
+    scale = np.load(group_dir / "coef_scale.npy") if spec["quantized"] else None
+    return LinearWeights(matrix, scale)
+
+
+def _compiled_vectorizer_params(
+    vectorizer: Union[TfidfVectorizer, HashingTfidf],
+) -> Dict[str, Any]:
+    if isinstance(vectorizer, HashingTfidf):
+        hashing = _json_params(vectorizer.hashing, COMPILED_HASHING_PARAMS)
+        return {
+            "kind": "hashing",
+            "hashing": hashing,
+            "dtype": hashing.pop("dtype"),
+            "norm": vectorizer.norm,
+            "sublinear_tf": vectorizer.sublinear_tf,
+        }
+    return _json_params(vectorizer, COMPILED_VECTORIZER_PARAMS)
+
+
+def _json_params(vectorizer: Any, names: Sequence[str]) -> Dict[str, Any]:
+    params = vectorizer.get_params()
+    if params["preprocessor"] is not None or params["tokenizer"] is not None:
+        raise ValueError("Vectorizers with custom callables cannot be compiled.")
+    if callable(params["analyzer"]):
+        raise ValueError("Vectorizers with a custom analyzer cannot be compiled.")
+    exported = {name: params[name] for name in names}
+    if exported["stop_words"] is not None and not isinstance(exported["stop_words"], str):
+        exported["stop_words"] = sorted(exported["stop_words"])
+    exported["ngram_range"] = list(exported["ngram_range"])
+    exported["dtype"] = np.dtype(params["dtype"]).name
+    return exported
+
+
+def _build_group(
+    vectorizer: TfidfVectorizer,
+    coef: np.ndarray,
+    intercept: np.ndarray,
+    heads: Iterable[AttributeHead],
+) -> ModelGroup:
+    return ModelGroup(
+        vectorizer=vectorizer,
+        feature_names=vectorizer.get_feature_names_out(),
+        weights=LinearWeights(coef),
+        intercept=intercept,
+        heads=list(heads),
+    )
+
+
+def _build_hashed_group(
+    payload: Dict[str, Any],
+    coef: np.ndarray,
+    intercept: np.ndarray,
+    heads: Iterable[AttributeHead],
+) -> ModelGroup:
+    vectorizer = HashingTfidf(
+        payload["hashing"], payload["idf"], payload["norm"], payload["sublinear_tf"]
+    )
+    return ModelGroup(
+        vectorizer=vectorizer,
+        feature_names=HashedFeatureNames.from_map(vectorizer.n_features, payload["feature_map"]),
+        weights=LinearWeights(coef),
+        intercept=intercept,
+        heads=list(heads),
+    )
+
+
+def _rank_features(
+    indices: np.ndarray,
+    values: np.ndarray,
+    coefs: np.ndarray,
+    feature_names: np.ndarray,
+    top_k: int,
+) -> Tuple[List[str], Dict[str, float]]:
+    """Pick the top-k contributing features of a single sparse TF-IDF row.
+
+    Only the row's non-zero entries can contribute, so the ranking runs over
+    ``indices``/``values`` and uses a partial selection instead of sorting the
+    whole vocabulary. Ties are broken towards the higher feature index, which
+    is the order a descending sort over the dense vector yields.
+    """
+
+    if top_k <= 0:
+        return [], {}
+
+    if not len(indices):
+        # Nothing in the vocabulary matched: every contribution is zero.
+        contributions = np.zeros(len(feature_names))
+        selected = np.argsort(contributions)[::-1][:top_k]
+        top_features = [str(feature_names[idx]) for idx in selected]
+        return top_features, {feature: 0.0 for feature in top_features}
+
+    contributions = values * coefs[indices]
+    positive = np.flatnonzero(contributions > 0)
+    if len(positive):
+        ranking_scores = contributions
+    else:
+        # No term pushes towards the predicted class; fall back to raw TF-IDF.
+        ranking_scores = values
+        positive = np.flatnonzero(values > 0)
+
+    if len(positive) > top_k:
+        # Keep everything tied with the k-th best score so the tie-break below
+        # sees the full set of candidates.
+        kth_score = -np.partition(-ranking_scores[positive], top_k - 1)[top_k - 1]
+        positive = positive[ranking_scores[positive] >= kth_score]
+    order = np.lexsort((-indices[positive], -ranking_scores[positive]))
+    selected = positive[order][:top_k]
+
+    top_features = [str(feature_names[indices[pos]]) for pos in selected]
+    feature_contributions = {
+        feature: float(contributions[pos]) for feature, pos in zip(top_features, selected)
+    }
+    return top_features, feature_contributions
+
+
+def _rank_features_batch(
+    matrix: Any,
+    coef_rows: np.ndarray,
+    weights: LinearWeights,
+    feature_names: np.ndarray,
+    top_k: int,
+) -> List[Tuple[List[str], Dict[str, float]]]:
+    """Vectorized :func:`_rank_features` over every row of a CSR matrix.
+
+    ``coef_rows[i]`` is the coefficient row of the class predicted for row
+    ``i``. All non-zero entries are ranked with one lexsort keyed by
+    (row, score, feature index), then the first ``top_k`` per row are kept.
+    """
+
+    n_rows = matrix.shape[0]
+    ranked: List[Tuple[List[str], Dict[str, float]]] = [([], {}) for _ in range(n_rows)]
+    if top_k <= 0:
+        return ranked
+
+    indptr, indices, values = matrix.indptr, matrix.indices, matrix.data
+    entry_rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+    contributions = values * weights.gather(coef_rows[entry_rows], indices)
+
+    positive = contributions > 0
+    row_has_positive = np.bincount(entry_rows[positive], minlength=n_rows) > 0
+    use_contributions = row_has_positive[entry_rows]
+    ranking_scores = np.where(use_contributions, contributions, values)
+    candidates = np.flatnonzero(np.where(use_contributions, positive, values > 0))
+
+    order = np.lexsort(
+        (-indices[candidates], -ranking_scores[candidates], entry_rows[candidates])
+    )
+    candidates = candidates[order]
+    candidate_rows = entry_rows[candidates]
+    row_starts = np.searchsorted(candidate_rows, candidate_rows, side="left")
+    keep = (np.arange(len(candidates)) - row_starts) < top_k
+
+    for pos, row in zip(candidates[keep], candidate_rows[keep]):
+        feature = str(feature_names[indices[pos]])
+        ranked[row][0].append(feature)
+        ranked[row][1][feature] = float(contributions[pos])
+
+    for row in np.flatnonzero(np.diff(indptr) == 0):
+        # Rows with no vocabulary hits take the degenerate single-row path.
+        ranked[row] = _rank_features(
+            indices[:0], values[:0], weights.row(0), feature_names, top_k
+        )
+    return ranked
+
+
+__all__ = ["AttributeInference", "InferenceEngine"]
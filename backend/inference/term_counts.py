@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+
+from backend.domain.document import Document
+
+from .service import InferenceEngine
+
+
+class TermCountIndex:
+    """Caches each document's raw term-count vectors for additive scoring.
+
+    Documents are tokenized once when they are added. The counts of any
+    document set are then a sparse sum of cached rows, which the inference
+    engine TF-IDF weights and scores without re-tokenizing the combined text.
+    """
+
+    def __init__(self, inference_engine: InferenceEngine) -> None:
+        self._engine = inference_engine
+        self._counts: Dict[str, List[sp.csr_matrix]] = {}
+        self._nbytes = 0
+
+    @property
+    def engine(self) -> InferenceEngine:
+        """Engine whose vocabularies the cached vectors are counted in."""
+        return self._engine
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def replace_all(self, documents: Iterable[Document]) -> None:
+        """Drop every cached vector and index ``documents`` instead."""
+        self._counts = {}
+        self._nbytes = 0
+        self.add(documents)
+
+    def add(self, documents: Iterable[Document]) -> None:
+        """Count the terms of every document not already cached, in one batch per group."""
+
+        pending = [doc for doc in documents if doc.doc_id not in self._counts]
+        if not pending:
+            return
+        matrices = self._engine.count_terms([doc.clean_text for doc in pending])
+        for row, doc in enumerate(pending):
+            rows = [matrix[row] for matrix in matrices]
+            self._counts[doc.doc_id] = rows
+            self._nbytes += _rows_nbytes(rows)
+
+    def stacked_counts(self, documents: Sequence[Document]) -> List[sp.csr_matrix]:
+        """Stack the count rows of ``documents`` into one (n_docs x n_features) matrix per group."""
+
+        self.add(documents)
+        rows = [self._counts[doc.doc_id] for doc in documents]
+        if not rows:
+            return []
+        return [
+            sp.vstack([doc_rows[group] for doc_rows in rows], format="csr")
+            for group in range(len(rows[0]))
+        ]
+
+    def sum_counts(self, documents: Sequence[Document]) -> List[sp.csr_matrix]:
+        """Sum the count vectors of ``documents`` into one 1-row matrix per group."""
+
+        selector = sp.csr_matrix(np.ones((1, len(documents))))
+        return [(selector @ matrix).tocsr() for matrix in self.stacked_counts(documents)]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the cached count vectors."""
+
+        return self._nbytes
+
+
+def _rows_nbytes(rows: List[sp.csr_matrix]) -> int:
+    return sum(row.data.nbytes + row.indices.nbytes + row.indptr.nbytes for row in rows)
+
+
+__all__ = ["TermCountIndex"]
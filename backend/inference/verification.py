@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from .service import InferenceEngine
+
+
+def compare_engines(
+    reference: InferenceEngine,
+    candidate: InferenceEngine,
+    texts: Sequence[str],
+    top_k: int = 5,
+) -> Dict[str, Any]:
+    """Report how ``candidate`` (e.g. compressed) predictions differ from ``reference``.
+
+    Per attribute: the share of texts with the same predicted value, the mean
+    and largest absolute confidence difference, and the mean share of the
+    reference's top features the candidate also returns.
+    """
+
+    expected = reference.predict_batch(texts, top_k=top_k)
+    actual = candidate.predict_batch(texts, top_k=top_k)
+    attributes: Dict[str, Dict[str, float]] = {}
+    for name in reference.attribute_names:
+        agree, deltas, overlaps = [], [], []
+        for reference_row, candidate_row in zip(expected, actual):
+            if name not in reference_row:
+                continue
+            want, got = reference_row[name], candidate_row[name]
+            agree.append(want.predicted_value == got.predicted_value)
+            deltas.append(abs(want.confidence - got.confidence))
+            if want.top_features:
+                shared = set(want.top_features) & set(got.top_features)
+                overlaps.append(len(shared) / len(want.top_features))
+        attributes[name] = {
+            "agreement": float(np.mean(agree)) if agree else 1.0,
+            "mean_confidence_delta": float(np.mean(deltas)) if deltas else 0.0,
+            "max_confidence_delta": float(np.max(deltas)) if deltas else 0.0,
+            "top_feature_overlap": float(np.mean(overlaps)) if overlaps else 1.0,
+        }
+    return {
+        "texts": len(texts),
+        "top_k": top_k,
+        "weights_bytes": {
+            "reference": reference.weights_nbytes,
+            "candidate": candidate.weights_nbytes,
+        },
+        "attributes": attributes,
+    }
+
+
+__all__ = ["compare_engines"]
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+COEF_DTYPES = ("float64", "float32", "int8")
+
+Matrix = Union[np.ndarray, sp.csr_matrix]
+
+
+class LinearWeights:
+    """Coefficient matrix of a model group (n_rows x n_features), dense or compressed.
+
+    ``matrix`` is a dense array or, once pruned, a CSR matrix, in float64,
+    float32 or int8. Int8 rows carry a float ``scale`` each so that
+    ``matrix[i] * scale[i]`` approximates the original row. Scoring reads
+    the compressed form directly and never materializes the full matrix.
+    """
+
+    def __init__(self, matrix: Matrix, scale: Optional[np.ndarray] = None) -> None:
+        self.matrix = matrix
+        self.scale = scale
+
+    @property
+    def shape(self) -> tuple:
+        return self.matrix.shape
+
+    @property
+    def dtype(self) -> str:
+        return self.matrix.dtype.name
+
+    @property
+    def is_sparse(self) -> bool:
+        return sp.issparse(self.matrix)
+
+    @property
+    def nbytes(self) -> int:
+        if self.is_sparse:
+            size = self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+        else:
+            size = self.matrix.nbytes
+        return size + (self.scale.nbytes if self.scale is not None else 0)
+
+    def project(self, vectors: Any) -> np.ndarray:
+        """``vectors @ W.T`` as a dense float64 array (n_samples x n_rows)."""
+
+        products = vectors @ self.matrix.T
+        if sp.issparse(products):
+            products = products.toarray()
+        products = np.asarray(products, dtype=np.float64)
+        return products * self.scale if self.scale is not None else products
+
+    def row(self, index: int) -> np.ndarray:
+        """One coefficient row as a dense float64 vector."""
+
+        if self.is_sparse:
+            values = self.matrix.getrow(index).toarray().ravel()
+        else:
+            values = np.asarray(self.matrix[index])
+        values = values.astype(np.float64)
+        return values * self.scale[index] if self.scale is not None else values
+
+    def gather(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Coefficients at the pairs ``(rows[i], columns[i])``."""
+
+        values = np.asarray(self.matrix[rows, columns]).ravel().astype(np.float64)
+        return values * self.scale[rows] if self.scale is not None else values
+
+    def dense(self) -> np.ndarray:
+        """The full matrix in float64, for re-compression or inspection."""
+
+        values = self.matrix.toarray() if self.is_sparse else np.asarray(self.matrix)
+        values = values.astype(np.float64)
+        return values * self.scale[:, None] if self.scale is not None else values
+
+    def compress(self, dtype: str = "float64", prune: float = 0.0) -> "LinearWeights":
+        """Return a copy with each row's smallest weights dropped and the rest cast to ``dtype``.
+
+        ``prune`` is the fraction of every row's weights, smallest magnitude
+        first, that is set to zero; any pruning yields a CSR matrix. Int8
+        quantization scales each row by its largest magnitude over 127.
+        """
+
+        if dtype not in COEF_DTYPES:
+            raise ValueError(f"Unsupported coefficient dtype {dtype!r}; use one of {COEF_DTYPES}.")
+        if not 0.0 <= prune < 1.0:
+            raise ValueError("prune must be in [0, 1).")
+        values = self.dense()
+        if prune > 0.0:
+            magnitudes = np.abs(values)
+            thresholds = np.quantile(magnitudes, prune, axis=1, keepdims=True)
+            values = np.where(magnitudes > thresholds, values, 0.0)
+
+        scale = None
+        if dtype == "int8":
+            scale = np.abs(values).max(axis=1) / 127.0
+            scale[scale == 0.0] = 1.0
+            values = np.rint(values / scale[:, None])
+        values = values.astype(dtype)
+        return LinearWeights(sp.csr_matrix(values) if prune > 0.0 else values, scale)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "format": "csr" if self.is_sparse else "dense",
+            "dtype": self.dtype,
+            "shape": list(self.shape),
+            "quantized": self.scale is not None,
+        }
+
+
+__all__ = ["COEF_DTYPES", "LinearWeights"]
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from backend.domain.document import DocType, Document
+from backend.domain.text import TextSpans
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+TEXTS_DIR = "texts"
+
+
+def hash_file(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's bytes."""
+
+    digest = hashlib.sha256()
+    with file_path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def document_id(content_hash: str, file_path: Path) -> str:
+    """Stable doc_id: changes when the content changes, distinct for duplicate copies."""
+
+    return hashlib.sha256(f"{content_hash}\0{file_path}".encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class ManifestEntry:
+    """What the cache knows about one previously ingested file."""
+
+    size: int
+    mtime_ns: int
+    content_hash: str
+    doc_id: str
+    doc_type: str
+
+
+class IngestionManifest:
+    """Manifest of one ingested folder plus its content-addressed text blobs.
+
+    Texts are stored once per content hash under ``texts/`` so renamed or
+    touched files reuse the earlier extraction.
+    """
+
+    def __init__(self, root: Path, folder_path: Path) -> None:
+        self._root = root
+        self._folder_path = folder_path
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._seen: Dict[str, ManifestEntry] = {}
+        self._load()
+
+    @property
+    def _texts_dir(self) -> Path:
+        return self._root / TEXTS_DIR
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self._texts_dir / f"{content_hash}.json"
+
+    def _load(self) -> None:
+        manifest_path = self._root / MANIFEST_NAME
+        if not manifest_path.exists():
+            return
+        try:
+            payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if payload.get("version") != MANIFEST_VERSION:
+            return
+        self._entries = {
+            path: ManifestEntry(**entry) for path, entry in payload.get("files", {}).items()
+        }
+
+    def lookup(self, file_path: Path, stat: os.stat_result) -> Optional[Document]:
+        """Return the cached document if the file's size and mtime are unchanged."""
+
+        entry = self._entries.get(str(file_path))
+        if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+            return None
+        document = self.load_document(file_path, entry.content_hash, DocType(entry.doc_type))
+        if document is not None:
+            self._seen[str(file_path)] = entry
+        return document
+
+    def load_document(
+        self,
+        file_path: Path,
+        content_hash: str,
+        doc_type: DocType,
+    ) -> Optional[Document]:
+        """Rebuild a document from the text blob stored for ``content_hash``.
+
+        Blobs hold the raw text plus the clean view's spans; blobs written
+        before spans were stored carry the clean text itself.
+        """
+
+        try:
+            texts = json.loads(self._blob_path(content_hash).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if "clean_spans" in texts:
+            clean = TextSpans.from_segments(texts["clean_spans"])
+        else:
+            clean = texts["clean_text"]
+        return Document(
+            doc_id=document_id(content_hash, file_path),
+            source_file=str(file_path),
+            doc_type=doc_type,
+            raw_text=texts["raw_text"],
+            clean_text=clean,
+        )
+
+    def record(
+        self,
+        file_path: Path,
+        stat: os.stat_result,
+        content_hash: str,
+        document: Document,
+    ) -> None:
+        """Remember a freshly ingested file and persist its text if it is new."""
+
+        blob_path = self._blob_path(content_hash)
+        if not blob_path.exists():
+            self._texts_dir.mkdir(parents=True, exist_ok=True)
+            texts = {"raw_text": document.raw_text}
+            if document.clean_spans is not None:
+                texts["clean_spans"] = document.clean_spans.to_list()
+            else:
+                texts["clean_text"] = document.clean_text
+            _atomic_write(blob_path, json.dumps(texts))
+        self._seen[str(file_path)] = ManifestEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            content_hash=content_hash,
+            doc_id=document.doc_id,
+            doc_type=document.doc_type.value,
+        )
+
+    def save(self) -> None:
+        """Write the files seen in this run and drop texts no file references any more."""
+
+        self._root.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MANIFEST_VERSION,
+            "folder": str(self._folder_path),
+            "files": {path: asdict(entry) for path, entry in self._seen.items()},
+        }
+        _atomic_write(self._root / MANIFEST_NAME, json.dumps(payload))
+        self._entries, self._seen = self._seen, {}
+
+        referenced: Set[str] = {entry.content_hash for entry in self._entries.values()}
+        if self._texts_dir.exists():
+            for blob_path in self._texts_dir.glob("*.json"):
+                if blob_path.stem not in referenced:
+                    blob_path.unlink(missing_ok=True)
+
+
+class IngestionCache:
+    """Persistent, per-folder ingestion manifests under ``cache_dir``."""
+
+    def __init__(self, cache_dir: Path) -> None:
+        self._cache_dir = cache_dir.expanduser()
+
+    def open(self, folder_path: Path) -> IngestionManifest:
+        folder_key = hashlib.sha256(str(folder_path).encode("utf-8")).hexdigest()[:16]
+        return IngestionManifest(self._cache_dir / folder_key, folder_path)
+
+    def clear(self) -> None:
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+__all__ = ["IngestionCache", "IngestionManifest", "document_id", "hash_file"]
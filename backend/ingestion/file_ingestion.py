@@ -1,19 +1,38 @@
 from __future__ import annotations
 
 import logging
+import os
 import re
-import uuid
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from backend.domain.document import DocType, Document
+from backend.domain.text import TextSpans, TrackedText
+from backend.observability import REGISTRY, observe_stage
 
+from .cache import IngestionCache, IngestionManifest, document_id, hash_file
 from .pdf_extraction import extract_text_from_pdf
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {".txt", ".md", ".pdf"}
 
+INGESTED_DOCUMENTS = REGISTRY.counter(
+    "consentlens_ingested_documents",
+    "Documents ingested, by whether they were extracted or served from the ingestion cache.",
+    ["source"],
+)
+INGESTED_BYTES = REGISTRY.counter(
+    "consentlens_ingested_bytes", "Bytes of source files read by extraction."
+)
+INGEST_FAILURES = REGISTRY.counter(
+    "consentlens_ingest_failures", "Files skipped because they could not be read."
+)
+
 
 def detect_doc_type(file_path: Path) -> DocType:
     """Infer a high-level document type from the filename."""
@@ -30,12 +49,27 @@ def detect_doc_type(file_path: Path) -> DocType:
     return DocType.OTHER
 
 
-def _clean_text(text: str) -> str:
-    text = text.replace("\r\n", "\n")
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"[ \t]{2,}", " ", text)
-    text = re.sub(r"(?m)^\s*\d+\s*$", "", text)  # strip isolated page numbers
-    return text.strip()
+CRLF_PATTERN = re.compile(r"\r\n")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+HORIZONTAL_SPACE_PATTERN = re.compile(r"[ \t]{2,}")
+PAGE_NUMBER_PATTERN = re.compile(r"(?m)^\s*\d+\s*$")
+
+
+def _keep_one_space(match: re.Match[str]) -> Union[Tuple[int, int], str]:
+    offset = match.group().find(" ")
+    return (offset, offset + 1) if offset >= 0 else " "
+
+
+def _clean_spans(text: str) -> TextSpans:
+    """Clean ``text`` and return the result as spans of the original string."""
+
+    tracked = TrackedText(text)
+    tracked.sub(CRLF_PATTERN, lambda match: (1, 2))
+    tracked.sub(BLANK_LINES_PATTERN, lambda match: (0, 2))
+    tracked.sub(HORIZONTAL_SPACE_PATTERN, _keep_one_space)
+    tracked.sub(PAGE_NUMBER_PATTERN, lambda match: None)  # strip isolated page numbers
+    tracked.strip()
+    return tracked.spans()
 
 
 def _read_plain_text(file_path: Path) -> str:
@@ -51,36 +85,216 @@ def _extract_text(file_path: Path) -> str:
     raise ValueError(f"Unsupported file type: {file_path}")
 
 
-def ingest_folder(folder_path: Path) -> List[Document]:
-    """Walk a folder tree and return normalized Document objects."""
+@dataclass
+class IngestOutcome:
+    """Result of ingesting one file: either a document or the reason it was skipped."""
 
-    folder_path = folder_path.expanduser().resolve()
-    if not folder_path.exists():
-        raise FileNotFoundError(f"Folder not found: {folder_path}")
+    file_path: Path
+    document: Optional[Document] = None
+    error: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Seconds per stage and bytes read, when the file was extracted rather than cached.
+    timings: Dict[str, float] = field(default_factory=dict)
+    bytes_read: int = 0
 
-    documents: List[Document] = []
+
+def _candidate_files(folder_path: Path) -> Iterator[Path]:
     for file_path in folder_path.rglob("*"):
         if not file_path.is_file():
             continue
         if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
             logger.debug("Skipping unsupported file %s", file_path)
             continue
+        yield file_path
+
+
+def _load_document(file_path: Path, content_hash: Optional[str] = None) -> IngestOutcome:
+    """Extract and normalize a single file. Runs in worker processes when parallel."""
+
+    started = time.perf_counter()
+    try:
+        if content_hash is None:
+            content_hash = hash_file(file_path)
+        size = file_path.stat().st_size
+        raw = _extract_text(file_path)
+    except Exception as exc:
+        return IngestOutcome(file_path=file_path, error=str(exc))
+    extracted = time.perf_counter()
+    clean = _clean_spans(raw)
+    doc_type = detect_doc_type(file_path)
+    document = Document(
+        doc_id=document_id(content_hash, file_path),
+        source_file=str(file_path),
+        doc_type=doc_type,
+        raw_text=raw,
+        clean_text=clean,
+    )
+    return IngestOutcome(
+        file_path=file_path,
+        document=document,
+        content_hash=content_hash,
+        timings={
+            "ingest.extract": extracted - started,
+            "ingest.clean": time.perf_counter() - extracted,
+        },
+        bytes_read=size,
+    )
+
+
+@dataclass
+class _StatFuture:
+    """Pending extraction of a changed file whose result must be recorded in the manifest."""
+
+    pending: Union[IngestOutcome, Future]
+    stat: os.stat_result
+    manifest: IngestionManifest
+
+
+def _start(
+    file_path: Path,
+    manifest: Optional[IngestionManifest],
+    executor: Optional[ProcessPoolExecutor],
+) -> Union[IngestOutcome, Future]:
+    """Serve a file from the cache when possible, otherwise schedule its extraction."""
+
+    content_hash: Optional[str] = None
+    if manifest is not None:
         try:
-            raw = _extract_text(file_path)
-        except Exception as exc:
-            logger.warning("Failed to read %s: %s", file_path, exc)
-            continue
-        clean = _clean_text(raw)
-        doc_type = detect_doc_type(file_path)
-        doc = Document(
-            doc_id=uuid.uuid4().hex,
-            source_file=str(file_path),
-            doc_type=doc_type,
-            raw_text=raw,
-            clean_text=clean,
+            stat = file_path.stat()
+            cached = manifest.lookup(file_path, stat)
+            if cached is not None:
+                return IngestOutcome(file_path=file_path, document=cached)
+            content_hash = hash_file(file_path)
+        except OSError as exc:
+            return IngestOutcome(file_path=file_path, error=str(exc))
+        # Touched or renamed files whose bytes are unchanged reuse the stored text.
+        reused = manifest.load_document(file_path, content_hash, detect_doc_type(file_path))
+        if reused is not None:
+            manifest.record(file_path, stat, content_hash, reused)
+            return IngestOutcome(file_path=file_path, document=reused, content_hash=content_hash)
+        pending: Union[IngestOutcome, Future] = (
+            executor.submit(_load_document, file_path, content_hash)
+            if executor is not None
+            else _load_document(file_path, content_hash)
         )
-        documents.append(doc)
+        return _StatFuture(pending, stat, manifest)
 
-    return documents
+    if executor is not None:
+        return executor.submit(_load_document, file_path)
+    return _load_document(file_path)
+
+
+def _collect(
+    file_path: Path,
+    pending: Union[IngestOutcome, Future, _StatFuture],
+) -> IngestOutcome:
+    if isinstance(pending, _StatFuture):
+        outcome = _collect(file_path, pending.pending)
+        if outcome.document is not None and outcome.content_hash is not None:
+            pending.manifest.record(file_path, pending.stat, outcome.content_hash, outcome.document)
+        return outcome
+    if isinstance(pending, IngestOutcome):
+        return _observe(pending)
+    try:
+        outcome = pending.result()
+    except Exception as exc:  # e.g. a crashed worker process
+        outcome = IngestOutcome(file_path=file_path, error=str(exc))
+    return _observe(outcome)
 
 
+def _observe(outcome: IngestOutcome) -> IngestOutcome:
+    """Record an outcome's metrics here, since worker processes cannot report their own."""
+
+    if outcome.error is not None:
+        INGEST_FAILURES.inc()
+        return outcome
+    INGESTED_DOCUMENTS.inc(source="extracted" if outcome.timings else "cache")
+    INGESTED_BYTES.inc(outcome.bytes_read)
+    for name, seconds in outcome.timings.items():
+        observe_stage(name, seconds)
+    return outcome
+
+
+def iter_ingest(
+    folder_path: Path,
+    workers: int = 1,
+    max_in_flight: Optional[int] = None,
+    cache: Optional[IngestionCache] = None,
+) -> Iterator[IngestOutcome]:
+    """Yield one outcome per supported file, in directory-walk order.
+
+    With ``workers > 1`` extraction runs in a process pool (pdfminer is pure
+    Python and CPU-bound). At most ``max_in_flight`` files (default: twice the
+    worker count) are submitted ahead of the one being yielded, which bounds
+    the number of extracted texts held in memory at once.
+
+    With a ``cache``, files whose size and mtime match the folder's manifest
+    are served from disk without extraction, and the manifest is rewritten
+    (dropping deleted files) once every file has been yielded.
+    """
+
+    folder_path = folder_path.expanduser().resolve()
+    if not folder_path.exists():
+        raise FileNotFoundError(f"Folder not found: {folder_path}")
+
+    manifest = cache.open(folder_path) if cache is not None else None
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    window = max(max_in_flight or workers * 2, 1) if executor is not None else 1
+    pending: Deque[Tuple[Path, Union[IngestOutcome, Future, _StatFuture]]] = deque()
+    try:
+        for file_path in _candidate_files(folder_path):
+            pending.append((file_path, _start(file_path, manifest, executor)))
+            if len(pending) >= window:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if manifest is not None:
+        manifest.save()
+
+
+def iter_document_batches(
+    folder_path: Path,
+    batch_size: int,
+    workers: int = 1,
+    cache: Optional[IngestionCache] = None,
+) -> Iterator[List[Document]]:
+    """Yield the folder's readable documents in lists of up to ``batch_size``.
+
+    Like :func:`ingest_folder`, but only one batch of texts is held at a time,
+    so callers can write a corpus larger than memory to a store as it is read.
+    """
+
+    batch: List[Document] = []
+    for outcome in iter_ingest(folder_path, workers=workers, cache=cache):
+        if outcome.error is not None:
+            logger.warning("Failed to read %s: %s", outcome.file_path, outcome.error)
+            continue
+        batch.append(outcome.document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ingest_folder(
+    folder_path: Path,
+    workers: int = 1,
+    cache: Optional[IngestionCache] = None,
+) -> List[Document]:
+    """Walk a folder tree and return normalized Document objects.
+
+    Files that cannot be read are logged and skipped. ``workers`` > 1 extracts
+    files in parallel; the returned order is the same as a serial run. A
+    ``cache`` makes re-ingesting the same folder only process changed files.
+    """
+
+    documents: List[Document] = []
+    for batch in iter_document_batches(folder_path, batch_size=256, workers=workers, cache=cache):
+        documents.extend(batch)
+
+    return documents
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import IO, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.inference import InferenceEngine
+
+DEFAULT_ARTIFACTS = Path(__file__).resolve().parent / "artifacts"
+
+
+def score_file(
+    input_path: Path,
+    output: IO[str],
+    artifacts_dir: Path,
+    text_column: str = "text",
+    id_column: Optional[str] = None,
+    top_k: int = 5,
+    batch_size: int = 1024,
+) -> int:
+    """Score every row of a CSV file and write one JSON line per row.
+
+    Rows are read and scored in chunks of ``batch_size`` through
+    :meth:`InferenceEngine.predict_batch`. Returns the number of rows scored.
+    """
+
+    engine = InferenceEngine(artifacts_dir)
+    if not engine.is_ready:
+        raise RuntimeError(f"No trained models found in {artifacts_dir}.")
+
+    scored = 0
+    for chunk in pd.read_csv(input_path, chunksize=batch_size):
+        if text_column not in chunk.columns:
+            raise ValueError(f"Input is missing the text column '{text_column}'.")
+        if id_column and id_column not in chunk.columns:
+            raise ValueError(f"Input is missing the id column '{id_column}'.")
+        texts = chunk[text_column].fillna("").astype(str).tolist()
+        ids = chunk[id_column].tolist() if id_column else chunk.index.tolist()
+        for row_id, predictions in zip(ids, engine.predict_batch(texts, top_k=top_k)):
+            record = {
+                "id": row_id,
+                "predictions": {name: asdict(inference) for name, inference in predictions.items()},
+            }
+            output.write(json.dumps(record, default=_json_scalar) + "\n")
+        scored += len(texts)
+    return scored
+
+
+def _json_scalar(value: Any) -> Any:
+    """Turn numpy scalars (row ids, confidences) into the Python numbers they hold."""
+
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-score user profiles with ConsentLens models.")
+    parser.add_argument("input_path", type=Path, help="CSV file with one profile text per row.")
+    parser.add_argument("--output", type=Path, help="JSON Lines output file (defaults to stdout).")
+    parser.add_argument("--artifacts-dir", type=Path, default=DEFAULT_ARTIFACTS)
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--id-column", default=None)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    output_context = (
+        args.output.open("w", encoding="utf-8") if args.output else contextlib.nullcontext(sys.stdout)
+    )
+    with output_context as handle:
+        count = score_file(
+            args.input_path,
+            handle,
+            args.artifacts_dir,
+            text_column=args.text_column,
+            id_column=args.id_column,
+            top_k=args.top_k,
+            batch_size=args.batch_size,
+        )
+    print(f"✅ Scored {count} profiles", file=sys.stderr)  # noqa: T201
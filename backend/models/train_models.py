@@ -1,18 +1,35 @@
 from __future__ import annotations
 
 import argparse
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Set
 
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import scipy.sparse as sp
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.preprocessing import normalize
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_DATASET = PROJECT_ROOT / "data" / "demo_training_data.csv"
 DEFAULT_OUTPUT = Path(__file__).resolve().parent / "artifacts"
 
+FUSED_FORMAT = "fused"
+FUSED_ARTIFACT_NAME = "fused_attributes.joblib"
+HASHED_FORMAT = "hashed"
+HASHED_ARTIFACT_NAME = "hashed_attributes.joblib"
+
+VERIFICATION_REPORT = "verification.json"
+
 ATTRIBUTES = [
     "location_region",
     "field_of_study",
@@ -21,6 +38,88 @@ ATTRIBUTES = [
 ]
 
 
+@dataclass
+class Compression:
+    """How the compiled export stores coefficients, and where to check its fidelity.
+
+    ``coef_dtype`` is float64, float32 or int8; ``prune`` is the fraction of
+    each row's smallest weights to drop into a sparse matrix. Compressed
+    exports are compared with the full models on the texts of ``holdout_path``,
+    which should hold texts the models were not trained on.
+    """
+
+    coef_dtype: str = "float64"
+    prune: float = 0.0
+    holdout_path: Optional[Path] = None
+
+    @property
+    def is_lossy(self) -> bool:
+        return self.coef_dtype != "float64" or self.prune > 0.0
+
+
+def build_vectorizer() -> TfidfVectorizer:
+    return TfidfVectorizer(
+        ngram_range=(1, 2),
+        max_features=5000,
+        min_df=1,
+        stop_words="english",
+    )
+
+
+def build_classifier() -> LogisticRegression:
+    return LogisticRegression(max_iter=600, random_state=42, n_jobs=None)
+
+
+def build_hashing_vectorizer(n_features: int = 2**20) -> HashingVectorizer:
+    """Stateless counterpart of :func:`build_vectorizer` producing raw counts."""
+
+    return HashingVectorizer(
+        ngram_range=(1, 2),
+        stop_words="english",
+        n_features=n_features,
+        alternate_sign=False,
+        norm=None,
+    )
+
+
+def build_streaming_classifier() -> SGDClassifier:
+    return SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+
+
+@contextmanager
+def _stage(timings: Dict[str, float], name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def _fit_classifier(tfidf_matrix, labels: List[str]) -> LogisticRegression:
+    classifier = build_classifier()
+    classifier.fit(tfidf_matrix, labels)
+    return classifier
+
+
+def fit_classifiers(
+    tfidf_matrix,
+    labels_by_attribute: Dict[str, List[str]],
+    n_jobs: int = 1,
+) -> Dict[str, LogisticRegression]:
+    """Fit one classifier per attribute on a shared TF-IDF matrix, ``n_jobs`` at a time.
+
+    Each fit is independent and seeded, so the result does not depend on
+    ``n_jobs``. Worker processes receive the matrix memory-mapped rather
+    than copied.
+    """
+
+    classifiers = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_fit_classifier)(tfidf_matrix, labels)
+        for labels in labels_by_attribute.values()
+    )
+    return dict(zip(labels_by_attribute, classifiers))
+
+
 def train_attribute(
     attribute: str,
     texts: List[str],
@@ -29,17 +128,31 @@ def train_attribute(
 ) -> Path:
     """Train a TF-IDF + LogisticRegression model for one attribute."""
 
-    vectorizer = TfidfVectorizer(
-        ngram_range=(1, 2),
-        max_features=5000,
-        min_df=1,
-        stop_words="english",
-    )
+    vectorizer = build_vectorizer()
     tfidf_matrix = vectorizer.fit_transform(texts)
+    classifier = _fit_classifier(tfidf_matrix, labels)
+    return save_attribute(attribute, vectorizer, classifier, output_dir)
 
-    classifier = LogisticRegression(max_iter=600, random_state=42, n_jobs=None)
-    classifier.fit(tfidf_matrix, labels)
 
+def remove_other_artifacts(output_dir: Path, keep: Set[str]) -> None:
+    """Delete the artifacts this script writes, other than ``keep``, from ``output_dir``.
+
+    The inference engine serves a fused or hashed artifact in preference to
+    per-attribute ones, so switching formats must not leave the old one behind.
+    """
+
+    names = {f"{attribute}.joblib" for attribute in ATTRIBUTES}
+    names.update({FUSED_ARTIFACT_NAME, HASHED_ARTIFACT_NAME})
+    for name in names - keep:
+        (output_dir / name).unlink(missing_ok=True)
+
+
+def save_attribute(
+    attribute: str,
+    vectorizer: TfidfVectorizer,
+    classifier: LogisticRegression,
+    output_dir: Path,
+) -> Path:
     artifact_path = output_dir / f"{attribute}.joblib"
     joblib.dump(
         {
@@ -52,26 +165,332 @@ def train_attribute(
     return artifact_path
 
 
-def main(data_path: Path, output_dir: Path) -> None:
-    output_dir.mkdir(parents=True, exist_ok=True)
-    df = pd.read_csv(data_path)
-    if "text" not in df.columns:
-        raise ValueError("Dataset must include a 'text' column.")
+def save_fused(
+    vectorizer: TfidfVectorizer,
+    classifiers: Dict[str, LogisticRegression],
+    output_dir: Path,
+) -> Path:
+    """Save classifiers trained on one shared vectorizer as a fused artifact.
+
+    The inference engine stacks the classifiers into a single
+    coefficient/intercept matrix, so a text is tokenized once and every
+    attribute is scored with one mat-mul.
+    """
 
-    texts = df["text"].fillna("").tolist()
+    artifact_path = output_dir / FUSED_ARTIFACT_NAME
+    joblib.dump(
+        {
+            "format": FUSED_FORMAT,
+            "vectorizer": vectorizer,
+            "classifiers": classifiers,
+        },
+        artifact_path,
+    )
+    return artifact_path
+
+
+def _read_chunks(data_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    header = pd.read_csv(data_path, nrows=0).columns
+    if "text" not in header:
+        raise ValueError("Dataset must include a 'text' column.")
     for attribute in ATTRIBUTES:
-        if attribute not in df.columns:
+        if attribute not in header:
             raise ValueError(f"Dataset missing required column '{attribute}'.")
-        labels = df[attribute].fillna("Unknown").tolist()
-        artifact_path = train_attribute(attribute, texts, labels, output_dir)
-        print(f"✅ Trained {attribute} -> {artifact_path}")  # noqa: T201
+    for chunk in pd.read_csv(data_path, chunksize=chunk_size, usecols=["text", *ATTRIBUTES]):
+        chunk["text"] = chunk["text"].fillna("")
+        chunk[ATTRIBUTES] = chunk[ATTRIBUTES].fillna("Unknown")
+        yield chunk
+
+
+def train_streaming(
+    data_path: Path,
+    output_dir: Path,
+    chunk_size: int = 10_000,
+    n_features: int = 2**20,
+    epochs: int = 5,
+    top_features: int = 2000,
+    compile: bool = True,
+    compression: Optional[Compression] = None,
+) -> Dict[str, float]:
+    """Train every attribute out of core and return the seconds spent in each stage.
+
+    The CSV is read ``chunk_size`` rows at a time, so memory depends on the
+    chunk size and ``n_features`` rather than on the dataset:
+
+    1. ``scan`` counts documents, document frequencies per hashed feature and
+       the classes of every attribute.
+    2. ``fit`` runs ``epochs`` passes of ``partial_fit`` on TF-IDF weighted
+       hashed counts, one linear classifier per attribute.
+    3. ``feature_map`` records, for the ``top_features`` highest-weighted
+       features of every class, the term hashed there most often, so
+       explanations can name them.
+    """
+
+    timings: Dict[str, float] = {}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    hashing = build_hashing_vectorizer(n_features)
+
+    with _stage(timings, "scan"):
+        n_documents = 0
+        document_frequency = np.zeros(n_features, dtype=np.int64)
+        classes: Dict[str, Set[str]] = {attribute: set() for attribute in ATTRIBUTES}
+        for chunk in _read_chunks(data_path, chunk_size):
+            counts = hashing.transform(chunk["text"]).tocsc()
+            document_frequency += np.diff(counts.indptr)
+            n_documents += len(chunk)
+            for attribute in ATTRIBUTES:
+                classes[attribute].update(chunk[attribute].astype(str))
+        # Smoothed idf, as TfidfVectorizer computes it.
+        idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1.0
+
+    with _stage(timings, "fit"):
+        classifiers = {attribute: build_streaming_classifier() for attribute in ATTRIBUTES}
+        idf_diagonal = sp.diags(idf)
+        for _ in range(epochs):
+            for chunk in _read_chunks(data_path, chunk_size):
+                tfidf = normalize(hashing.transform(chunk["text"]).tocsr() @ idf_diagonal)
+                for attribute, classifier in classifiers.items():
+                    classifier.partial_fit(
+                        tfidf,
+                        chunk[attribute].astype(str),
+                        classes=sorted(classes[attribute]),
+                    )
+
+    with _stage(timings, "feature_map"):
+        feature_map = _reverse_feature_map(data_path, chunk_size, hashing, classifiers, top_features)
+
+    with _stage(timings, "save"):
+        artifact_path = output_dir / HASHED_ARTIFACT_NAME
+        joblib.dump(
+            {
+                "format": HASHED_FORMAT,
+                "hashing": hashing,
+                "idf": idf,
+                "norm": "l2",
+                "sublinear_tf": False,
+                "feature_map": feature_map,
+                "classifiers": classifiers,
+            },
+            artifact_path,
+        )
+        remove_other_artifacts(output_dir, {HASHED_ARTIFACT_NAME})
+        print(f"✅ Trained {', '.join(ATTRIBUTES)} -> {artifact_path}")  # noqa: T201
+
+    if compile:
+        with _stage(timings, "compile"):
+            compiled_dir = compile_artifacts(output_dir, compression)
+        print(f"✅ Compiled -> {compiled_dir}")  # noqa: T201
+
+    for stage, seconds in timings.items():
+        print(f"   {stage:<12} {seconds:8.2f}s")  # noqa: T201
+    return timings
+
+
+def _reverse_feature_map(
+    data_path: Path,
+    chunk_size: int,
+    hashing: HashingVectorizer,
+    classifiers: Dict[str, SGDClassifier],
+    top_features: int,
+) -> Dict[int, str]:
+    """Name the highest-weighted hashed features by the terms that hash to them."""
+
+    wanted: Set[int] = set()
+    for classifier in classifiers.values():
+        for row in np.atleast_2d(classifier.coef_):
+            wanted.update(np.argsort(row)[::-1][:top_features].tolist())
+            if len(classifier.classes_) == 2:
+                wanted.update(np.argsort(row)[:top_features].tolist())
+
+    analyzer = hashing.build_analyzer()
+    hasher = FeatureHasher(
+        n_features=hashing.n_features, input_type="string", alternate_sign=False
+    )
+    term_counts: Dict[int, Counter] = defaultdict(Counter)
+    for chunk in _read_chunks(data_path, chunk_size):
+        chunk_terms = Counter(term for text in chunk["text"] for term in analyzer(text))
+        terms = list(chunk_terms)
+        if not terms:
+            continue
+        buckets = hasher.transform([term] for term in terms).tocsr().indices
+        for term, bucket in zip(terms, buckets.tolist()):
+            if bucket in wanted:
+                term_counts[bucket][term] += chunk_terms[term]
+    return {bucket: counts.most_common(1)[0][0] for bucket, counts in term_counts.items()}
+
+
+def compile_artifacts(output_dir: Path, compression: Optional[Compression] = None) -> Path:
+    """Export the trained artifacts in the memory-mappable compiled format.
+
+    The inference engine loads ``compiled/`` without unpickling any sklearn
+    object, as long as it was compiled from the joblib files next to it. A
+    lossy ``compression`` is verified against the full models on its holdout
+    texts, and the report is written next to the arrays.
+    """
+
+    from backend.inference import InferenceEngine, compare_engines
+
+    compression = compression or Compression()
+    # Load the joblib files even when an earlier (possibly lossy) export matches
+    # them, so neither the new export nor its reference is built from one.
+    engine = InferenceEngine(output_dir, use_compiled=False)
+    compiled_dir = engine.export_compiled(
+        coef_dtype=compression.coef_dtype, prune=compression.prune
+    )
+    if compression.is_lossy and compression.holdout_path is not None:
+        texts = pd.read_csv(compression.holdout_path, usecols=["text"])["text"].fillna("").tolist()
+        report = compare_engines(engine, InferenceEngine(output_dir), texts)
+        report_path = compiled_dir / VERIFICATION_REPORT
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        weights = report["weights_bytes"]
+        print(  # noqa: T201
+            f"   weights {weights['reference']:,} -> {weights['candidate']:,} bytes"
+            f" on {report['texts']} holdout texts"
+        )
+        for attribute, stats in report["attributes"].items():
+            print(  # noqa: T201
+                f"   {attribute:<16} agreement {stats['agreement']:.3f}"
+                f"  top-feature overlap {stats['top_feature_overlap']:.3f}"
+                f"  max confidence delta {stats['max_confidence_delta']:.4f}"
+            )
+    elif compression.is_lossy:
+        print("   compressed weights were not verified: no holdout texts given")  # noqa: T201
+    return compiled_dir
+
+
+def main(
+    data_path: Path,
+    output_dir: Path,
+    fused: bool = False,
+    compile: bool = True,
+    n_jobs: int = 1,
+    compression: Optional[Compression] = None,
+) -> Dict[str, float]:
+    """Train every attribute and return the seconds spent in each stage.
+
+    The corpus is featurized once. Per-attribute artifacts all carry that
+    same vectorizer, which is what fitting one per attribute produced anyway.
+    The classifiers are then fitted ``n_jobs`` at a time.
+    """
+
+    timings: Dict[str, float] = {}
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with _stage(timings, "load"):
+        df = pd.read_csv(data_path)
+        if "text" not in df.columns:
+            raise ValueError("Dataset must include a 'text' column.")
+
+        texts = df["text"].fillna("").tolist()
+        labels_by_attribute: Dict[str, List[str]] = {}
+        for attribute in ATTRIBUTES:
+            if attribute not in df.columns:
+                raise ValueError(f"Dataset missing required column '{attribute}'.")
+            labels_by_attribute[attribute] = df[attribute].fillna("Unknown").tolist()
+
+    with _stage(timings, "featurize"):
+        vectorizer = build_vectorizer()
+        tfidf_matrix = vectorizer.fit_transform(texts)
+    with _stage(timings, "fit"):
+        classifiers = fit_classifiers(tfidf_matrix, labels_by_attribute, n_jobs=n_jobs)
+
+    with _stage(timings, "save"):
+        if fused:
+            artifact_path = save_fused(vectorizer, classifiers, output_dir)
+            remove_other_artifacts(output_dir, {artifact_path.name})
+            print(f"✅ Trained {', '.join(ATTRIBUTES)} -> {artifact_path}")  # noqa: T201
+        else:
+            written = set()
+            for attribute, classifier in classifiers.items():
+                artifact_path = save_attribute(attribute, vectorizer, classifier, output_dir)
+                written.add(artifact_path.name)
+                print(f"✅ Trained {attribute} -> {artifact_path}")  # noqa: T201
+            remove_other_artifacts(output_dir, written)
+
+    if compile:
+        with _stage(timings, "compile"):
+            compiled_dir = compile_artifacts(output_dir, compression)
+        print(f"✅ Compiled -> {compiled_dir}")  # noqa: T201
+
+    for stage, seconds in timings.items():
+        print(f"   {stage:<10} {seconds:8.2f}s")  # noqa: T201
+    return timings
 
 
 if __name__ == "__main__":
+    if not __package__:
+        sys.path.insert(0, str(PROJECT_ROOT))
     parser = argparse.ArgumentParser(description="Train ConsentLens demo models.")
     parser.add_argument("--data-path", type=Path, default=DEFAULT_DATASET)
     parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Write a single fused artifact with one shared vectorizer for all attributes.",
+    )
+    parser.add_argument(
+        "--compile",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Also export the memory-mappable compiled format the API loads without unpickling.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=-1,
+        help="Classifiers to fit at once; -1 uses every core.",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Train out of core on hashed features, reading the CSV in chunks.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--n-features", type=int, default=2**20)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument(
+        "--coef-dtype",
+        choices=["float64", "float32", "int8"],
+        default="float64",
+        help="Precision of the compiled coefficients.",
+    )
+    parser.add_argument(
+        "--prune",
+        type=float,
+        default=0.0,
+        help="Fraction of each class's smallest weights to drop into a sparse matrix.",
+    )
+    parser.add_argument(
+        "--holdout-path",
+        type=Path,
+        default=None,
+        help="CSV of texts kept out of training that compressed models are checked on; "
+        "required with --coef-dtype float32/int8 or --prune.",
+    )
     args = parser.parse_args()
-    main(args.data_path, args.output_dir)
+    compression = Compression(args.coef_dtype, args.prune, args.holdout_path)
+    if compression.is_lossy and args.compile:
+        if args.holdout_path is None:
+            parser.error("compressed exports need --holdout-path to be verified against.")
+        if args.holdout_path.resolve() == args.data_path.resolve():
+            parser.error("--holdout-path must not be the training CSV.")
+    if args.streaming:
+        train_streaming(
+            args.data_path,
+            args.output_dir,
+            chunk_size=args.chunk_size,
+            n_features=args.n_features,
+            epochs=args.epochs,
+            compile=args.compile,
+            compression=compression,
+        )
+    else:
+        main(
+            args.data_path,
+            args.output_dir,
+            fused=args.fused,
+            compile=args.compile,
+            n_jobs=args.jobs,
+            compression=compression,
+        )
 
 
@@ -0,0 +1,23 @@
+"""Process-wide metrics and per-request stage timings."""
+
+from .metrics import (
+    CONTENT_TYPE,
+    REGISTRY,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    collect_timings,
+    observe_stage,
+    stage,
+)
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "collect_timings",
+    "observe_stage",
+    "stage",
+]
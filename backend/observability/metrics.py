@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import abc
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; spans a cached lookup (sub-millisecond) to a large PDF ingest.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelValues = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+
+class _Metric(abc.ABC):
+    kind = ""
+    # Appended to ``name`` in the HELP and TYPE lines, which must name the samples.
+    family_suffix = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[label]) for label in self.labelnames)
+
+    def _format(self, suffix: str, key: LabelValues, value: float, extra: str = "") -> str:
+        pairs = [f'{label}="{_escape(text)}"' for label, text in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        labels = "{" + ",".join(pairs) + "}" if pairs else ""
+        return f"{self.name}{suffix}{labels} {_number(value)}"
+
+    def render(self) -> List[str]:
+        family = self.name + self.family_suffix
+        lines = [f"# HELP {family} {self.documentation}", f"# TYPE {family} {self.kind}"]
+        return lines + self._samples()
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of every label set, without the HELP and TYPE header."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing total, one per combination of label values."""
+
+    kind = "counter"
+    family_suffix = "_total"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [self._format("_total", key, value) for key, value in values]
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed cumulative buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(set(buckets) - {math.inf})) + (math.inf,)
+        # Per label set: per-bucket (non-cumulative) counts, then sum.
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series is not None else 0
+
+    def sum(self, **labels: str) -> float:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[1][0] if series is not None else 0.0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = sorted(
+                (key, (list(counts), total[0])) for key, (counts, total) in self._series.items()
+            )
+        lines: List[str] = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(self._format("_bucket", key, cumulative, f'le="{_number(bound)}"'))
+            lines.append(self._format("_sum", key, total))
+            lines.append(self._format("_count", key, cumulative))
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered together in the Prometheus text format.
+
+    ``counter`` and ``histogram`` return the existing metric when the name is
+    already registered, so modules can declare their metrics at import time.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: M) -> M:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered with another shape.")
+        return existing
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "consentlens_stage_duration_seconds",
+    "Time spent in each pipeline stage.",
+    ["stage"],
+)
+
+# Per-request stage totals; set by ``collect_timings`` in the thread doing the work.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "consentlens_request_timings", default=None
+)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    """Record ``seconds`` spent in stage ``name``, e.g. when it was timed in another process."""
+
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block (or decorated function) as one run of stage ``name``.
+
+    Stages may nest; an outer stage's time includes its inner stages.
+    """
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Sum the seconds of every stage run in this context into the yielded dict."""
+
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "collect_timings",
+    "observe_stage",
+    "stage",
+]
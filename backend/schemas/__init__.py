@@ -1,26 +1,38 @@
 """Pydantic schema exports."""
 
 from .api_models import (
+    AnalysisJobResponse,
     AnalysisRequest,
     AnalysisResponse,
     AttributeExplanation,
+    DocTypeMarginalRisk,
     DocumentDetail,
+    DocumentImpact,
     DocumentSummary,
     FolderIngestRequest,
     IngestResponse,
     ScenarioResult,
     SupportingSentence,
+    SweepAttributeScore,
+    SweepResponse,
+    SweepSubsetResult,
 )
 
 __all__ = [
+    "AnalysisJobResponse",
     "AnalysisRequest",
     "AnalysisResponse",
     "AttributeExplanation",
+    "DocTypeMarginalRisk",
     "DocumentDetail",
+    "DocumentImpact",
     "DocumentSummary",
     "FolderIngestRequest",
     "IngestResponse",
     "ScenarioResult",
     "SupportingSentence",
+    "SweepAttributeScore",
+    "SweepResponse",
+    "SweepSubsetResult",
 ]
 
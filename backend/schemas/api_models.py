@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from backend.domain.document import DocType
 
@@ -12,6 +12,19 @@ class FolderIngestRequest(BaseModel):
     """Incoming payload for folder ingestion."""
 
     folder_path: str = Field(..., description="Absolute path to the folder to ingest.")
+    workers: int = Field(
+        1,
+        ge=1,
+        le=64,
+        description="Number of worker processes used to extract files in parallel.",
+    )
+    use_cache: bool = Field(
+        False,
+        description=(
+            "Reuse text extracted by earlier ingests of this folder and only process new or"
+            " changed files. The cache keeps extracted text on local disk."
+        ),
+    )
 
 
 class DocumentSummary(BaseModel):
@@ -46,6 +59,24 @@ class SupportingSentence(BaseModel):
     text: str
 
 
+class DocumentImpact(BaseModel):
+    """How an attribute prediction changes when one document is left out."""
+
+    doc_id: str
+    doc_type: DocType
+    source_file: str
+    predicted_value_without: Optional[str]
+    confidence_without: float
+    impact: float = Field(
+        ...,
+        description=(
+            "Drop in the probability of the scenario's predicted value when the document"
+            " is removed; negative values mean the document argues against it."
+        ),
+    )
+    changes_prediction: bool
+
+
 class AttributeExplanation(BaseModel):
     """Explainable output for a single attribute."""
 
@@ -55,6 +86,7 @@ class AttributeExplanation(BaseModel):
     top_features: List[str]
     supporting_sentences: List[SupportingSentence]
     available: bool = True
+    document_impacts: Optional[List[DocumentImpact]] = None
 
 
 class ScenarioResult(BaseModel):
@@ -78,13 +110,84 @@ class AnalysisRequest(BaseModel):
     )
     top_k_features: int = Field(5, ge=1, le=10)
     max_supporting_sentences: int = Field(3, ge=1, le=10)
+    sentence_ranking: Literal["first_match", "contribution"] = Field(
+        "first_match",
+        description=(
+            "'first_match' returns the first sentences containing a top feature;"
+            " 'contribution' returns the sentences that score highest for the predicted value."
+        ),
+    )
+    include_document_impacts: bool = Field(
+        False,
+        description=(
+            "Rank each scenario's documents by how much removing them changes each prediction."
+        ),
+    )
+    include_timings: bool = Field(
+        False,
+        description="Report the seconds this request spent in each pipeline stage.",
+    )
 
 
 class AnalysisResponse(BaseModel):
     """Envelope for analyze endpoint."""
 
+    # ``model_version`` names the inference models, not a pydantic attribute.
+    model_config = ConfigDict(protected_namespaces=())
+
     generated_at: datetime
+    model_version: str
     scenarios: List[ScenarioResult]
+    timings: Optional[Dict[str, float]] = Field(
+        None,
+        description=(
+            "Seconds per stage when requested. Stages nest: 'analyze' is the whole request and"
+            " 'scenario.compute' includes the inference and explanation stages it ran."
+        ),
+    )
+
+
+class AnalysisJobResponse(BaseModel):
+    """State of a background analysis job and the scenarios finished so far."""
+
+    job_id: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    scenarios_total: int
+    scenarios_completed: int
+    scenarios: List[ScenarioResult]
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class SweepAttributeScore(BaseModel):
+    """Prediction for one attribute under one doc-type combination."""
+
+    name: str
+    predicted_value: Optional[str]
+    confidence: float
+    available: bool = True
 
 
+class SweepSubsetResult(BaseModel):
+    """Scores for every attribute when exactly these doc types are exposed."""
 
+    doc_types: List[DocType]
+    document_count: int
+    attributes: List[SweepAttributeScore]
+
+
+class DocTypeMarginalRisk(BaseModel):
+    """Confidence each attribute gains, on average, from exposing one doc type."""
+
+    doc_type: DocType
+    document_count: int
+    marginal_risk: Dict[str, float]
+
+
+class SweepResponse(BaseModel):
+    """Envelope for the exhaustive exposure sweep endpoint."""
+
+    generated_at: datetime
+    subsets: List[SweepSubsetResult]
+    marginal_risk: List[DocTypeMarginalRisk]
@@ -0,0 +1,5 @@
+"""Per-user workspaces with their own corpus and caches."""
+
+from .manager import DEFAULT_SESSION, Session, SessionLimitReached, SessionManager, SessionNotFound
+
+__all__ = ["DEFAULT_SESSION", "Session", "SessionLimitReached", "SessionManager", "SessionNotFound"]
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from backend.analysis import ScenarioResultCache
+from backend.domain.sqlite_store import SQLiteDocumentStore
+from backend.domain.store import DocumentStore
+from backend.explanation import ExplanationEngine
+from backend.inference import InferenceEngine, TermCountIndex
+
+DEFAULT_SESSION = "default"
+SESSION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+Store = Union[DocumentStore, SQLiteDocumentStore]
+
+
+class SessionNotFound(LookupError):
+    """Raised when a request reads from a session that does not exist."""
+
+
+class SessionLimitReached(RuntimeError):
+    """Raised when a new session is needed but every other one is in use."""
+
+
+@dataclass
+class Session:
+    """One workspace: a corpus plus the indexes and caches derived from it.
+
+    ``ingest_lock`` is held while an ingest rebuilds the corpus, so two
+    ingests into the same session never interleave.
+    """
+
+    name: str
+    store: Store
+    term_counts: TermCountIndex
+    result_cache: ScenarioResultCache
+    explanation: ExplanationEngine
+    last_used: float = field(default_factory=time.monotonic)
+    active: int = 0
+    ingest_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the texts, term counts and sentence indexes."""
+
+        return self.store.nbytes + self.term_counts.nbytes + self.explanation.cached_bytes
+
+    def clear(self) -> None:
+        """Empty the corpus and every index and cache derived from it."""
+
+        self.store.replace_all([])
+        self.term_counts.replace_all([])
+        self.result_cache.clear()
+        self.explanation.clear()
+
+    def close(self) -> None:
+        """Close an on-disk store's connection; in-memory state goes with the session."""
+
+        if isinstance(self.store, SQLiteDocumentStore):
+            self.store.close()
+
+
+class SessionManager:
+    """Named sessions under a shared byte budget.
+
+    Requests hold a session through :meth:`lease`, which pins it against
+    eviction. When a lease ends and the sessions together exceed
+    ``max_bytes``, idle sessions are dropped least recently used first. The
+    default session, which backs clients that do not name one, exists from
+    the start and is never evicted. Only leases with ``create`` (ingests) add
+    sessions; at most ``max_sessions`` exist at once, and making room evicts
+    the least recently used idle one. ``store_factory`` builds each new
+    session's document store from its name and defaults to an in-memory
+    :class:`DocumentStore`. Each session's sentence indexes live in a fork of
+    ``explanation_engine``.
+    """
+
+    def __init__(
+        self,
+        inference_engine: InferenceEngine,
+        max_bytes: int,
+        store_factory: Optional[Callable[[str], Store]] = None,
+        explanation_engine: Optional[ExplanationEngine] = None,
+        max_sessions: int = 64,
+    ) -> None:
+        if max_sessions < 1:
+            raise ValueError("max_sessions must leave room for the default session.")
+        self._engine = inference_engine
+        self._explanation = explanation_engine or ExplanationEngine()
+        self._max_bytes = max_bytes
+        self._max_sessions = max_sessions
+        self._store_factory = store_factory or (lambda _: DocumentStore())
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        with self._lock:
+            self._touch(DEFAULT_SESSION, create=True)
+
+    def get(self, name: str = DEFAULT_SESSION) -> Optional[Session]:
+        """Return the named session, or ``None``; never creates one.
+
+        The session is not pinned, so it may be evicted (and its store
+        closed) while the caller still holds it. Requests use :meth:`lease`.
+        """
+
+        _validate_name(name)
+        with self._lock:
+            return self._sessions.get(name)
+
+    @contextmanager
+    def lease(self, name: str = DEFAULT_SESSION, create: bool = False) -> Iterator[Session]:
+        """Pin a session for the duration of a request, then enforce the budget.
+
+        Raises :class:`SessionNotFound` for an unknown name unless ``create``
+        is set, and :class:`SessionLimitReached` when creating one would
+        exceed ``max_sessions`` and no idle session can be evicted.
+        """
+
+        _validate_name(name)
+        with self._lock:
+            session = self._touch(name, create)
+            session.active += 1
+        try:
+            yield session
+        finally:
+            with self._lock:
+                session.active -= 1
+                session.last_used = time.monotonic()
+                self._evict_over_budget()
+
+    def use_engine(self, inference_engine: InferenceEngine) -> None:
+        """Switch every session to a new model set.
+
+        Term counts depend on the engine's vocabularies, so each session gets
+        a fresh index that refills lazily, and cached sentence vectors of the
+        old models are dropped. Requests already running keep the index, and
+        with it the engine, they started with.
+        """
+
+        with self._lock:
+            self._engine = inference_engine
+            for session in self._sessions.values():
+                session.term_counts = TermCountIndex(inference_engine)
+                session.result_cache.clear()
+                session.explanation.drop_vectors()
+
+    def drop(self, name: str) -> bool:
+        """Empty a session's store and forget it; the default session is only emptied."""
+
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                return False
+            session.clear()
+            if name != DEFAULT_SESSION:
+                del self._sessions[name]
+                session.close()
+            return True
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(session.nbytes for session in self._sessions.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions: List[Dict[str, Any]] = [
+                {
+                    "name": session.name,
+                    "documents": len(session.store),
+                    "bytes": session.nbytes,
+                    "active_requests": session.active,
+                }
+                for session in self._sessions.values()
+            ]
+        return {
+            "max_bytes": self._max_bytes,
+            "max_sessions": self._max_sessions,
+            "bytes": sum(entry["bytes"] for entry in sessions),
+            "evictions": self.evictions,
+            "sessions": sessions,
+        }
+
+    def _touch(self, name: str, create: bool) -> Session:
+        session = self._sessions.get(name)
+        if session is None:
+            if not create:
+                raise SessionNotFound(f"Session not found: {name}")
+            self._make_room()
+            session = Session(
+                name=name,
+                store=self._store_factory(name),
+                term_counts=TermCountIndex(self._engine),
+                result_cache=ScenarioResultCache(),
+                explanation=self._explanation.fork(),
+            )
+            self._sessions[name] = session
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(name)
+        return session
+
+    def _make_room(self) -> None:
+        for name in list(self._sessions):
+            if len(self._sessions) < self._max_sessions:
+                return
+            if self._evictable(name):
+                self._evict(name)
+        if len(self._sessions) >= self._max_sessions:
+            raise SessionLimitReached(f"All {self._max_sessions} sessions are in use.")
+
+    def _evict_over_budget(self) -> None:
+        total = sum(session.nbytes for session in self._sessions.values())
+        for name in list(self._sessions):
+            if total <= self._max_bytes:
+                break
+            if self._evictable(name):
+                total -= self._sessions[name].nbytes
+                self._evict(name)
+
+    def _evictable(self, name: str) -> bool:
+        return name != DEFAULT_SESSION and not self._sessions[name].active
+
+    def _evict(self, name: str) -> None:
+        session = self._sessions.pop(name)
+        session.close()
+        self.evictions += 1
+
+
+def _validate_name(name: str) -> None:
+    if not SESSION_NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid session name: {name!r}")
+
+
+__all__ = [
+    "DEFAULT_SESSION",
+    "Session",
+    "SessionLimitReached",
+    "SessionManager",
+    "SessionNotFound",
+]
@@ -0,0 +1,5 @@
+"""Throughput, latency and memory benchmarks for the ConsentLens pipeline.
+
+Run ``python -m benchmarks --help`` for the ``generate``, ``run`` and
+``compare`` commands.
+"""
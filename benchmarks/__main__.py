@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from .corpus import CorpusSpec, generate_corpus
+from .runner import compare_results, load_results, run_benchmarks
+from .stages import STAGES, BenchmarkConfig
+
+
+def _add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = CorpusSpec()
+    parser.add_argument("--emails", type=int, default=defaults.emails)
+    parser.add_argument("--notes", type=int, default=defaults.notes)
+    parser.add_argument("--cvs", type=int, default=defaults.cvs)
+    parser.add_argument("--transcripts", type=int, default=defaults.transcripts)
+    parser.add_argument("--pdfs", type=int, default=defaults.pdfs)
+    parser.add_argument("--doc-chars", type=int, default=defaults.doc_chars)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def _corpus_spec(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(
+        emails=args.emails,
+        notes=args.notes,
+        cvs=args.cvs,
+        transcripts=args.transcripts,
+        pdfs=args.pdfs,
+        doc_chars=args.doc_chars,
+        seed=args.seed,
+    )
+
+
+def _generate(args: argparse.Namespace) -> int:
+    written = generate_corpus(args.output_dir, _corpus_spec(args))
+    print(f"✅ Wrote {written} files -> {args.output_dir}")  # noqa: T201
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    from backend.models.train_models import DEFAULT_DATASET, main as train_main
+
+    with tempfile.TemporaryDirectory(prefix="consentlens-bench-") as scratch:
+        work_dir = Path(scratch)
+        spec = None
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            spec = _corpus_spec(args)
+            corpus_dir = work_dir / "corpus"
+            generate_corpus(corpus_dir, spec)
+        artifacts_dir = args.artifacts
+        if artifacts_dir is None:
+            artifacts_dir = work_dir / "artifacts"
+            train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+        config = BenchmarkConfig(
+            corpus_dir=corpus_dir.resolve(),
+            artifacts_dir=artifacts_dir.resolve(),
+            work_dir=work_dir,
+            repeats=args.repeats,
+            workers=args.workers,
+        )
+        results = run_benchmarks(config, args.stages, spec)
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"{'result':<24}{'p50 ms':>10}{'p95 ms':>10}{'docs/s':>12}{'RSS MiB':>10}")  # noqa: T201
+    for name, stats in results["results"].items():
+        print(  # noqa: T201
+            f"{name:<24}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+            f"{stats['docs_per_sec']:>12.1f}{stats['peak_rss_mb']:>10.1f}"
+        )
+    print(f"✅ Results -> {args.output}")  # noqa: T201
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    rows, regressions = compare_results(
+        load_results(args.baseline), load_results(args.candidate), threshold=args.threshold
+    )
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(  # noqa: T201
+            f"{row['result']:<24}{row['metric']:<14}{row['baseline']:>12.2f}"
+            f"{row['candidate']:>12.2f}{row['change']:>+9.1%}{flag}"
+        )
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")  # noqa: T201
+        return 1
+    print("✅ No regressions")  # noqa: T201
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic corpus folder.")
+    generate.add_argument("output_dir", type=Path)
+    _add_corpus_arguments(generate)
+    generate.set_defaults(handler=_generate)
+
+    run = commands.add_parser("run", help="Run benchmark stages and write a results file.")
+    run.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    run.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=None)
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--workers", type=int, default=1)
+    run.add_argument("--corpus", type=Path, default=None, help="Existing folder to use instead.")
+    run.add_argument(
+        "--artifacts", type=Path, default=None, help="Trained models (default: train the demo set)."
+    )
+    _add_corpus_arguments(run)
+    run.set_defaults(handler=_run)
+
+    compare = commands.add_parser("compare", help="Compare two results files.")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("candidate", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.10)
+    compare.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Synthetic corpora for benchmarks, built from the demo training sentences."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+from backend.models.train_models import DEFAULT_DATASET
+
+COURSES = [
+    "Data Structures",
+    "Linear Algebra",
+    "Corporate Finance",
+    "Organic Chemistry",
+    "Machine Learning",
+    "Microeconomics",
+    "Technical Writing",
+    "Statistics for Research",
+]
+GRADES = ["A", "A-", "B+", "B", "B-", "C+"]
+CONNECTIVES = ["", "", "", "Also, ", "Last week ", "Honestly, ", "As usual, ", "Next term "]
+
+
+@dataclass
+class CorpusSpec:
+    """How many files of each kind to write and roughly how long each one is."""
+
+    emails: int = 50
+    notes: int = 50
+    cvs: int = 20
+    transcripts: int = 10
+    pdfs: int = 10
+    doc_chars: int = 2000
+    seed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.emails + self.notes + self.cvs + self.transcripts + self.pdfs
+
+
+class _SentencePool:
+    def __init__(self, dataset: Path, rng: random.Random) -> None:
+        frame = pd.read_csv(dataset, usecols=["text", "doc_type"]).dropna()
+        self._rng = rng
+        self._all = frame["text"].tolist()
+        self._by_type: Dict[str, List[str]] = {
+            doc_type: group["text"].tolist() for doc_type, group in frame.groupby("doc_type")
+        }
+
+    def paragraphs(self, doc_type: str, chars: int) -> str:
+        """Sentences of mostly ``doc_type``, grouped into paragraphs, about ``chars`` long."""
+
+        own = self._by_type.get(doc_type) or self._all
+        paragraphs: List[str] = []
+        sentences: List[str] = []
+        length = 0
+        while length < chars:
+            sentence = self._rng.choice(own if self._rng.random() < 0.7 else self._all)
+            if (connective := self._rng.choice(CONNECTIVES)):
+                sentence = connective + sentence[0].lower() + sentence[1:]
+            sentences.append(sentence)
+            length += len(sentence) + 1
+            if len(sentences) >= self._rng.randint(3, 5):
+                paragraphs.append(" ".join(sentences))
+                sentences = []
+        if sentences:
+            paragraphs.append(" ".join(sentences))
+        return "\n\n".join(paragraphs)
+
+
+def generate_corpus(output_dir: Path, spec: CorpusSpec, dataset: Path = DEFAULT_DATASET) -> int:
+    """Write a reproducible folder of emails, notes, CVs, transcripts and PDFs.
+
+    File names follow the ingestion's doc-type heuristics. The same ``spec``
+    always produces the same bytes. Returns the number of files written.
+    """
+
+    rng = random.Random(spec.seed)
+    pool = _SentencePool(dataset, rng)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for index in range(spec.emails):
+        body = pool.paragraphs("email", spec.doc_chars)
+        header = f"From: sender{index}@example.com\nTo: me@example.com\nSubject: Update {index}\n\n"
+        _write(output_dir / "emails" / f"email_{index:05d}.txt", header + body)
+    for index in range(spec.notes):
+        _write(output_dir / "notes" / f"notes_{index:05d}.md", pool.paragraphs("notes", spec.doc_chars))
+    for index in range(spec.cvs):
+        _write(output_dir / "cvs" / f"cv_{index:05d}.txt", pool.paragraphs("cv", spec.doc_chars))
+    for index in range(spec.transcripts):
+        _write(output_dir / "transcripts" / f"transcript_{index:05d}.txt", _transcript(rng, pool, spec))
+    for index in range(spec.pdfs):
+        text = pool.paragraphs("cv", spec.doc_chars)
+        path = output_dir / "pdfs" / f"resume_{index:05d}.pdf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(_pdf_bytes(text))
+    return spec.total
+
+
+def _transcript(rng: random.Random, pool: _SentencePool, spec: CorpusSpec) -> str:
+    lines = [f"{course}: {rng.choice(GRADES)}" for course in rng.sample(COURSES, 5)]
+    return "Official transcript\n\n" + "\n".join(lines) + "\n\n" + pool.paragraphs(
+        "notes", max(spec.doc_chars - 200, 0)
+    )
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def _pdf_bytes(text: str, line_chars: int = 90, lines_per_page: int = 48) -> bytes:
+    """A minimal single-font PDF whose pages show ``text`` as wrapped lines."""
+
+    lines: List[str] = []
+    for paragraph in text.split("\n"):
+        words, current = paragraph.split(), ""
+        for word in words:
+            if current and len(current) + len(word) + 1 > line_chars:
+                lines.append(current)
+                current = word
+            else:
+                current = f"{current} {word}".strip()
+        lines.append(current)
+    pages = [lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    font_id = 3
+    objects: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    page_ids = []
+    for page_number, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * page_number, 5 + 2 * page_number
+        page_ids.append(page_id)
+        shown = b"".join(b"(" + _pdf_escape(line) + b") Tj T* " for line in page_lines)
+        stream = b"BT /F1 10 Tf 14 TL 50 760 Td " + shown + b"ET"
+        objects[content_id] = (
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for object_id in range(1, size):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+    return bytes(output)
+
+
+def _pdf_escape(line: str) -> bytes:
+    encoded = line.encode("latin-1", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
@@ -0,0 +1,49 @@
+"""Timing and memory measurement shared by every benchmark stage."""
+
+from __future__ import annotations
+
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+
+@dataclass
+class Sample:
+    """Latencies of repeated calls that each processed ``documents`` documents."""
+
+    documents: int
+    latencies: List[float] = field(default_factory=list)
+
+    def time(self, fn: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        result = fn()
+        self.latencies.append(time.perf_counter() - started)
+        return result
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of this process's resident memory, in MiB."""
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(sample: Sample) -> Dict[str, float]:
+    latencies = np.asarray(sample.latencies)
+    mean = float(latencies.mean()) if len(latencies) else 0.0
+    return {
+        "runs": len(latencies),
+        "documents": sample.documents,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000 if len(latencies) else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000 if len(latencies) else 0.0,
+        "mean_ms": mean * 1000,
+        "docs_per_sec": sample.documents / mean if mean > 0 else 0.0,
+    }
+
+
+__all__ = ["Sample", "peak_rss_mb", "summarize"]
@@ -0,0 +1,122 @@
+"""Run benchmark stages in isolated processes and compare result files."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .corpus import CorpusSpec
+from .harness import peak_rss_mb, summarize
+from .stages import STAGES, BenchmarkConfig
+
+RESULTS_FORMAT_VERSION = 1
+# Metrics where a larger value is a regression; for the others a smaller one is.
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "peak_rss_mb")
+HIGHER_IS_BETTER = ("docs_per_sec",)
+
+
+def run_stage(name: str, config: BenchmarkConfig) -> Dict[str, Dict[str, float]]:
+    """Run one stage in this process and summarize each of its samples."""
+
+    samples = STAGES[name](config)
+    peak = peak_rss_mb()
+    return {result: dict(summarize(sample), peak_rss_mb=peak) for result, sample in samples.items()}
+
+
+def run_benchmarks(
+    config: BenchmarkConfig,
+    stages: Optional[Sequence[str]] = None,
+    corpus: Optional[CorpusSpec] = None,
+) -> Dict[str, Any]:
+    """Run ``stages`` (default: all), each in a fresh process, and build a results document.
+
+    A fresh process per stage keeps imports, caches and the peak-RSS
+    high-water mark of one stage from leaking into the next.
+    """
+
+    results: Dict[str, Dict[str, float]] = {}
+    context = multiprocessing.get_context("spawn")
+    for name in stages or list(STAGES):
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage {name!r}; choose from {sorted(STAGES)}.")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results.update(executor.submit(run_stage, name, config).result())
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "repeats": config.repeats,
+            "workers": config.workers,
+            "corpus": asdict(corpus) if corpus is not None else str(config.corpus_dir),
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    threshold: float = 0.10,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Relative change of every shared metric, and the ones that regressed beyond ``threshold``."""
+
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    for result in sorted(set(baseline["results"]) & set(candidate["results"])):
+        before, after = baseline["results"][result], candidate["results"][result]
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if metric not in before or metric not in after:
+                continue
+            change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            rows.append(
+                {
+                    "result": result,
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "candidate": after[metric],
+                    "change": change,
+                    "regression": worse,
+                }
+            )
+            if worse:
+                regressions.append(f"{result}.{metric}")
+    return rows, regressions
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    results = json.loads(path.read_text(encoding="utf-8"))
+    if results.get("format_version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {RESULTS_FORMAT_VERSION} benchmark results file.")
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+__all__ = ["compare_results", "load_results", "run_benchmarks", "run_stage"]
@@ -0,0 +1,143 @@
+"""Benchmark stages: each times one part of the pipeline on a prepared corpus."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from backend.analysis import ScenarioDefinition, run_scenarios
+from backend.domain.document import DocType, Document
+from backend.explanation import ExplanationEngine
+from backend.inference import InferenceEngine, TermCountIndex
+from backend.ingestion.file_ingestion import ingest_folder
+
+from .harness import Sample
+
+SCENARIOS = [
+    ScenarioDefinition(name="emails_only", doc_types=[DocType.EMAIL]),
+    ScenarioDefinition(name="notes_only", doc_types=[DocType.NOTES]),
+    ScenarioDefinition(name="cv_only", doc_types=[DocType.CV]),
+    ScenarioDefinition(name="all_data", doc_types=list(DocType)),
+]
+
+
+@dataclass
+class BenchmarkConfig:
+    """Inputs shared by every stage; ``work_dir`` is scratch space for the run."""
+
+    corpus_dir: Path
+    artifacts_dir: Path
+    work_dir: Path
+    repeats: int = 5
+    workers: int = 1
+
+
+Stage = Callable[[BenchmarkConfig], Dict[str, Sample]]
+
+
+def bench_ingest(config: BenchmarkConfig) -> Dict[str, Sample]:
+    """Full extraction and cleaning of the corpus, without the ingestion cache."""
+
+    sample = Sample(documents=0)
+    for _ in range(config.repeats):
+        documents = sample.time(lambda: ingest_folder(config.corpus_dir, workers=config.workers))
+        sample.documents = len(documents)
+    return {"ingest": sample}
+
+
+def bench_predict(config: BenchmarkConfig) -> Dict[str, Sample]:
+    """Per-document ``predict`` calls and one ``predict_batch`` over the corpus."""
+
+    engine = InferenceEngine(config.artifacts_dir)
+    texts = [doc.clean_text for doc in _documents(config)]
+    single = Sample(documents=1)
+    batch = Sample(documents=len(texts))
+    for _ in range(config.repeats):
+        for text in texts:
+            single.time(lambda: engine.predict(text))
+        batch.time(lambda: engine.predict_batch(texts))
+    return {"predict": single, "predict_batch": batch}
+
+
+def bench_supporting_sentences(config: BenchmarkConfig) -> Dict[str, Sample]:
+    """Sentence lookups for each attribute's top features once documents are segmented."""
+
+    engine = InferenceEngine(config.artifacts_dir)
+    explainer = ExplanationEngine()
+    documents = _documents(config)
+    explainer.segment_documents(documents)
+    combined = " ".join(doc.clean_text for doc in documents)
+    terms = [prediction.top_features for prediction in engine.predict(combined).values()]
+    sample = Sample(documents=len(documents))
+    for _ in range(config.repeats):
+        for feature_terms in terms:
+            sample.time(lambda: explainer.collect_supporting_sentences(documents, feature_terms))
+    return {"supporting_sentences": sample}
+
+
+def bench_scenarios(config: BenchmarkConfig) -> Dict[str, Sample]:
+    """The default risk scenarios, scored from cached term counts without a result cache."""
+
+    engine = InferenceEngine(config.artifacts_dir)
+    explainer = ExplanationEngine()
+    documents = _documents(config)
+    term_counts = TermCountIndex(engine)
+    term_counts.add(documents)
+    explainer.segment_documents(documents)
+    sample = Sample(documents=len(documents))
+    for _ in range(config.repeats):
+        sample.time(
+            lambda: run_scenarios(
+                documents, SCENARIOS, engine, explainer, term_counts=term_counts
+            )
+        )
+    return {"scenarios": sample}
+
+
+def bench_api(config: BenchmarkConfig) -> Dict[str, Sample]:
+    """``/ingest`` then ``/analyze`` twice through the FastAPI app.
+
+    The second ``/analyze`` of each round is served from the session's result
+    cache; the first is computed, since ingesting invalidates the cache.
+    """
+
+    os.environ["CONSENTLENS_ARTIFACT_DIR"] = str(config.artifacts_dir)
+    os.environ["CONSENTLENS_CACHE_DIR"] = str(config.work_dir / "cache")
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+
+    ingest_sample, analyze_sample, cached_sample = Sample(0), Sample(0), Sample(0)
+    body = {"folder_path": str(config.corpus_dir), "workers": config.workers}
+    with TestClient(app) as client:
+        for _ in range(config.repeats):
+            response = ingest_sample.time(lambda: client.post("/ingest", json=body))
+            response.raise_for_status()
+            documents = response.json()["document_count"]
+            analyze_sample.time(lambda: client.post("/analyze", json={}).raise_for_status())
+            cached_sample.time(lambda: client.post("/analyze", json={}).raise_for_status())
+            for sample in (ingest_sample, analyze_sample, cached_sample):
+                sample.documents = documents
+    return {
+        "api_ingest": ingest_sample,
+        "api_analyze": analyze_sample,
+        "api_analyze_cached": cached_sample,
+    }
+
+
+STAGES: Dict[str, Stage] = {
+    "ingest": bench_ingest,
+    "predict": bench_predict,
+    "supporting_sentences": bench_supporting_sentences,
+    "scenarios": bench_scenarios,
+    "api": bench_api,
+}
+
+
+def _documents(config: BenchmarkConfig) -> List[Document]:
+    return ingest_folder(config.corpus_dir, workers=config.workers)
+
+
+__all__ = ["STAGES", "BenchmarkConfig", "SCENARIOS"]
@@ -0,0 +1,141 @@
+from pathlib import Path
+
+import pytest
+
+from backend.analysis import (
+    ScenarioDefinition,
+    ScenarioResultCache,
+    run_exposure_sweep,
+    run_scenarios,
+)
+from backend.domain.document import DocType, Document
+from backend.explanation import ExplanationEngine
+from backend.inference import InferenceEngine, TermCountIndex
+from backend.models.train_models import DEFAULT_DATASET, main as train_main
+
+
+def _document(doc_id, doc_type, text):
+    return Document(
+        doc_id=doc_id,
+        source_file=f"/tmp/{doc_id}.txt",
+        doc_type=doc_type,
+        raw_text=text,
+        clean_text=text,
+    )
+
+
+SAMPLE_DOCUMENTS = [
+    _document("a", DocType.EMAIL, "Riding the MBTA Red Line to Kendall Square for my MIT thesis."),
+    _document("b", DocType.NOTES, "Discounted cash flow models for Sunbelt logistics firms."),
+    _document("c", DocType.CV, "Leading a backend team in Palo Alto reviewing distributed systems."),
+]
+
+
+def _engine(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    return InferenceEngine(artifacts_dir)
+
+
+def test_term_count_scenarios_match_joined_text(tmp_path):
+    engine = _engine(tmp_path)
+    documents = SAMPLE_DOCUMENTS
+    scenarios = [
+        ScenarioDefinition(name="emails_only", doc_types=[DocType.EMAIL]),
+        ScenarioDefinition(name="all_data", doc_types=list(DocType)),
+    ]
+    term_counts = TermCountIndex(engine)
+    term_counts.replace_all(documents)
+    explanation_engine = ExplanationEngine()
+
+    joined = run_scenarios(documents, scenarios, engine, explanation_engine)
+    additive = run_scenarios(
+        documents, scenarios, engine, explanation_engine, term_counts=term_counts
+    )
+
+    for expected, actual in zip(joined, additive):
+        for expected_attr, actual_attr in zip(expected.attributes, actual.attributes):
+            assert actual_attr.predicted_value == expected_attr.predicted_value
+            assert actual_attr.confidence == pytest.approx(expected_attr.confidence)
+            assert actual_attr.top_features == expected_attr.top_features
+
+
+def test_exposure_sweep_matches_scenarios(tmp_path):
+    engine = _engine(tmp_path)
+    term_counts = TermCountIndex(engine)
+    term_counts.replace_all(SAMPLE_DOCUMENTS)
+
+    subsets, marginal_risk = run_exposure_sweep(SAMPLE_DOCUMENTS, engine, term_counts)
+    assert len(subsets) == 2 ** len(DocType) - 1
+
+    scenarios = [
+        ScenarioDefinition(name="subset", doc_types=subset.doc_types) for subset in subsets
+    ]
+    expected = run_scenarios(
+        SAMPLE_DOCUMENTS, scenarios, engine, ExplanationEngine(), term_counts=term_counts
+    )
+    for subset, scenario in zip(subsets, expected):
+        assert subset.document_count == scenario.document_count
+        for swept, attribute in zip(subset.attributes, scenario.attributes):
+            assert swept.available == attribute.available
+            assert swept.predicted_value == attribute.predicted_value
+            assert swept.confidence == pytest.approx(attribute.confidence)
+
+    full_exposure = subsets[-1]
+    for attribute in full_exposure.attributes:
+        total = sum(risk.marginal_risk[attribute.name] for risk in marginal_risk)
+        assert total == pytest.approx(attribute.confidence)
+
+
+def test_document_impacts_match_rerunning_without_each_document(tmp_path):
+    engine = _engine(tmp_path)
+    term_counts = TermCountIndex(engine)
+    term_counts.replace_all(SAMPLE_DOCUMENTS)
+    scenario = ScenarioDefinition(name="all_data", doc_types=list(DocType))
+
+    (result,) = run_scenarios(
+        SAMPLE_DOCUMENTS,
+        [scenario],
+        engine,
+        ExplanationEngine(),
+        term_counts=term_counts,
+        document_impacts=True,
+    )
+
+    for attribute in result.attributes:
+        impacts = attribute.document_impacts
+        assert [impact.impact for impact in impacts] == sorted(
+            (impact.impact for impact in impacts), reverse=True
+        )
+        for impact in impacts:
+            others = [doc for doc in SAMPLE_DOCUMENTS if doc.doc_id != impact.doc_id]
+            without = engine.predict_counts(term_counts.sum_counts(others))[attribute.name]
+            assert impact.predicted_value_without == without.predicted_value
+            assert impact.confidence_without == pytest.approx(without.confidence)
+
+
+def test_result_cache_is_shared_across_scenario_names_and_invalidated_by_version(tmp_path):
+    engine = _engine(tmp_path)
+    explanation_engine = ExplanationEngine()
+    cache = ScenarioResultCache()
+    emails_only = ScenarioDefinition(name="emails_only", doc_types=[DocType.EMAIL])
+    custom = ScenarioDefinition(name="custom_selection", doc_types=[DocType.EMAIL])
+
+    def run(scenario, store_version):
+        return run_scenarios(
+            SAMPLE_DOCUMENTS,
+            [scenario],
+            engine,
+            explanation_engine,
+            result_cache=cache,
+            store_version=store_version,
+        )[0]
+
+    first = run(emails_only, store_version=1)
+    shared = run(custom, store_version=1)
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+    assert shared.name == "custom_selection"
+    assert shared.attributes == first.attributes
+
+    run(custom, store_version=2)
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
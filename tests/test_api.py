@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import joblib
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.app import app, document_store
+from backend.domain.sqlite_store import SQLiteDocumentStore
+from backend.execution import JobManager, JobPool
+from backend.inference import ModelRegistry
+from backend.models.train_models import DEFAULT_DATASET, main as train_main
+from backend.sessions import DEFAULT_SESSION, SessionManager
+
+
+def test_ingest_stream_emits_events_and_fills_store(tmp_path):
+    sample_dir = Path(tmp_path)
+    (sample_dir / "my_email.txt").write_text("From: test@example.com\nHello Boston", encoding="utf-8")
+    (sample_dir / "project_notes.md").write_text("Daily journal entry.", encoding="utf-8")
+    (sample_dir / "broken_cv.pdf").write_bytes(b"not really a pdf")
+
+    client = TestClient(app)
+    with client.stream("POST", "/ingest/stream", json={"folder_path": str(sample_dir)}) as response:
+        assert response.status_code == 200
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    kinds = [event["event"] for event in events]
+    assert kinds.count("document") == 2
+    assert kinds.count("error") == 1
+    assert events[-1] == {
+        "event": "done",
+        "document_count": 2,
+        "failed": 1,
+        "doc_type_counts": {"email": 1, "notes": 1},
+    }
+    assert len(document_store.all()) == 2
+
+    # A folder with nothing readable keeps the documents already ingested.
+    broken_dir = sample_dir / "broken"
+    broken_dir.mkdir()
+    (broken_dir / "broken_cv.pdf").write_bytes(b"not really a pdf")
+    with client.stream("POST", "/ingest/stream", json={"folder_path": str(broken_dir)}) as response:
+        events = [json.loads(line) for line in response.iter_lines() if line]
+    assert [event["event"] for event in events] == ["error", "done"]
+    assert len(document_store.all()) == 2
+
+
+def test_models_reload_swaps_the_version_reported_by_analyze(tmp_path, monkeypatch):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    registry = ModelRegistry(artifacts_dir)
+    sessions = SessionManager(registry.active, max_bytes=1 << 30)
+    registry.subscribe(sessions.use_engine)
+    monkeypatch.setattr(app_module, "model_registry", registry)
+    monkeypatch.setattr(app_module, "sessions", sessions)
+
+    sample_dir = Path(tmp_path) / "docs"
+    sample_dir.mkdir()
+    (sample_dir / "notes.md").write_text("Cycling along the Charles to my MIT lab.", encoding="utf-8")
+    client = TestClient(app)
+    assert client.post("/ingest", json={"folder_path": str(sample_dir)}).status_code == 200
+    first = client.post("/analyze", json={}).json()
+    assert first["model_version"] == registry.version
+    assert client.get("/models").json()["active"] == registry.version
+
+    artifact = next(artifacts_dir.glob("*.joblib"))
+    joblib.dump(joblib.load(artifact), artifact)
+    reloaded = client.post("/models/reload").json()
+
+    assert reloaded["changed"] is True
+    second = client.post("/analyze", json={}).json()
+    assert second["model_version"] == reloaded["active"] != first["model_version"]
+    assert len(client.get("/models").json()["versions"]) == 2
+
+
+def test_ingest_writes_batches_into_the_session_store(tmp_path, monkeypatch):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir)
+    registry = ModelRegistry(artifacts_dir)
+    sessions = SessionManager(
+        registry.active,
+        max_bytes=1 << 30,
+        store_factory=lambda name: SQLiteDocumentStore(Path(tmp_path) / f"{name}.sqlite3"),
+    )
+    monkeypatch.setattr(app_module, "model_registry", registry)
+    monkeypatch.setattr(app_module, "sessions", sessions)
+    monkeypatch.setattr(app_module, "INGEST_BATCH_SIZE", 2)
+
+    sample_dir = Path(tmp_path) / "docs"
+    sample_dir.mkdir()
+    for index in range(5):
+        (sample_dir / f"notes_{index}.md").write_text(f"Journal entry {index}.", encoding="utf-8")
+    client = TestClient(app)
+    response = client.post("/ingest", json={"folder_path": str(sample_dir)})
+
+    assert response.status_code == 200
+    assert response.json()["document_count"] == 5
+    assert response.json()["doc_type_counts"] == {"notes": 5}
+    with sessions.lease(DEFAULT_SESSION) as session:
+        assert len(session.store) == 5
+        version = session.store.version
+
+    for path in list(sample_dir.iterdir())[1:]:
+        path.unlink()
+    assert client.post("/ingest", json={"folder_path": str(sample_dir)}).json()["document_count"] == 1
+    with sessions.lease(DEFAULT_SESSION) as session:
+        assert len(session.store) == 1
+        assert session.store.version > version
+
+
+def test_queued_analysis_job_reads_the_session_it_runs_against(tmp_path, monkeypatch):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    registry = ModelRegistry(artifacts_dir)
+    sessions = SessionManager(
+        registry.active,
+        max_bytes=1 << 30,
+        store_factory=lambda name: SQLiteDocumentStore(Path(tmp_path) / f"{name}.sqlite3"),
+    )
+    pool = JobPool("test", max_workers=1, max_queue=4)
+    monkeypatch.setattr(app_module, "model_registry", registry)
+    monkeypatch.setattr(app_module, "sessions", sessions)
+    monkeypatch.setattr(app_module, "analysis_jobs", JobManager(pool))
+
+    sample_dir = Path(tmp_path) / "docs"
+    sample_dir.mkdir()
+    (sample_dir / "notes.md").write_text("Cycling along the Charles to my MIT lab.", encoding="utf-8")
+    client = TestClient(app)
+    params = {"session": "alice"}
+    assert client.post("/ingest", json={"folder_path": str(sample_dir)}, params=params).status_code == 200
+
+    gate = threading.Event()
+    pool.submit(gate.wait)
+    job_id = client.post("/jobs/analyze", json={}, params=params).json()["job_id"]
+    # Evicting alice closes its store; the queued job must not read through it.
+    assert sessions.drop("alice")
+    assert client.post("/ingest", json={"folder_path": str(sample_dir)}, params=params).status_code == 200
+    gate.set()
+
+    deadline = time.monotonic() + 30
+    while (job := client.get(f"/jobs/{job_id}").json())["status"] in {"queued", "running"}:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert job["status"] == "completed", job["error"]
+    assert job["scenarios_completed"] == job["scenarios_total"] > 0
+    pool.shutdown()
@@ -0,0 +1,44 @@
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from benchmarks.runner import compare_results, run_stage
+from benchmarks.stages import BenchmarkConfig
+from backend.ingestion.file_ingestion import ingest_folder
+from backend.models.train_models import DEFAULT_DATASET, main as train_main
+
+
+def test_generated_corpus_is_reproducible_and_ingestible(tmp_path):
+    spec = CorpusSpec(emails=3, notes=2, cvs=2, transcripts=1, pdfs=2, doc_chars=600, seed=7)
+    first, second = Path(tmp_path) / "first", Path(tmp_path) / "second"
+    assert generate_corpus(first, spec) == spec.total
+    generate_corpus(second, spec)
+
+    files = sorted(path.relative_to(first) for path in first.rglob("*") if path.is_file())
+    assert all((first / name).read_bytes() == (second / name).read_bytes() for name in files)
+
+    documents = ingest_folder(first)
+    counts = Counter(doc.doc_type.value for doc in documents)
+    assert counts == {"email": 3, "notes": 2, "cv": 4, "transcript": 1}
+    pdfs = [doc for doc in documents if doc.source_file.endswith(".pdf")]
+    assert len(pdfs) == 2 and all(len(doc.clean_text) > 400 for doc in pdfs)
+
+
+def test_stage_results_and_comparison(tmp_path):
+    corpus_dir = Path(tmp_path) / "corpus"
+    generate_corpus(corpus_dir, CorpusSpec(emails=2, notes=2, cvs=1, transcripts=1, pdfs=0))
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    config = BenchmarkConfig(corpus_dir, artifacts_dir, Path(tmp_path), repeats=2)
+
+    results = run_stage("scenarios", config)
+    stats = results["scenarios"]
+    assert stats["runs"] == 2 and stats["documents"] == 6
+    assert 0 < stats["p50_ms"] <= stats["p95_ms"]
+    assert stats["docs_per_sec"] > 0 and stats["peak_rss_mb"] > 0
+
+    baseline = {"results": results}
+    slower = dict(stats, p95_ms=stats["p95_ms"] * 1.5, docs_per_sec=stats["docs_per_sec"] * 0.95)
+    rows, regressions = compare_results(baseline, {"results": {"scenarios": slower}})
+    assert regressions == ["scenarios.p95_ms"]
+    assert {row["metric"] for row in rows} == {"p50_ms", "p95_ms", "peak_rss_mb", "docs_per_sec"}
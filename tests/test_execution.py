@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.execution import JobManager, JobPool, PoolClosed, PoolSaturated
+
+
+def test_job_pool_rejects_work_beyond_its_queue():
+    pool = JobPool("test", max_workers=1, max_queue=1)
+    gate = threading.Event()
+    running = pool.submit(gate.wait)
+    queued = pool.submit(lambda: "queued")
+
+    with pytest.raises(PoolSaturated):
+        pool.submit(lambda: "rejected")
+    assert pool.stats()["running"] == 1
+    assert pool.stats()["queued"] == 1
+    assert pool.stats()["rejected"] == 1
+
+    gate.set()
+    assert running.result(timeout=5) is True
+    assert queued.result(timeout=5) == "queued"
+    assert pool.submit(lambda: "admitted").result(timeout=5) == "admitted"
+
+    pool.shutdown()
+    with pytest.raises(PoolClosed):
+        pool.submit(lambda: "closed")
+
+
+def test_cancelled_run_keeps_its_slot_until_the_work_finishes():
+    pool = JobPool("test", max_workers=1, max_queue=0)
+    gate = threading.Event()
+
+    async def cancel_while_running():
+        task = asyncio.ensure_future(pool.run(gate.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_running())
+    with pytest.raises(PoolSaturated):
+        pool.submit(lambda: "rejected")
+
+    gate.set()
+    deadline = time.monotonic() + 5
+    while pool.stats()["running"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.submit(lambda: "admitted").result(timeout=5) == "admitted"
+    pool.shutdown()
+
+
+def test_saturated_pool_returns_429_while_cheap_endpoints_answer(monkeypatch):
+    pool = JobPool("analysis", max_workers=1, max_queue=0)
+    gate = threading.Event()
+    blocker = pool.submit(gate.wait)
+    monkeypatch.setattr(app_module, "analysis_pool", pool)
+
+    client = TestClient(app_module.app)
+    response = client.post("/analyze", json={})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["pools"]["analysis"]["running"] == 1
+
+    gate.set()
+    blocker.result(timeout=5)
+    pool.shutdown()
+    assert client.post("/analyze/sweep").status_code == 503
+
+
+def _wait_for(manager, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.status in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job never reached {statuses}")
+
+
+def test_job_manager_reports_partial_results_and_cancels_between_items():
+    pool = JobPool("jobs", max_workers=1, max_queue=4)
+    manager = JobManager(pool)
+    first_done = threading.Event()
+    release = threading.Event()
+
+    def work():
+        yield "first"
+        first_done.set()
+        release.wait(5)
+        yield "second"
+        yield "third"
+
+    job = manager.submit(work, total=3)
+    first_done.wait(5)
+    assert manager.get(job.job_id).results == ["first"]
+    assert manager.get(job.job_id).status == "running"
+
+    cancelled = manager.cancel(job.job_id)
+    release.set()
+    assert cancelled.status == "cancelled"
+    pool.shutdown()
+    assert manager.get(job.job_id).results == ["first"]
+
+    assert manager.cancel("missing") is None
+
+
+def test_job_manager_expires_and_caps_retained_results():
+    pool = JobPool("jobs", max_workers=2, max_queue=4)
+    manager = JobManager(pool, max_bytes=10, sizeof=len)
+
+    older = manager.submit(lambda: ["x" * 8], total=1)
+    _wait_for(manager, older.job_id, {"completed"})
+    newer = manager.submit(lambda: ["y" * 8], total=1)
+    _wait_for(manager, newer.job_id, {"completed"})
+    assert manager.get(older.job_id) is None
+    assert manager.get(newer.job_id).results == ["y" * 8]
+
+    def broken():
+        raise ValueError("boom")
+        yield  # pragma: no cover
+
+    failed = manager.submit(broken, total=1)
+    assert _wait_for(manager, failed.job_id, {"failed"}).error == "boom"
+
+    expiring = JobManager(pool, ttl_seconds=0)
+    done = expiring.submit(lambda: [1], total=1)
+    deadline = time.monotonic() + 5
+    while expiring.get(done.job_id) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert expiring.get(done.job_id) is None
+    pool.shutdown()
+
+
+def test_running_jobs_results_count_against_the_byte_cap():
+    pool = JobPool("jobs", max_workers=1, max_queue=4)
+    manager = JobManager(pool, max_bytes=10, sizeof=len)
+    older = manager.submit(lambda: ["a" * 4], total=1)
+    _wait_for(manager, older.job_id, {"completed"})
+    newer = manager.submit(lambda: ["b" * 4], total=1)
+    _wait_for(manager, newer.job_id, {"completed"})
+    yielded = threading.Event()
+    release = threading.Event()
+
+    def work():
+        yield "c" * 8
+        yielded.set()
+        release.wait(5)
+
+    running = manager.submit(work, total=1)
+    yielded.wait(5)
+    assert manager.get(running.job_id).status == "running"
+    assert manager.get(older.job_id) is None
+    assert manager.get(newer.job_id).results == ["b" * 4]
+    assert manager.stats()["retained_bytes"] == 12
+    release.set()
+    pool.shutdown()
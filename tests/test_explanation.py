@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import numpy as np
+
+from backend.domain.document import DocType, Document
+from backend.explanation import ExplanationEngine
+from backend.inference import InferenceEngine
+from backend.models.train_models import DEFAULT_DATASET, main as train_main
+
+
+def test_supporting_sentences_follow_document_order():
+    text = (
+        "I moved to Boston last spring. The weather is rough. "
+        "My MIT lab studies robotics. Weekends are for hiking. "
+        "Robotics keeps me busy at MIT."
+    )
+    document = Document(
+        doc_id="doc-1",
+        source_file="/tmp/notes.txt",
+        doc_type=DocType.NOTES,
+        raw_text=text,
+        clean_text=text,
+    )
+    engine = ExplanationEngine()
+
+    hits = engine.collect_supporting_sentences([document], ["mit lab", "hiking", "boston"], limit=3)
+
+    assert [hit.text for hit in hits] == [
+        "I moved to Boston last spring.",
+        "My MIT lab studies robotics.",
+        "Weekends are for hiking.",
+    ]
+    assert engine.collect_supporting_sentences([document], ["hik"], limit=3) == []
+
+
+def test_contribution_ranking_scores_sentences_for_predicted_value(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    inference_engine = InferenceEngine(artifacts_dir)
+
+    text = (
+        "The weather was fine today. "
+        "Riding the MBTA Red Line to Kendall Square for my MIT CSAIL work. "
+        "I had lunch with friends."
+    )
+    document = Document(
+        doc_id="doc-2",
+        source_file="/tmp/notes.txt",
+        doc_type=DocType.NOTES,
+        raw_text=text,
+        clean_text=text,
+    )
+    engine = ExplanationEngine()
+    prediction = inference_engine.predict(text)["location_region"]
+
+    hits = engine.rank_supporting_sentences(
+        [document], inference_engine, "location_region", prediction.predicted_value, limit=1
+    )
+
+    assert prediction.predicted_value == "US-Northeast"
+    assert [hit.text for hit in hits] == [
+        "Riding the MBTA Red Line to Kendall Square for my MIT CSAIL work."
+    ]
+
+    # A model reload drops the vectors of the old groups but keeps the segmentation.
+    with_vectors = engine.cached_bytes
+    engine.drop_vectors()
+    assert engine.sentence_index("doc-2", text).vectors == {}
+    assert 0 < engine.cached_bytes < with_vectors
+    assert engine.rank_supporting_sentences(
+        [document], inference_engine, "location_region", prediction.predicted_value, limit=1
+    ) == hits
+
+
+def test_ingest_time_segmentation_matches_lazy_path_and_respects_byte_budget():
+    documents = [
+        Document(
+            doc_id=f"doc-{idx}",
+            source_file=f"/tmp/notes_{idx}.txt",
+            doc_type=DocType.NOTES,
+            raw_text=f"  First sentence {idx}.   Second one about Boston {idx}!  ",
+            clean_text=f"First sentence {idx}. Second one about Boston {idx}!",
+        )
+        for idx in range(20)
+    ]
+    lazy = ExplanationEngine()
+    batched = ExplanationEngine()
+    batched.segment_documents(documents)
+
+    for document in documents:
+        expected = lazy.sentences_for_document(document.doc_id, document.raw_text)
+        assert batched.sentences_for_document(document.doc_id, document.raw_text) == expected
+    assert expected == ["First sentence 19.", "Second one about Boston 19!"]
+    index = batched.sentence_index(documents[0].doc_id, documents[0].raw_text)
+    assert index.postings("boston").tolist() == [1]
+    assert index.postings("paris") is None
+    assert index.sentence_ids.dtype == index.indptr.dtype == np.int32
+    assert not any(isinstance(value, str) for value in vars(index).values())
+
+    budget = lazy.cached_bytes // 4
+    bounded = ExplanationEngine(cache_bytes=budget)
+    bounded.segment_documents(documents)
+    assert 0 < bounded.cached_bytes <= budget
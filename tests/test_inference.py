@@ -1,7 +1,23 @@
+import json
+import shutil
+import time
 from pathlib import Path
 
-from backend.inference import InferenceEngine
-from backend.models.train_models import DEFAULT_DATASET, main as train_main
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from backend.inference import InferenceEngine, LinearWeights, ModelRegistry
+from backend.models.score_profiles import score_file
+from backend.models.train_models import (
+    DEFAULT_DATASET,
+    VERIFICATION_REPORT,
+    Compression,
+    compile_artifacts,
+    main as train_main,
+)
 
 
 def test_inference_returns_predictions(tmp_path):
@@ -23,3 +39,258 @@ def test_inference_returns_predictions(tmp_path):
     assert 0 <= location_pred.confidence <= 1
     assert len(location_pred.top_features) <= 3
 
+
+def _dense_top_features(payload, text, top_k):
+    vectorizer, classifier = payload["vectorizer"], payload["classifier"]
+    vector = vectorizer.transform([text])
+    probabilities = classifier.predict_proba(vector)[0]
+    best_idx = int(np.argmax(probabilities))
+    dense_vector = vector.toarray()[0]
+    contributions = dense_vector * classifier.coef_[best_idx]
+    ranked = [idx for idx in np.argsort(contributions, kind="stable")[::-1] if contributions[idx] > 0]
+    if not ranked:
+        ranked = [idx for idx in np.argsort(dense_vector, kind="stable")[::-1] if dense_vector[idx] > 0]
+    feature_names = vectorizer.get_feature_names_out()
+    return [(str(feature_names[idx]), float(contributions[idx])) for idx in ranked[:top_k]]
+
+
+def test_sparse_attribution_matches_dense_reference(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir)
+    engine = InferenceEngine(artifacts_dir)
+
+    sample_text = (
+        "Leading a backend team in Palo Alto, I review distributed systems designs "
+        "and take Caltrain to the office."
+    )
+    predictions = engine.predict(sample_text, top_k_features=4)
+
+    for artifact in artifacts_dir.glob("*.joblib"):
+        payload = joblib.load(artifact)
+        name = payload["attribute_name"]
+        expected = _dense_top_features(payload, sample_text, 4)
+        assert predictions[name].top_features == [feature for feature, _ in expected]
+        assert list(predictions[name].feature_contributions.values()) == pytest.approx(
+            [contribution for _, contribution in expected]
+        )
+
+
+def test_fused_artifact_matches_per_attribute_models(tmp_path):
+    legacy_dir = Path(tmp_path) / "legacy"
+    fused_dir = Path(tmp_path) / "fused"
+    train_main(DEFAULT_DATASET, legacy_dir)
+    train_main(DEFAULT_DATASET, fused_dir, fused=True)
+
+    legacy_engine = InferenceEngine(legacy_dir)
+    fused_engine = InferenceEngine(fused_dir)
+    assert fused_engine.attribute_names == legacy_engine.attribute_names
+
+    sample_text = "Our Atlanta startup builds discounted cash flow models for logistics firms."
+    legacy = legacy_engine.predict(sample_text, top_k_features=3)
+    fused = fused_engine.predict(sample_text, top_k_features=3)
+    for name, prediction in legacy.items():
+        assert fused[name].predicted_value == prediction.predicted_value
+        assert fused[name].confidence == pytest.approx(prediction.confidence)
+        assert fused[name].top_features == prediction.top_features
+
+
+def test_predict_batch_matches_single_predictions(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    engine = InferenceEngine(artifacts_dir)
+
+    texts = pd.read_csv(DEFAULT_DATASET)["text"].tolist() + ["", "zzzz qqqq"]
+    batch = engine.predict_batch(texts, top_k=3)
+
+    assert len(batch) == len(texts)
+    for text, predictions in zip(texts, batch):
+        expected = engine.predict(text, top_k_features=3)
+        assert predictions.keys() == expected.keys()
+        for name, prediction in expected.items():
+            assert predictions[name].predicted_value == prediction.predicted_value
+            assert predictions[name].confidence == pytest.approx(prediction.confidence)
+            assert predictions[name].top_features == prediction.top_features
+
+
+def test_score_file_writes_one_json_line_per_row(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    profiles = pd.DataFrame(
+        {
+            "user_id": np.array([7, 8, 9], dtype=np.int64),
+            "text": ["Cycling along the Charles to my MIT lab.", None, "Equity research in Chicago."],
+        }
+    )
+    input_path = Path(tmp_path) / "profiles.csv"
+    profiles.to_csv(input_path, index=False)
+    output_path = Path(tmp_path) / "scores.jsonl"
+
+    with output_path.open("w", encoding="utf-8") as output:
+        scored = score_file(input_path, output, artifacts_dir, id_column="user_id", batch_size=2)
+
+    rows = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert scored == 3
+    assert [row["id"] for row in rows] == [7, 8, 9]
+    assert rows[1]["predictions"] == {}
+    engine = InferenceEngine(artifacts_dir)
+    expected = engine.predict(profiles["text"][0], top_k_features=5)
+    for name, prediction in rows[0]["predictions"].items():
+        assert prediction["predicted_value"] == expected[name].predicted_value
+        assert isinstance(prediction["confidence"], float)
+        assert prediction["confidence"] == pytest.approx(expected[name].confidence)
+
+
+def test_compiled_artifacts_match_joblib_models(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True, compile=False)
+    joblib_engine = InferenceEngine(artifacts_dir)
+    compiled_dir = joblib_engine.export_compiled()
+
+    compiled_only = Path(tmp_path) / "compiled_only"
+    compiled_only.mkdir()
+    compiled_dir.rename(compiled_only / compiled_dir.name)
+    compiled_engine = InferenceEngine(compiled_only)
+    assert compiled_engine.version.startswith(joblib_engine.version)
+    assert compiled_engine.version != joblib_engine.version
+    assert all(isinstance(group.weights.matrix, np.memmap) for group in compiled_engine._groups)
+
+    texts = pd.read_csv(DEFAULT_DATASET)["text"].tolist()[:20] + ["", "zzzz qqqq"]
+    expected = joblib_engine.predict_batch(texts, top_k=3)
+    for predictions, reference in zip(compiled_engine.predict_batch(texts, top_k=3), expected):
+        for name, prediction in reference.items():
+            assert predictions[name].predicted_value == prediction.predicted_value
+            assert predictions[name].confidence == pytest.approx(prediction.confidence)
+            assert predictions[name].top_features == prediction.top_features
+
+
+def test_stale_compiled_artifacts_are_ignored(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    compiled_version = InferenceEngine(artifacts_dir).version
+
+    artifact = next(artifacts_dir.glob("*.joblib"))
+    joblib.dump(joblib.load(artifact), artifact)
+    engine = InferenceEngine(artifacts_dir)
+
+    assert engine.version != compiled_version
+    assert not any(isinstance(group.weights.matrix, np.memmap) for group in engine._groups)
+
+
+def test_corrupt_compiled_artifacts_fall_back_to_joblib(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    expected = InferenceEngine(artifacts_dir).predict("Biking to the MIT lab in Cambridge.")
+    compiled_dir = InferenceEngine(artifacts_dir).export_compiled()
+    assert not compiled_dir.with_name(".compiled.old").exists()
+
+    coef = next(compiled_dir.glob("group_*/coef*.npy"))
+    coef.write_bytes(coef.read_bytes()[:64])
+    engine = InferenceEngine(artifacts_dir)
+
+    assert not any(isinstance(group.weights.matrix, np.memmap) for group in engine._groups)
+    predictions = engine.predict("Biking to the MIT lab in Cambridge.")
+    assert {name: p.predicted_value for name, p in predictions.items()} == {
+        name: p.predicted_value for name, p in expected.items()
+    }
+
+
+def test_registry_swaps_models_and_keeps_snapshots(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    registry = ModelRegistry(artifacts_dir)
+    swapped = []
+    registry.subscribe(swapped.append)
+    snapshot = registry.active
+    assert registry.reload() is False
+
+    artifact = next(artifacts_dir.glob("*.joblib"))
+    joblib.dump(joblib.load(artifact), artifact)
+    assert registry.reload() is True
+
+    assert swapped == [registry.active]
+    assert registry.active is not snapshot
+    assert [entry.version for entry in registry.versions()] == [snapshot.version, registry.version]
+    assert snapshot.predict("Biking to the MIT lab in Cambridge.")
+
+    # Re-exporting with other compression is a new version even though the
+    # joblib files did not change.
+    InferenceEngine(artifacts_dir, use_compiled=False).export_compiled(coef_dtype="float32")
+    assert registry.reload() is True
+    assert all(group.weights.dtype == "float32" for group in registry.active._groups)
+
+    for path in artifacts_dir.glob("*.joblib"):
+        path.unlink()
+    shutil.rmtree(artifacts_dir / "compiled")
+    with pytest.raises(RuntimeError):
+        registry.reload()
+    assert registry.active is swapped[-1]
+
+
+def test_watch_logs_failed_reloads(tmp_path, caplog):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True, compile=False)
+    registry = ModelRegistry(artifacts_dir)
+    version = registry.version
+    next(artifacts_dir.glob("*.joblib")).write_bytes(b"not a pickle")
+
+    registry.watch(0.01)
+    try:
+        deadline = time.monotonic() + 10
+        while not any("Reloading models" in record.message for record in caplog.records):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        registry.stop()
+    assert registry.version == version
+
+
+def test_compressed_weights_score_like_their_dense_form():
+    rng = np.random.default_rng(0)
+    coef = rng.normal(size=(4, 50))
+    vectors = sp.random(6, 50, density=0.3, random_state=1, format="csr")
+    full = LinearWeights(coef)
+    for dtype, prune in [("float32", 0.0), ("int8", 0.0), ("float64", 0.5), ("int8", 0.8)]:
+        compressed = full.compress(dtype, prune)
+        dense = compressed.dense()
+        assert compressed.is_sparse == (prune > 0.0)
+        assert compressed.nbytes < full.nbytes or dtype == "float64"
+        np.testing.assert_allclose(compressed.project(vectors), vectors @ dense.T, atol=1e-6)
+        np.testing.assert_allclose(compressed.row(2), dense[2], atol=1e-6)
+        rows, columns = np.array([0, 3, 1]), np.array([5, 7, 49])
+        np.testing.assert_allclose(compressed.gather(rows, columns), dense[rows, columns], atol=1e-6)
+    np.testing.assert_allclose(full.compress("int8").dense(), coef, atol=np.abs(coef).max() / 127)
+
+
+def test_compressed_compiled_artifacts_are_verified_against_full_models(tmp_path):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    holdout_path = Path(tmp_path) / "holdout.csv"
+    holdout = pd.DataFrame(
+        {
+            "text": [
+                "Picked up groceries near Kendall Square after work.",
+                "My daughter starts kindergarten in Somerville next fall.",
+                "Renewed the lease on our apartment in Brookline.",
+                "",
+            ]
+        }
+    )
+    holdout.to_csv(holdout_path, index=False)
+    compression = Compression(coef_dtype="float32", prune=0.5, holdout_path=holdout_path)
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True, compression=compression)
+
+    engine = InferenceEngine(artifacts_dir)
+    assert all(group.weights.is_sparse for group in engine._groups)
+    assert all(group.weights.dtype == "float32" for group in engine._groups)
+
+    report = json.loads((artifacts_dir / "compiled" / VERIFICATION_REPORT).read_text())
+    assert report["texts"] == len(holdout)
+    assert report["weights_bytes"]["candidate"] < report["weights_bytes"]["reference"]
+    assert set(report["attributes"]) == set(engine.attribute_names)
+    for stats in report["attributes"].values():
+        assert 0.0 <= stats["agreement"] <= 1.0
+        assert 0.0 <= stats["top_feature_overlap"] <= 1.0
+
+    # Recompiling compares against the joblib models again, not the lossy export.
+    compile_artifacts(artifacts_dir, compression)
+    recompiled = json.loads((artifacts_dir / "compiled" / VERIFICATION_REPORT).read_text())
+    assert recompiled["weights_bytes"] == report["weights_bytes"]
@@ -1,6 +1,11 @@
+import random
+import re
+import sys
 from pathlib import Path
 
 from backend.domain.document import DocType
+from backend.ingestion import file_ingestion
+from backend.ingestion.cache import IngestionCache
 from backend.ingestion.file_ingestion import ingest_folder
 
 
@@ -21,3 +26,74 @@ def test_ingest_folder_reads_supported_files(tmp_path):
     assert DocType.EMAIL in doc_types
     assert DocType.NOTES in doc_types
 
+
+def test_parallel_ingest_matches_serial_and_skips_broken_files(tmp_path):
+    sample_dir = Path(tmp_path)
+    for idx in range(6):
+        (sample_dir / f"inbox_{idx}.txt").write_text(f"Email number {idx}", encoding="utf-8")
+    (sample_dir / "broken_resume.pdf").write_bytes(b"not really a pdf")
+
+    serial = ingest_folder(sample_dir)
+    parallel = ingest_folder(sample_dir, workers=2)
+
+    assert len(serial) == 6
+    assert [doc.source_file for doc in parallel] == [doc.source_file for doc in serial]
+    assert [doc.clean_text for doc in parallel] == [doc.clean_text for doc in serial]
+
+
+def test_cached_reingest_only_processes_changed_files(tmp_path, monkeypatch):
+    sample_dir = Path(tmp_path) / "docs"
+    sample_dir.mkdir()
+    (sample_dir / "my_email.txt").write_text("Hello from Boston", encoding="utf-8")
+    (sample_dir / "project_notes.md").write_text("Research journal", encoding="utf-8")
+    (sample_dir / "old_resume.txt").write_text("Resume draft", encoding="utf-8")
+    cache = IngestionCache(Path(tmp_path) / "cache")
+
+    first = {doc.source_file: doc for doc in ingest_folder(sample_dir, cache=cache)}
+
+    (sample_dir / "project_notes.md").write_text("Research journal, week two", encoding="utf-8")
+    (sample_dir / "old_resume.txt").unlink()
+    extracted = []
+    real_extract = file_ingestion._extract_text
+    monkeypatch.setattr(
+        file_ingestion,
+        "_extract_text",
+        lambda path: extracted.append(path.name) or real_extract(path),
+    )
+
+    second = {doc.source_file: doc for doc in ingest_folder(sample_dir, cache=cache)}
+
+    assert extracted == ["project_notes.md"]
+    assert len(second) == 2
+    email_path = str(sample_dir / "my_email.txt")
+    notes_path = str(sample_dir / "project_notes.md")
+    assert second[email_path].doc_id == first[email_path].doc_id
+    assert second[notes_path].doc_id != first[notes_path].doc_id
+    assert second[notes_path].clean_text == "Research journal, week two"
+
+
+def _reference_clean(text):
+    text = text.replace("\r\n", "\n")
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"[ \t]{2,}", " ", text)
+    text = re.sub(r"(?m)^\s*\d+\s*$", "", text)
+    return text.strip()
+
+
+def test_clean_view_is_stored_as_spans_of_the_raw_text(tmp_path):
+    rng = random.Random(7)
+    samples = [
+        "".join(rng.choice(" \t\r\n0123ab") for _ in range(rng.randint(0, 40)))
+        for _ in range(2000)
+    ]
+    samples += ["Page\r\n\r\n\r\n\r\n 12 \n\nBody\t\ttext  here.  ", "\t\t\n7\n"]
+    for raw in samples:
+        assert file_ingestion._clean_spans(raw).render(raw) == _reference_clean(raw)
+
+    raw = "Intro   line\r\n\r\n\r\n\r\n3\n" + "Long body text. " * 400
+    (tmp_path / "notes.txt").write_text(raw, encoding="utf-8", newline="")
+    (document,) = ingest_folder(tmp_path)
+    assert document.clean_spans is not None
+    assert document.clean_text == _reference_clean(raw)
+    assert document.preview == document.clean_text[:320] + "…"
+    assert document.nbytes < 1.2 * sys.getsizeof(raw)
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import app as app_module
+from backend.app import HTTP_REQUEST_SECONDS, app
+from backend.inference import ModelRegistry
+from backend.models.train_models import DEFAULT_DATASET, main as train_main
+from backend.observability import MetricsRegistry, collect_timings, stage
+from backend.observability.metrics import STAGE_SECONDS, _Metric
+from backend.sessions import SessionManager
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_events", "Events seen.", ["kind"])
+    histogram = registry.histogram("demo_seconds", "Durations.", buckets=(0.1, 1.0))
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    assert registry.counter("demo_events", "Events seen.", ["kind"]) is counter
+    with pytest.raises(TypeError):
+        _Metric("demo_untyped", "No samples.")
+    with pytest.raises(ValueError):
+        registry.histogram("demo_events", "Events seen.", ["kind"])
+    assert registry.render().splitlines() == [
+        "# HELP demo_events_total Events seen.",
+        "# TYPE demo_events_total counter",
+        'demo_events_total{kind="a"} 3',
+        "# HELP demo_seconds Durations.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1"} 2',
+        'demo_seconds_bucket{le="+Inf"} 3',
+        "demo_seconds_sum 5.55",
+        "demo_seconds_count 3",
+    ]
+
+
+def test_stage_records_histogram_and_request_timings():
+    before = STAGE_SECONDS.count(stage="test.block")
+    with collect_timings() as timings:
+        with stage("test.block"):
+            pass
+        with stage("test.block"):
+            pass
+    with stage("test.block"):
+        pass
+
+    assert STAGE_SECONDS.count(stage="test.block") == before + 3
+    assert list(timings) == ["test.block"]
+    assert timings["test.block"] >= 0.0
+
+
+def test_analyze_timings_and_metrics_endpoint(tmp_path, monkeypatch):
+    artifacts_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, artifacts_dir, fused=True)
+    registry = ModelRegistry(artifacts_dir)
+    sessions = SessionManager(registry.active, max_bytes=1 << 30)
+    registry.subscribe(sessions.use_engine)
+    monkeypatch.setattr(app_module, "model_registry", registry)
+    monkeypatch.setattr(app_module, "sessions", sessions)
+
+    sample_dir = Path(tmp_path) / "docs"
+    sample_dir.mkdir()
+    email = "From: a@example.com\nBoston gym tonight."
+    (sample_dir / "my_email.txt").write_text(email, encoding="utf-8")
+    (sample_dir / "project_notes.md").write_text("Cycling along the Charles.", encoding="utf-8")
+    client = TestClient(app)
+    analyze_requests = HTTP_REQUEST_SECONDS.count(method="POST", route="/analyze", status="200")
+    assert client.post("/ingest", json={"folder_path": str(sample_dir)}).status_code == 200
+
+    timings = client.post("/analyze", json={"include_timings": True}).json()["timings"]
+    assert {"inference.transform", "inference.score", "explanation.supporting_sentences"} <= set(
+        timings
+    )
+    assert timings["analyze"] >= timings["scenario.compute"]
+    assert timings["scenario.compute"] >= timings["inference.transform"] + timings["inference.score"]
+    # Timings are opt-in; this repeat is also served from the result cache.
+    assert client.post("/analyze", json={}).json()["timings"] is None
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'consentlens_stage_duration_seconds_count{stage="ingest.extract"}' in body
+    assert 'consentlens_ingested_documents_total{source="extracted"}' in body
+    assert "consentlens_sentence_cache_hits_total" in body
+    assert 'route="/analyze",status="200"' in body
+    assert HTTP_REQUEST_SECONDS.count(method="POST", route="/analyze", status="200") == (
+        analyze_requests + 2
+    )
@@ -0,0 +1,115 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import SESSION_HEADER, app, document_store
+from backend.domain.document import DocType, Document
+from backend.domain.sqlite_store import SQLiteDocumentStore
+from backend.inference import InferenceEngine
+from backend.sessions import DEFAULT_SESSION, SessionLimitReached, SessionManager, SessionNotFound
+
+
+def _document(doc_id: str, text: str) -> Document:
+    return Document(
+        doc_id=doc_id,
+        source_file=f"{doc_id}.txt",
+        doc_type=DocType.NOTES,
+        raw_text=text,
+        clean_text=text,
+    )
+
+
+def test_idle_sessions_are_evicted_least_recently_used_first(tmp_path):
+    manager = SessionManager(InferenceEngine(tmp_path), max_bytes=1)
+    with manager.lease(DEFAULT_SESSION) as session:
+        session.store.add(_document("d", "default corpus"))
+    with manager.lease("alice", create=True) as alice:
+        alice.store.add(_document("a", "alice corpus"))
+        with manager.lease("bob", create=True) as bob:
+            bob.store.add(_document("b", "bob corpus"))
+        assert {entry["name"] for entry in manager.stats()["sessions"]} == {DEFAULT_SESSION, "alice"}
+        assert alice.nbytes > 0
+
+    stats = manager.stats()
+    assert [entry["name"] for entry in stats["sessions"]] == [DEFAULT_SESSION]
+    assert stats["evictions"] == 2
+    assert len(manager.get(DEFAULT_SESSION).store.all()) == 1
+    assert manager.get("alice") is None
+
+
+def test_sentence_indexes_count_toward_the_session_that_built_them(tmp_path):
+    manager = SessionManager(
+        InferenceEngine(tmp_path / "models"),
+        max_bytes=1,
+        store_factory=lambda name: SQLiteDocumentStore(tmp_path / f"{name}.sqlite3"),
+    )
+    document = _document("a", "Alice moved to Boston. She runs along the Charles.")
+    with manager.lease("alice", create=True) as alice:
+        alice.store.add(document)
+        assert alice.nbytes == 0
+        alice.explanation.segment_documents([document])
+        assert alice.nbytes == alice.explanation.cached_bytes > 0
+        assert manager.get(DEFAULT_SESSION).explanation.cached_bytes == 0
+
+    # Its sentence indexes alone put alice over budget, so it is evicted and closed.
+    assert manager.stats()["evictions"] == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        alice.store.all()
+    with manager.lease("alice", create=True) as reopened:
+        assert reopened.store.all()[0].doc_id == "a"
+
+
+def test_only_creating_leases_add_sessions_and_their_number_is_capped(tmp_path):
+    manager = SessionManager(InferenceEngine(tmp_path), max_bytes=1 << 30, max_sessions=3)
+    for index in range(10):
+        assert manager.get(f"reader{index}") is None
+        with pytest.raises(SessionNotFound):
+            with manager.lease(f"reader{index}"):
+                pass
+    assert [entry["name"] for entry in manager.stats()["sessions"]] == [DEFAULT_SESSION]
+
+    with manager.lease("alice", create=True):
+        with manager.lease("bob", create=True):
+            with pytest.raises(SessionLimitReached):
+                with manager.lease("carol", create=True):
+                    pass
+    with manager.lease("carol", create=True):
+        pass
+
+    # Making room evicted alice, the least recently used idle session.
+    names = [entry["name"] for entry in manager.stats()["sessions"]]
+    assert names == [DEFAULT_SESSION, "bob", "carol"]
+    assert manager.evictions == 1
+
+
+def test_sessions_keep_separate_corpora(tmp_path):
+    alice_dir = tmp_path / "alice"
+    bob_dir = tmp_path / "bob"
+    alice_dir.mkdir()
+    bob_dir.mkdir()
+    (alice_dir / "journal.md").write_text("Alice moved to Boston.", encoding="utf-8")
+    (bob_dir / "my_email.txt").write_text("From: bob@example.com\nHello", encoding="utf-8")
+    (bob_dir / "notes.md").write_text("Bob's notes.", encoding="utf-8")
+
+    client = TestClient(app)
+    before = len(document_store.all())
+    response = client.post(
+        "/ingest", json={"folder_path": str(alice_dir)}, params={"session": "alice"}
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/ingest", json={"folder_path": str(bob_dir)}, headers={SESSION_HEADER: "bob"}
+    )
+    assert response.status_code == 200
+
+    assert len(client.get("/documents", params={"session": "alice"}).json()) == 1
+    assert len(client.get("/documents", headers={SESSION_HEADER: "bob"}).json()) == 2
+    assert len(document_store.all()) == before
+    assert client.get("/documents", params={"session": "../etc"}).status_code == 400
+
+    assert client.delete("/sessions/bob").status_code == 200
+    assert client.get("/documents", headers={SESSION_HEADER: "bob"}).status_code == 404
+    assert client.get("/health", params={"session": "nobody"}).status_code == 404
+    assert client.post("/analyze", json={}, params={"session": "nobody"}).status_code == 404
+    assert "nobody" not in {entry["name"] for entry in client.get("/sessions").json()["sessions"]}
@@ -0,0 +1,70 @@
+from backend.domain.document import DocType, Document
+from backend.domain.sqlite_store import LazyDocument, SQLiteDocumentStore
+from backend.domain.store import DocumentStore
+from backend.explanation import ExplanationEngine
+
+DOCUMENTS = [
+    Document("e1", "mail_1.txt", DocType.EMAIL, "She lives in Boston now.", "She lives in Boston now."),
+    Document("n1", "notes.md", DocType.NOTES, "Grocery list. Call the plumber.", "Grocery list."),
+    Document("e2", "mail_2.txt", DocType.EMAIL, "Tuition for the MIT semester.", "Tuition MIT."),
+    Document("c1", "cv.pdf", DocType.CV, "Software engineer in Boston.", "Software engineer."),
+]
+
+
+def test_sqlite_store_matches_in_memory_store(tmp_path):
+    memory = DocumentStore()
+    disk = SQLiteDocumentStore(tmp_path / "store.sqlite3")
+    for store in (memory, disk):
+        store.replace_all(DOCUMENTS[:3])
+        store.add(DOCUMENTS[3])
+
+    assert len(disk) == len(memory) == 4
+    assert disk.counts_by_type() == memory.counts_by_type()
+    assert [doc.doc_id for doc in disk.all()] == [doc.doc_id for doc in memory.all()]
+    assert [doc.doc_id for doc in disk.filter_by_types(["email", DocType.CV])] == ["e1", "e2", "c1"]
+    assert disk.get("missing") is None
+
+    loaded = disk.get("n1")
+    assert isinstance(loaded, LazyDocument)
+    assert loaded._texts is None
+    assert (loaded.raw_text, loaded.clean_text) == (DOCUMENTS[1].raw_text, DOCUMENTS[1].clean_text)
+    assert disk.nbytes == 0 < memory.nbytes
+
+    version = disk.version
+    disk.replace_all(DOCUMENTS[:1])
+    assert disk.version > version
+    assert len(disk) == 1
+    assert disk.search(["boston"]) == {"e1"}
+
+
+def test_full_text_search_narrows_supporting_sentences(tmp_path):
+    store = SQLiteDocumentStore(tmp_path / "store.sqlite3")
+    store.replace_all(DOCUMENTS)
+
+    assert store.search(["boston"]) == {"e1", "c1"}
+    assert store.search(["lives boston", "mit"]) == {"e1", "e2"}
+    assert store.search(["plumber call"]) == {"n1"}
+    assert store.search(["--"]) is None
+
+    engine = ExplanationEngine()
+    terms = ["boston", "tuition"]
+    documents = store.all()
+    assert engine.collect_supporting_sentences(
+        documents, terms, limit=5, search=store.search
+    ) == ExplanationEngine().collect_supporting_sentences(DOCUMENTS, terms, limit=5)
+    assert next(doc for doc in documents if doc.doc_id == "n1")._texts is None
+
+
+def test_sqlite_store_version_survives_reopening(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    store = SQLiteDocumentStore(path)
+    store.replace_all(DOCUMENTS[:2])
+    store.add_many(DOCUMENTS[2:])
+    version = store.version
+    store.close()
+
+    reopened = SQLiteDocumentStore(path)
+    assert reopened.version == version
+    assert [doc.doc_id for doc in reopened.all()] == [doc.doc_id for doc in DOCUMENTS]
+    reopened.add(DOCUMENTS[0])
+    assert reopened.version == version + 1
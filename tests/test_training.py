@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from backend.inference import InferenceEngine
+from backend.models.train_models import (
+    ATTRIBUTES,
+    DEFAULT_DATASET,
+    FUSED_ARTIFACT_NAME,
+    HASHED_ARTIFACT_NAME,
+    main as train_main,
+    train_attribute,
+    train_streaming,
+)
+
+
+def test_parallel_training_matches_per_attribute_training(tmp_path):
+    output_dir = Path(tmp_path) / "parallel"
+    timings = train_main(DEFAULT_DATASET, output_dir, compile=False, n_jobs=2)
+    assert {"load", "featurize", "fit", "save"} <= timings.keys()
+
+    reference_dir = Path(tmp_path) / "reference"
+    reference_dir.mkdir()
+    df = pd.read_csv(DEFAULT_DATASET)
+    texts = df["text"].fillna("").tolist()
+    for attribute in ATTRIBUTES:
+        reference_path = train_attribute(
+            attribute, texts, df[attribute].fillna("Unknown").tolist(), reference_dir
+        )
+        expected = joblib.load(reference_path)
+        actual = joblib.load(output_dir / reference_path.name)
+
+        assert actual["attribute_name"] == attribute
+        assert actual["vectorizer"].vocabulary_ == expected["vectorizer"].vocabulary_
+        np.testing.assert_array_equal(actual["vectorizer"].idf_, expected["vectorizer"].idf_)
+        np.testing.assert_array_equal(actual["classifier"].classes_, expected["classifier"].classes_)
+        np.testing.assert_array_equal(actual["classifier"].coef_, expected["classifier"].coef_)
+        np.testing.assert_array_equal(
+            actual["classifier"].intercept_, expected["classifier"].intercept_
+        )
+
+
+def test_streaming_training_scores_like_its_classifiers(tmp_path):
+    output_dir = Path(tmp_path) / "streaming"
+    timings = train_streaming(
+        DEFAULT_DATASET, output_dir, chunk_size=5, n_features=2**16, epochs=10, compile=False
+    )
+    assert {"scan", "fit", "feature_map", "save"} <= timings.keys()
+
+    payload = joblib.load(output_dir / HASHED_ARTIFACT_NAME)
+    engine = InferenceEngine(output_dir)
+    text = "I take the MBTA to Cambridge for my MIT computer science lab."
+    predictions = engine.predict(text, top_k_features=3)
+
+    tfidf = normalize(payload["hashing"].transform([text]) @ sp.diags(payload["idf"]))
+    for attribute, classifier in payload["classifiers"].items():
+        probabilities = classifier.predict_proba(tfidf)[0]
+        best = int(np.argmax(probabilities))
+        assert predictions[attribute].predicted_value == classifier.classes_[best]
+        assert predictions[attribute].confidence == pytest.approx(probabilities[best])
+        assert all(not feature.startswith("#") for feature in predictions[attribute].top_features)
+
+
+def test_training_replaces_artifacts_of_another_format(tmp_path, caplog):
+    output_dir = Path(tmp_path) / "artifacts"
+    train_main(DEFAULT_DATASET, output_dir, fused=True, compile=False)
+    fused = joblib.load(output_dir / FUSED_ARTIFACT_NAME)
+    train_main(DEFAULT_DATASET, output_dir, compile=False)
+
+    names = {path.name for path in output_dir.glob("*.joblib")}
+    assert names == {f"{attribute}.joblib" for attribute in ATTRIBUTES}
+
+    joblib.dump(fused, output_dir / FUSED_ARTIFACT_NAME)
+    with caplog.at_level("WARNING", logger="backend.inference.service"):
+        InferenceEngine(output_dir)
+    assert len(caplog.records) == len(ATTRIBUTES)
+    assert all(FUSED_ARTIFACT_NAME in record.getMessage() for record in caplog.records)
@@ -42,7 +42,9 @@ interface IngestResponse {
 
 interface AnalysisResponse {
   generated_at: string;
+  model_version: string;
   scenarios: ScenarioResult[];
+  timings?: Record<string, number> | null;
 }
 
 function App() {